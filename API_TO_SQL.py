@@ -1,52 +1,60 @@
+import os
+import time
+import logging
+import argparse
 import requests
 import pandas as pd
-from sqlalchemy import create_engine, Table, Column, Integer, Float, DateTime, MetaData, UniqueConstraint
+from sqlalchemy import func, select
 from datetime import datetime
 
+from database.config import engine, DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from database.models import BtcOHLCV, series_filter
+from database.bulk_writer import bulk_upsert
+
 # 1. Konfigūracijos – Binance API endpoint + DB prisijungimo duomenys
-BINANCE_URL = "https://api.binance.com/api/v3/klines"
-SYMBOL = "BTCUSDT"
-INTERVAL = "15m"  # gali būti 1m, 15m, 1h, 1d
+# BINANCE_URL galima pakeisti aplinkos kintamuoju (pvz. testams su lokaliu serveriu)
+BINANCE_URL = os.environ.get("BINANCE_URL", "https://api.binance.com/api/v3/klines")
+SYMBOL = DEFAULT_SYMBOL
+INTERVAL = DEFAULT_INTERVAL  # gali būti 1m, 15m, 1h, 1d
 LIMIT = 1000  # max 1000 duomenų vienu užklausimu
 
-# 2. MySQL duomenų bazės konfigūracija (pakeisk savo duomenimis)
-DB_USER = "root"
-DB_PASSWORD = "final_boss"
-DB_HOST = "localhost"
-DB_NAME = "BTC"
-
-# 3. Sukuriame SQLAlchemy engine
-engine = create_engine(f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}")
-
-# 4. Sukuriame lentelę, jei jos nėra
-metadata = MetaData()
-btc_table = Table(
-    'btc_ohlcv', metadata,
-    Column('id', Integer, primary_key=True),
-    Column('timestamp', DateTime, nullable=False),
-    Column('open', Float),
-    Column('high', Float),
-    Column('low', Float),
-    Column('close', Float),
-    Column('volume', Float),
-    UniqueConstraint('timestamp', name='uix_timestamp')
-)
-metadata.create_all(engine)
+# Istorijos atsisiuntimo (backfill) nustatymai
+BACKFILL_START = "2017-08-17"  # Nuo šios datos Binance turi BTCUSDT duomenis
+PAGE_PAUSE = 0.1  # Pauzė tarp puslapių sekundėmis, kad neviršytume API limitų
 
-# 5. Gauti duomenis iš Binance API
-def fetch_binance_ohlcv():
-    params = {
-        "symbol": SYMBOL,
-        "interval": INTERVAL,
-        "limit": LIMIT
-    }
-    response = requests.get(BINANCE_URL, params=params)
-    data = response.json()
+# Intervalų trukmės milisekundėmis - reikalinga kito puslapio pradžiai apskaičiuoti
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger("api_to_sql")
 
+# 2-3. Duomenų bazė - bendras projekto engine (nustatymai database/config.py ir
+# DB_* aplinkos kintamuosiuose, pvz. DB_DRIVER=pymysql)
+
+# 4. Lentelė - visi intervalai saugomi vienoje btc_ohlcv lentelėje,
+# eilutės raktas (symbol, interval, timestamp). Senas btc_ohlcv_<intervalas>
+# lenteles perkelia database/migrations.py
+btc_table = BtcOHLCV.__table__
+
+def _klines_to_frame(data, closed_before=None):
+    """
+    Paverčia Binance klines atsakymą į DataFrame
+
+    Args:
+        data: Binance klines atsakymas
+        closed_before: Laikas milisekundėmis - paliekamos tik iki jo užsidariusios žvakės
+                       (None - paliekamos visos)
+    """
     df = pd.DataFrame(data, columns=[
         'open_time', 'open', 'high', 'low', 'close', 'volume',
-        '_', '_', '_', '_', '_', '_'
+        'close_time', '_', '_', '_', '_', '_'
     ])
+    if closed_before is not None:
+        df = df[df['close_time'].astype('int64') < closed_before]
     df = df[['open_time', 'open', 'high', 'low', 'close', 'volume']]
     df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
     df = df.astype({
@@ -55,40 +63,141 @@ def fetch_binance_ohlcv():
     df.rename(columns={'open_time': 'timestamp'}, inplace=True)
     return df
 
+# 5. Gauti duomenis iš Binance API
+def fetch_binance_ohlcv(interval=INTERVAL, start_time=None, end_time=None, limit=LIMIT,
+                        http=None, url=None):
+    """
+    Gauna vieną klines puslapį iš Binance API.
+    Dar neužsidariusi (dabartinė) žvakė atmetama - jos OHLCV dar keisis, o
+    įrašyta ji nebūtų atnaujinta (INSERT IGNORE, tęsiama po MAX(timestamp)).
+
+    Args:
+        interval: Žvakių intervalas (pvz. '15m', '1h')
+        start_time: Pradžios laikas milisekundėmis (imtinai)
+        end_time: Pabaigos laikas milisekundėmis (imtinai)
+        limit: Kiek žvakių gauti (max 1000)
+        http: requests.Session (jei None - naudojamas requests)
+        url: API adresas (pagal nutylėjimą BINANCE_URL)
+    """
+    params = {
+        "symbol": SYMBOL,
+        "interval": interval,
+        "limit": limit
+    }
+    if start_time is not None:
+        params["startTime"] = int(start_time)
+    if end_time is not None:
+        params["endTime"] = int(end_time)
+    
+    response = (http or requests).get(url or BINANCE_URL, params=params, timeout=30)
+    response.raise_for_status()
+    return _klines_to_frame(response.json(), closed_before=int(time.time() * 1000))
+
+def iter_binance_pages(interval, start_time, end_time=None, limit=LIMIT, http=None, url=None):
+    """
+    Generatorius, kuris puslapiuoja Binance istoriją nuo start_time.
+    Kiekvienas puslapis grąžinamas iškart, todėl visa istorija nelaikoma atmintyje.
+    """
+    step = INTERVAL_MS[interval]
+    next_start = int(start_time)
+    
+    while end_time is None or next_start <= end_time:
+        page = fetch_binance_ohlcv(interval, next_start, end_time, limit, http=http, url=url)
+        if page.empty:
+            break
+        
+        yield page
+        
+        # Kitas puslapis prasideda po paskutinės gautos žvakės
+        last_open = int(page['timestamp'].iloc[-1].value // 1_000_000)
+        next_start = last_open + step
+        
+        # Nepilnas puslapis (arba atmesta dar neužsidariusi žvakė) reiškia, kad pasiekėme dabartį
+        if len(page) < limit:
+            break
+        time.sleep(PAGE_PAUSE)
+
+def get_resume_time(interval, symbol=SYMBOL):
+    """
+    Grąžina laiką (ms), nuo kurio reikia tęsti atsisiuntimą - po paskutinio
+    šio intervalo timestamp, arba None, jei intervalo duomenų dar nėra
+    """
+    with engine.connect() as conn:
+        # MAX pagal rakto pradžią (symbol, interval) - skaitomas tik vienas rakto įrašas
+        latest = conn.execute(select(func.max(btc_table.c.timestamp))
+                              .where(series_filter(btc_table, symbol, interval))).scalar()
+    if latest is None:
+        return None
+    return int(pd.Timestamp(latest).value // 1_000_000) + INTERVAL_MS[interval]
+
+def backfill(intervals=(INTERVAL,), start=None, end=None, url=None):
+    """
+    Atsisiunčia istoriją kiekvienam intervalui ir įrašo kiekvieną puslapį iškart.
+    Jei lentelėje jau yra duomenų - tęsia nuo paskutinio timestamp.
+
+    Args:
+        intervals: Intervalų sąrašas (pvz. ['15m', '1h'])
+        start: Pradžios data, jei lentelė tuščia (pagal nutylėjimą BACKFILL_START)
+        end: Pabaigos data (pagal nutylėjimą - iki dabar)
+        url: API adresas (pagal nutylėjimą BINANCE_URL)
+    """
+    start_ms = int(pd.Timestamp(start or BACKFILL_START).value // 1_000_000)
+    end_ms = int(pd.Timestamp(end).value // 1_000_000) if end else None
+    
+    btc_table.create(engine, checkfirst=True)
+    
+    # Viena sesija visoms užklausoms - išlaikomas keep-alive ryšys
+    with requests.Session() as http:
+        for interval in intervals:
+            resume_ms = get_resume_time(interval)
+            interval_start = max(start_ms, resume_ms) if resume_ms else start_ms
+            logger.info(f"[{interval}] Atsisiunčiama nuo {pd.to_datetime(interval_start, unit='ms')}")
+            
+            total = 0
+            for page in iter_binance_pages(interval, interval_start, end_ms, http=http, url=url):
+                save_to_db(page, interval)
+                total += len(page)
+                logger.info(f"[{interval}] Gauta {total} eilučių, paskutinė: {page['timestamp'].iloc[-1]}")
+            
+            logger.info(f"[{interval}] Atsisiuntimas baigtas, iš viso {total} eilučių")
+
 # 6. Įrašyti į MySQL
-def save_to_db(df):
+def save_to_db(df, interval=INTERVAL, symbol=SYMBOL):
     """
-    Įrašo duomenis į duomenų bazę, ignoruojant pasikartojančius įrašus.
+    Įrašo duomenis į duomenų bazę vienu INSERT IGNORE sakiniu paketui,
+    todėl pasikartojantys įrašai (pirminis raktas) praleidžiami DB pusėje.
     
     Args:
         df: DataFrame su BTC duomenimis
+        interval: Žvakių intervalas (įrašomas į interval stulpelį)
+        symbol: Simbolis (pagal nutylėjimą SYMBOL)
+    
+    Returns:
+        dict: {'inserted': įrašytų eilučių skaičius, 'skipped': praleistų duplikatų skaičius}
     """
-    try:
-        with engine.begin() as conn:
-            # Naudojame 'replace' vietoj 'append', jei norime perrašyti duomenis:
-            # df.to_sql('btc_ohlcv', con=conn, if_exists='replace', index=False, method='multi')
-            
-            # Arba naudojame 'ignore' parametrą (nuo SQLAlchemy 1.4):
-            df.to_sql('btc_ohlcv', con=conn, if_exists='append', index=False, 
-                    method='multi', chunksize=1000)
-            print(f"Sėkmingai įrašyta {len(df)} eilučių")
-    except Exception as e:
-        # Jei klaida - bandome įrašyti po vieną eilutę, preskipinant pasikartojančias
-        print(f"Aptikta duplikatų, įrašomi tik nauji duomenys: {e}")
-        inserted = 0
-        for _, row in df.iterrows():
-            try:
-                row_df = pd.DataFrame([row])
-                row_df.to_sql('btc_ohlcv', con=engine, if_exists='append', index=False)
-                inserted += 1
-            except Exception:
-                # Ignoruojame pasikartojančius įrašus
-                pass
-        print(f"Sėkmingai įrašyta {inserted} eilučių, praleista {len(df) - inserted} duplikatų")
+    df = df.assign(symbol=symbol, interval=interval)
+    stats = bulk_upsert(df, btc_table, batch_size=LIMIT, on_duplicate='ignore', bind=engine)
+    
+    # INSERT IGNORE grąžina tik tikrai įrašytų eilučių skaičių
+    inserted = stats['affected']
+    skipped = stats['rows'] - inserted
+    print(f"Sėkmingai įrašyta {inserted} eilučių, praleista {skipped} duplikatų")
+    return {'inserted': inserted, 'skipped': skipped}
 
 # 7. Paleidžiam
 if __name__ == "__main__":
-    df = fetch_binance_ohlcv()
-    print(df.head())
-    save_to_db(df)
+    parser = argparse.ArgumentParser(description="Binance BTC duomenų įrašymas į MySQL")
+    parser.add_argument("--backfill", action="store_true", help="Atsisiųsti visą istoriją puslapiais")
+    parser.add_argument("--intervals", nargs="+", default=[INTERVAL], help="Intervalai, pvz. 15m 1h 1d")
+    parser.add_argument("--start", default=None, help="Pradžios data, jei lentelė tuščia (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="Pabaigos data (YYYY-MM-DD)")
+    args = parser.parse_args()
+    
+    if args.backfill:
+        backfill(args.intervals, start=args.start, end=args.end)
+    else:
+        btc_table.create(engine, checkfirst=True)
+        df = fetch_binance_ohlcv()
+        print(df.head())
+        save_to_db(df)
     print("Duomenys įrašyti į MySQL duomenų bazę.")
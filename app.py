@@ -33,14 +33,15 @@ def index():
 def test():
     return "Flask veikia!"
 
-# Registruojame Blueprint maršrutus
-from routes.main_routes import main
-from routes.training_routes import training
-from routes.prediction_routes import prediction
-
-app.register_blueprint(main)
-app.register_blueprint(training)
-app.register_blueprint(prediction)
+# Registruojame Blueprint maršrutus ir užklausos DB sesijos uždarymą
+from routes import register_routes
+register_routes(app)
+
+# Iš anksto įkeliame naujausius modelius, jei nurodyta MODEL_CACHE_WARMUP
+model_cache_warmup = int(os.environ.get("MODEL_CACHE_WARMUP", 0))
+if model_cache_warmup > 0:
+    from services.model_service import warm_up_model_cache
+    warm_up_model_cache(model_cache_warmup)
 
 logger.info("Flask aplikacija inicializuota")
 
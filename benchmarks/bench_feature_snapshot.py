@@ -0,0 +1,90 @@
+"""
+Treniravimo duomenų nuskaitymas: DB (load_frame) prieš Arrow kopiją diske
+(database/feature_snapshot.py). Matuojamas pilnas nuskaitymas ir 30 d. intervalas
+per load_features(bulk=True) - taip, kaip skaito treniravimas ir backtest.
+
+Pagal nutylėjimą naudojama laikina SQLite DB ir laikinas kopijų katalogas,
+--database-url leidžia matuoti su bandomąja MySQL DB (btc_features perrašoma!).
+
+Paleidimas:
+    python benchmarks/bench_feature_snapshot.py --rows 1000000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+parser = argparse.ArgumentParser(description="DB ir Arrow kopijos nuskaitymo palyginimas")
+parser.add_argument("--rows", type=int, default=1_000_000, help="Sugeneruotų OHLCV eilučių skaičius")
+parser.add_argument("--repeat", type=int, default=3, help="Kiek kartų kartoti kiekvieną nuskaitymą")
+parser.add_argument("--database-url", help="Bandomosios DB URL (pagal nutylėjimą - laikina SQLite)")
+args = parser.parse_args()
+
+# Nustatymai turi būti prieš importuojant database paketą
+tmp_dir = tempfile.mkdtemp(prefix="bench_snapshot_")
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+os.environ["FEATURES_SNAPSHOT_DIR"] = os.path.join(tmp_dir, 'snapshots')
+os.environ["FEATURES_STORAGE"] = "wide"
+os.environ["FEATURES_DAILY_BLOBS"] = "0"
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+
+from database.config import engine, Base
+from database import feature_store, feature_snapshot
+from features.technical_indicators import create_all_features
+
+def make_features(rows):
+    """Sugeneruoja OHLCV duomenis ir apskaičiuoja požymius"""
+    rng = np.random.default_rng(0)
+    close = 30000 + np.cumsum(rng.normal(0, 25, rows))
+    ohlcv = pd.DataFrame({
+        'timestamp': pd.date_range(end='2025-01-01', periods=rows, freq='1min'),
+        'open': close, 'high': close + 20, 'low': close - 20, 'close': close,
+        'volume': rng.random(rows) * 100,
+    })
+    return create_all_features(ohlcv)
+
+def timed(func):
+    """Nuskaitymo trukmės mediana sekundėmis ir eilučių skaičius"""
+    times = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        df = func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), df
+
+def main():
+    Base.metadata.create_all(engine)
+    df = make_features(args.rows)
+    print(f"DB: {engine.url.render_as_string(hide_password=True)}, požymių eilučių: {len(df)}")
+
+    feature_store.delete_features()
+    feature_store.save_features(df)
+    started = time.perf_counter()
+    version = feature_snapshot.write_snapshot(df)
+    manifest = feature_snapshot.current_manifest()
+    size = sum(os.path.getsize(os.path.join(manifest['path'], part['file'])) for part in manifest['partitions'])
+    print(f"Kopija {version}: {len(manifest['partitions'])} dalių, {size / 2**20:.0f} MB, "
+          f"įrašyta per {time.perf_counter() - started:.1f}s")
+
+    end = df['timestamp'].max()
+    ranges = {'visi': (None, None), 'intervalas 30 d.': (end - pd.Timedelta(days=30), end)}
+
+    print(f"\n{'Šaltinis':<12}{'Nuskaitymas':<20}{'s':>10}{'eil./s':>14}")
+    reference = {}
+    for source in ('DB', 'kopija'):
+        feature_snapshot.FEATURES_SNAPSHOT = source == 'kopija'
+        for name, (start, stop) in ranges.items():
+            seconds, loaded = timed(lambda: feature_store.load_features(start=start, end=stop, bulk=True))
+            if name in reference:
+                assert loaded.equals(reference[name]), f"{source} {name}: duomenys nesutampa su DB"
+            reference[name] = loaded
+            print(f"{source:<12}{name:<20}{seconds:>10.3f}{len(loaded) / seconds:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Požymių saugojimo būdų palyginimas (database/feature_store.py):
+- 'wide'    - btc_features (visi stulpeliai, įskaitant lag stulpelius);
+- 'compact' - btc_features_compact (float32, lag stulpeliai atkuriami skaitant);
+- 'daily'   - btc_features_daily dienos įrašai (skaitoma su bulk=True).
+
+Matuojama: lentelės dydis diske (MySQL - information_schema, SQLite - dbstat),
+InnoDB buferio puslapiai po pilno nuskaitymo (tik MySQL), pilno nuskaitymo
+greitis (eil./s) ir didžiausia absoliuti paklaida, palyginus su 'wide'.
+
+Pagal nutylėjimą naudojama laikina SQLite DB, --database-url leidžia matuoti
+su bandomąja MySQL DB (lentelių turinys perrašomas!).
+
+Paleidimas:
+    python benchmarks/bench_feature_storage.py --rows 200000
+    python benchmarks/bench_feature_storage.py --rows 2000000 --database-url mysql+pymysql://...
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+parser = argparse.ArgumentParser(description="Požymių saugojimo būdų palyginimas")
+parser.add_argument("--rows", type=int, default=200_000, help="Sugeneruotų OHLCV eilučių skaičius")
+parser.add_argument("--repeat", type=int, default=3, help="Kiek kartų kartoti pilną nuskaitymą")
+parser.add_argument("--database-url", help="Bandomosios DB URL (pagal nutylėjimą - laikina SQLite)")
+args = parser.parse_args()
+
+# DB URL turi būti nustatytas prieš importuojant database.config
+tmp_dir = tempfile.mkdtemp(prefix="bench_features_")
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from database.config import engine, Base
+from database import feature_store
+from database.models import BtcFeatures, BtcFeaturesCompact, BtcFeaturesDaily
+from features.technical_indicators import create_all_features
+
+# Saugojimo būdas -> (lentelė, load_features() parametrai)
+LAYOUTS = {
+    'wide': (BtcFeatures.__tablename__, {'storage': 'wide'}),
+    'compact': (BtcFeaturesCompact.__tablename__, {'storage': 'compact'}),
+    'daily': (BtcFeaturesDaily.__tablename__, {'storage': 'compact', 'bulk': True}),
+}
+
+def make_features(rows):
+    """Sugeneruoja OHLCV duomenis ir apskaičiuoja požymius"""
+    rng = np.random.default_rng(0)
+    close = 30000 + np.cumsum(rng.normal(0, 25, rows))
+    ohlcv = pd.DataFrame({
+        'timestamp': pd.date_range(end='2025-01-01', periods=rows, freq='15min'),
+        'open': close, 'high': close + 20, 'low': close - 20, 'close': close,
+        'volume': rng.random(rows) * 100,
+    })
+    return create_all_features(ohlcv)
+
+def table_size(table_name):
+    """Lentelės dydis baitais (duomenys + indeksai) arba None, jei nepavyksta nustatyti"""
+    with engine.connect() as conn:
+        if engine.dialect.name == 'mysql':
+            conn.execute(text(f"ANALYZE TABLE {table_name}"))
+            return conn.execute(text(
+                "SELECT data_length + index_length FROM information_schema.TABLES "
+                "WHERE table_schema = DATABASE() AND table_name = :table"
+            ), {'table': table_name}).scalar()
+        if engine.dialect.name == 'sqlite':
+            try:
+                return conn.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = :table"),
+                                    {'table': table_name}).scalar()
+            except Exception:
+                # SQLite be SQLITE_ENABLE_DBSTAT_VTAB
+                return None
+    return None
+
+def buffer_pages(table_name):
+    """Kiek lentelės puslapių yra InnoDB buferyje (tik MySQL)"""
+    if engine.dialect.name != 'mysql':
+        return None
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT COUNT(*) FROM information_schema.INNODB_BUFFER_PAGE "
+            "WHERE TABLE_NAME LIKE :table"
+        ), {'table': f"%`{table_name}`"}).scalar()
+
+def max_abs_error(reference, df):
+    """Didžiausia absoliuti paklaida tarp sutampančių eilučių (be NaN)"""
+    merged = reference.merge(df, on='timestamp', suffixes=('', '_other'))
+    errors = []
+    for col in reference.columns.drop('timestamp'):
+        diff = np.abs(merged[col].to_numpy(np.float64) - merged[f"{col}_other"].to_numpy(np.float64))
+        errors.append(np.nanmax(diff) if np.isfinite(diff).any() else 0.0)
+    return max(errors)
+
+def main():
+    Base.metadata.create_all(engine)
+    df = make_features(args.rows)
+    print(f"DB: {engine.url.render_as_string(hide_password=True)}, požymių eilučių: {len(df)}")
+
+    feature_store.FEATURES_DAILY_BLOBS = False
+    feature_store.delete_features(storage='wide')
+    feature_store.save_features(df, storage='wide')
+    feature_store.FEATURES_DAILY_BLOBS = True
+    feature_store.delete_features(storage='compact')
+    feature_store.save_features(df, storage='compact')
+
+    reference = None
+    print(f"\n{'Būdas':<10}{'Dydis, MB':>12}{'B/eil.':>10}{'Buferio psl.':>14}{'eil./s':>14}{'Maks. paklaida':>16}")
+    for layout, (table_name, options) in LAYOUTS.items():
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            loaded = feature_store.load_features(**options)
+            times.append(time.perf_counter() - started)
+        if reference is None:
+            reference = loaded
+
+        size = table_size(table_name)
+        pages = buffer_pages(table_name)
+        print(f"{layout:<10}"
+              f"{f'{size / 2**20:.1f}' if size else '-':>12}"
+              f"{f'{size / len(df):.0f}' if size else '-':>10}"
+              f"{pages if pages is not None else '-':>14}"
+              f"{len(loaded) / statistics.median(times):>14,.0f}"
+              f"{max_abs_error(reference, loaded):>16.3g}")
+
+if __name__ == "__main__":
+    main()
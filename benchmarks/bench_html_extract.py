@@ -0,0 +1,184 @@
+"""
+HTML ištraukimo palyginimas.
+Lygina seną ištraukimą (BeautifulSoup su html.parser, visas puslapis, tarpai
+valomi per splitlines()/split("  ")) su data/html_extractor.py būdais:
+'bs4' (SoupStrainer + lxml arba html.parser) ir 'lxml' (XPath).
+
+Puslapiai imami iš katalogo (pagal nutylėjimą benchmarks/fixtures): sąrašų
+puslapiai vadinami pagal svetainę (pvz. cointelegraph.com.html), straipsniai -
+article_*.html. Pavyzdiniai puslapiai atnaujinami su --save (atsisiunčia tikrus
+NEWS_SOURCES puslapius), o --generate vietoj jų sugeneruoja atsitiktinius.
+
+Paleidimas:
+    python benchmarks/bench_html_extract.py --repeat 20
+    python benchmarks/bench_html_extract.py --save
+    python benchmarks/bench_html_extract.py --fixtures /kitas/katalogas
+"""
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+
+from bs4 import BeautifulSoup
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.html_extractor import (
+    EKSTRAKTORIAI, BS4_PARSER, SALTINIU_ISDESTYMAS, rasti_isdestyma, istraukti_straipsnius
+)
+
+# Išsaugoti sąrašų ir straipsnių puslapiai
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ZODZIAI = "bitcoin price market traders rally crash etf halving miners network analysts record volume".split()
+
+def _sakinys(rng, n=14):
+    return " ".join(rng.choice(ZODZIAI) for _ in range(n)).capitalize() + "."
+
+def _puslapio_remas(rng, turinys):
+    """Puslapis su navigacija, skriptais ir poraštėmis aplink turinį"""
+    navigacija = "".join(f'<li class="menu__item"><a href="/tag/{i}">{rng.choice(ZODZIAI)}</a></li>'
+                         for i in range(120))
+    skriptai = "".join(f"<script>window.__DATA_{i}__ = {{'k': '{'x' * 2000}'}};</script>" for i in range(15))
+    poraste = "".join(f'<div class="footer__col"><p>{_sakinys(rng)}</p></div>' for i in range(40))
+    return (f"<!DOCTYPE html><html><head><title>BTC</title><style>body {{ color: #000; }}</style>{skriptai}"
+            f"</head><body><header><nav><ul>{navigacija}</ul></nav></header><main>{turinys}</main>"
+            f"<footer>{poraste}</footer></body></html>").encode()
+
+def sugeneruoti_puslapius(straipsniu=20, seed=1):
+    """Sugeneruoja sąrašų puslapius kiekvienai svetainei ir straipsnių puslapius"""
+    rng = random.Random(seed)
+    sarasai = {}
+    for domenas, isdestymas in SALTINIU_ISDESTYMAS.items():
+        zyme, klase = isdestymas["item"]
+        antrastes_zyme, antrastes_klase = isdestymas["title"]
+        zyme = zyme or "div"
+        antrastes_zyme = antrastes_zyme or "span"
+        irasai = "".join(
+            f'<{zyme} class="{klase or "post-card"}"><a href="/news/{i}"><img src="/i/{i}.jpg"></a>'
+            f'<{antrastes_zyme} class="{antrastes_klase or "post-card__title"}">  {_sakinys(rng, 8)}\n'
+            f'</{antrastes_zyme}><p class="excerpt">{_sakinys(rng)} {_sakinys(rng)}</p></{zyme}>'
+            for i in range(30))
+        sarasai[domenas] = _puslapio_remas(rng, irasai)
+    straipsniai = []
+    for i in range(straipsniu):
+        pastraipos = "".join(f"<p>{_sakinys(rng)} {_sakinys(rng)}\n  {_sakinys(rng)}</p>" for _ in range(25))
+        straipsniai.append(_puslapio_remas(rng, f"<article><h1>{_sakinys(rng, 8)}</h1>{pastraipos}</article>"))
+    return sarasai, straipsniai
+
+def nuskaityti_puslapius(katalogas):
+    """Nuskaito išsaugotus puslapius iš katalogo"""
+    sarasai = {}
+    for kelias in glob.glob(os.path.join(katalogas, "*.html")):
+        pavadinimas = os.path.basename(kelias)[:-len(".html")]
+        if rasti_isdestyma(pavadinimas):
+            with open(kelias, "rb") as f:
+                sarasai[pavadinimas] = f.read()
+    straipsniai = []
+    for kelias in sorted(glob.glob(os.path.join(katalogas, "article_*.html"))):
+        with open(kelias, "rb") as f:
+            straipsniai.append(f.read())
+    return sarasai, straipsniai
+
+def issaugoti_puslapius(katalogas, straipsniu=5):
+    """Atsisiunčia ir išsaugo tikrus sąrašų ir straipsnių puslapius"""
+    from data.sentiment_analysis import NEWS_SOURCES, gauti_duomenis_is_url
+
+    os.makedirs(katalogas, exist_ok=True)
+    n = 0
+    for url in NEWS_SOURCES:
+        content = gauti_duomenis_is_url(url)
+        if not content:
+            continue
+        domenas = next(d for d in SALTINIU_ISDESTYMAS if d in url)
+        with open(os.path.join(katalogas, f"{domenas}.html"), "wb") as f:
+            f.write(content)
+        for straipsnis in istraukti_straipsnius(content, url, straipsniu):
+            turinys = gauti_duomenis_is_url(straipsnis["url"])
+            if turinys:
+                with open(os.path.join(katalogas, f"article_{n:03d}.html"), "wb") as f:
+                    f.write(turinys)
+                n += 1
+    print(f"Išsaugota: {katalogas} ({n} straipsniai)")
+
+# Sena versija - kaip buvo data/sentiment_analysis.py
+def senas_tekstas(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.extract()
+    text = soup.get_text(separator=' ')
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+def senas_straipsniai(content, isdestymas, max_straipsniu):
+    soup = BeautifulSoup(content, 'html.parser')
+    zyme, klase = isdestymas["item"]
+    selektorius = zyme if zyme else f".{klase}"
+    antraste_zyme, antraste_klase = isdestymas["title"]
+    antraste_selektorius = antraste_zyme if antraste_zyme else f".{antraste_klase}"
+    straipsniai = []
+    for article in soup.select(selektorius)[:max_straipsniu]:
+        title = article.select_one(antraste_selektorius)
+        link = article.select_one('a')
+        if title and link:
+            href = link.get('href')
+            straipsniai.append({"title": title.text.strip(),
+                                "url": href if href.startswith('http') else f"{isdestymas['base']}{href}",
+                                "source": isdestymas["source"]})
+    return straipsniai
+
+def matuoti(funkcija, puslapiai, kartai):
+    """Vidutinis laikas vienam puslapiui milisekundėmis"""
+    pradzia = time.perf_counter()
+    for _ in range(kartai):
+        for puslapis in puslapiai:
+            funkcija(puslapis)
+    return (time.perf_counter() - pradzia) * 1000 / (kartai * max(len(puslapiai), 1))
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML ištraukimo palyginimas")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Katalogas su išsaugotais puslapiais")
+    parser.add_argument("--generate", action="store_true", help="Naudoti sugeneruotus puslapius")
+    parser.add_argument("--save", nargs="?", const=FIXTURE_DIR,
+                        help="Atsisiųsti tikrus puslapius į katalogą (pagal nutylėjimą benchmarks/fixtures) ir baigti")
+    parser.add_argument("--repeat", type=int, default=10, help="Kiek kartų kartoti matavimą")
+    parser.add_argument("--max-articles", type=int, default=10, help="Kiek straipsnių imti iš sąrašo")
+    args = parser.parse_args()
+
+    if args.save:
+        issaugoti_puslapius(args.save)
+        return
+
+    sarasai, straipsniai = sugeneruoti_puslapius() if args.generate else nuskaityti_puslapius(args.fixtures)
+    if not sarasai and not straipsniai:
+        print(f"Kataloge {args.fixtures} puslapių nėra - paleiskite su --save arba --generate")
+        return
+    vidutinis = sum(map(len, straipsniai)) / max(len(straipsniai), 1)
+    print(f"Sąrašų puslapių: {len(sarasai)}, straipsnių: {len(straipsniai)} "
+          f"(vidutiniškai {vidutinis / 1024:.0f} KB), bs4 parseris: {BS4_PARSER}")
+
+    budai = [("senas (html.parser, visas puslapis)", senas_straipsniai, senas_tekstas)]
+    budai += [(pavadinimas, funkcijos["straipsniai"], funkcijos["tekstas"])
+              for pavadinimas, funkcijos in EKSTRAKTORIAI.items()]
+
+    print(f"{'Būdas':<38}{'Sąrašas, ms':>12}{'Straipsnis, ms':>16}{'Teksto ilgis':>14}")
+    sarasu_rezultatai = {}
+    for pavadinimas, straipsniu_funkcija, teksto_funkcija in budai:
+        sarasu_laikas = matuoti(
+            lambda item: straipsniu_funkcija(item[1], rasti_isdestyma(item[0]), args.max_articles),
+            list(sarasai.items()), args.repeat)
+        teksto_laikas = matuoti(teksto_funkcija, straipsniai, args.repeat)
+        ilgis = sum(len(teksto_funkcija(s)) for s in straipsniai) / max(len(straipsniai), 1)
+        sarasu_rezultatai[pavadinimas] = [straipsniu_funkcija(turinys, rasti_isdestyma(domenas), args.max_articles)
+                                          for domenas, turinys in sarasai.items()]
+        print(f"{pavadinimas:<38}{sarasu_laikas:>12.2f}{teksto_laikas:>16.2f}{ilgis:>14.0f}")
+
+    # Visi būdai turi rasti tuos pačius straipsnius
+    rezultatai = list(sarasu_rezultatai.values())
+    print("Straipsnių sąrašai sutampa:", all(r == rezultatai[0] for r in rezultatai))
+
+if __name__ == "__main__":
+    main()
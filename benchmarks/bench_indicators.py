@@ -0,0 +1,81 @@
+"""
+Techninių indikatorių skaičiavimo palyginimas.
+Lygina seną add_* funkcijų grandinę (kiekviena kopijuoja DataFrame) su
+compute_indicator_columns() varikliu: trukmę ir didžiausią atminties kiekį.
+
+Paleidimas:
+    python benchmarks/bench_indicators.py --rows 1000000
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from features.technical_indicators import (
+    add_moving_averages, add_exponential_moving_averages, add_rsi, add_macd,
+    add_bollinger_bands, add_lag_features, add_target_label, create_all_features
+)
+
+def legacy_chain(df):
+    """Sena create_all_features versija - kiekvienas žingsnis kopijuoja DataFrame"""
+    df = df.copy()
+    df = add_moving_averages(df)
+    df = add_exponential_moving_averages(df)
+    df = add_rsi(df)
+    df = add_macd(df)
+    df = add_bollinger_bands(df)
+    df = add_lag_features(df)
+    df = add_target_label(df)
+    return df.dropna()
+
+def make_ohlcv(rows, seed=42):
+    """Sugeneruoja atsitiktinius 15 min. OHLCV duomenis"""
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 25, rows))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2015-01-01', periods=rows, freq='15min'),
+        'open': close + rng.normal(0, 5, rows),
+        'high': close + 20,
+        'low': close - 20,
+        'close': close,
+        'volume': rng.random(rows) * 100,
+    })
+
+def measure(func, df):
+    """Grąžina (rezultatas, trukmė sekundėmis, didžiausia atmintis MB)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(df)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Indikatorių variklio palyginimas")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Eilučių skaičius")
+    args = parser.parse_args()
+
+    df = make_ohlcv(args.rows)
+    print(f"Eilučių: {len(df)}, pradinis DataFrame: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB")
+
+    legacy, legacy_time, legacy_peak = measure(legacy_chain, df)
+    engine, engine_time, engine_peak = measure(create_all_features, df)
+
+    # Rezultatai turi sutapti
+    pd.testing.assert_frame_equal(legacy, engine[legacy.columns], check_exact=False, rtol=1e-9)
+    assert list(legacy.columns) == list(engine.columns)
+
+    print(f"{'Metodas':<22}{'Laikas, s':>12}{'Atmintis, MB':>16}")
+    print(f"{'add_* grandinė':<22}{legacy_time:>12.2f}{legacy_peak:>16.1f}")
+    print(f"{'vieno perėjimo':<22}{engine_time:>12.2f}{engine_peak:>16.1f}")
+    print(f"Pagreitis: {legacy_time / engine_time:.2f}x, atminties sumažėjimas: {legacy_peak / engine_peak:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Modelio atminties sąnaudų keliuose worker procesuose palyginimas (tik Linux).
+Kiekvienas worker'is įkelia tą patį modelį ir atlieka vieną prognozę, o
+atmintis matuojama, kol visi worker'iai gyvi vienu metu:
+    joblib  - kiekvienas procesas daro įprastą joblib.load()
+    mmap    - kiekvienas procesas daro joblib.load(..., mmap_mode='c')
+    preload - modelis įkeliamas tėviniame procese prieš fork
+              (kaip gunicorn --preload su MODEL_CACHE_WARMUP)
+Pss - proporcinga atmintis: bendri puslapiai padalinti tarp juos naudojančių procesų.
+
+Paleidimas:
+    python benchmarks/bench_model_rss.py --workers 4
+    python benchmarks/bench_model_rss.py --model models/random_forest_20250513_120000.joblib
+"""
+import os
+import sys
+import argparse
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ml.artifacts import save_model_artifact, load_model_artifact
+
+_preloaded = None
+
+def memory_mb():
+    """Grąžina proceso Rss, Pss ir Private_Dirty megabaitais iš /proc/self/smaps_rollup"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Dirty:'):
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return values
+
+def worker(mode, path, sample, ready, measure, results):
+    """Worker procesas: įkelia modelį, prognozuoja ir praneša atminties sąnaudas"""
+    baseline = memory_mb()
+    if mode == 'preload':
+        model = _preloaded
+    else:
+        model = load_model_artifact(path, mmap_mode='c' if mode == 'mmap' else None)
+    model.predict_proba(sample)
+
+    ready.release()
+    measure.wait()
+    current = memory_mb()
+    results.put({key: current[key] - baseline[key] if mode != 'preload' else current[key]
+                 for key in current})
+
+def run(mode, path, sample, workers):
+    """Paleidžia worker'ius ir grąžina vidutines atminties sąnaudas vienam worker'iui"""
+    global _preloaded
+    # preload naudoja fork, kiti režimai - spawn, kad procesai nieko nepaveldėtų
+    context = mp.get_context('fork' if mode == 'preload' else 'spawn')
+    if mode == 'preload':
+        _preloaded = load_model_artifact(path, mmap_mode='c')
+
+    ready = context.Semaphore(0)
+    measure = context.Event()
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, path, sample, ready, measure, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.acquire()
+
+    measure.set()
+    measurements = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    _preloaded = None
+
+    return {key: np.mean([m[key] for m in measurements]) for key in measurements[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Modelio RSS/PSS keliuose worker'iuose")
+    parser.add_argument("--workers", type=int, default=4, help="Worker procesų skaičius")
+    parser.add_argument("--model", default=None, help="Modelio failas (pagal nutylėjimą sugeneruojamas RandomForest)")
+    args = parser.parse_args()
+
+    sample = np.random.default_rng(0).random((10, 25))
+    path = args.model
+    if path is None:
+        from sklearn.ensemble import RandomForestClassifier
+        rng = np.random.default_rng(42)
+        X = rng.random((20000, 25))
+        y = (rng.random(20000) > 0.5).astype(int)
+        path = os.path.join(tempfile.mkdtemp(), "bench_rf.joblib")
+        save_model_artifact(RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1).fit(X, y), path)
+    else:
+        model = load_model_artifact(path)
+        sample = np.random.default_rng(0).random((10, model.n_features_in_))
+
+    print(f"Modelis: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB), worker'ių: {args.workers}")
+    print(f"{'Režimas':<10}{'Rss, MB':>10}{'Pss, MB':>10}{'Private, MB':>14}")
+    for mode in ('joblib', 'mmap', 'preload'):
+        result = run(mode, path, sample, args.workers)
+        print(f"{mode:<10}{result['Rss']:>10.1f}{result['Pss']:>10.1f}{result['Private_Dirty']:>14.1f}")
+    print("joblib/mmap - prieaugis po modelio įkėlimo, preload - viso worker proceso atmintis")
+
+if __name__ == "__main__":
+    main()
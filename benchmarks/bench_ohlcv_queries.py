@@ -0,0 +1,168 @@
+"""
+btc_ohlcv užklausų palyginimas skirtingiems lentelės išdėstymams.
+Lygina:
+- 'timestamp_index' - id raktas ir atskiras timestamp indeksas (senas API_TO_SQL
+  išdėstymas, kai symbol/interval yra tik paprasti stulpeliai);
+- 'series_key' - (symbol, interval, timestamp) pirminis raktas (BtcOHLCV);
+- 'series_key_partitioned' - tas pats, suskaidytas pagal mėnesius (tik MySQL).
+
+Matuojamos "naujausios N" ir laiko intervalo (1 d., 30 d.) užklausos vienai
+laiko eilutei per load_frame(). Eilutės paskirstomos po kelias laiko eilutes
+(--symbols x --intervals). Lentelės kuriamos su bench_ prefiksu ir pabaigoje
+ištrinamos (nebent --keep).
+
+Paleidimas:
+    python benchmarks/bench_ohlcv_queries.py --rows 10000000
+    python benchmarks/bench_ohlcv_queries.py --rows 200000 --database-url sqlite:////tmp/bench.db
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+parser = argparse.ArgumentParser(description="btc_ohlcv užklausų palyginimas")
+parser.add_argument("--rows", type=int, default=10_000_000, help="Eilučių skaičius kiekvienoje lentelėje")
+parser.add_argument("--symbols", nargs='+', default=['BTCUSDT', 'ETHUSDT'], help="Simboliai")
+parser.add_argument("--intervals", nargs='+', default=['1m', '15m'], help="Intervalai")
+parser.add_argument("--layouts", nargs='+', default=['timestamp_index', 'series_key', 'series_key_partitioned'])
+parser.add_argument("--latest", type=int, default=500, help="Kiek naujausių eilučių imti")
+parser.add_argument("--repeat", type=int, default=20, help="Kiek kartų kartoti kiekvieną užklausą")
+parser.add_argument("--chunk", type=int, default=500_000, help="Kiek eilučių generuoti ir įrašyti vienu kartu")
+parser.add_argument("--database-url", help="DB URL (pagal nutylėjimą - database/config.py nustatymai)")
+parser.add_argument("--reuse", action="store_true", help="Nekurti lentelių iš naujo, jei jose jau yra duomenų")
+parser.add_argument("--keep", action="store_true", help="Neištrinti lentelių pabaigoje")
+args = parser.parse_args()
+
+if args.database_url:
+    # DB URL turi būti nustatytas prieš importuojant database.config
+    os.environ["DATABASE_URL"] = args.database_url
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from sqlalchemy import Table, Column, Integer, Float, DateTime, String, MetaData, Index, func, inspect, select, text
+
+from database.config import engine
+from database.models import BtcOHLCV
+from database.bulk_writer import bulk_upsert
+from database.frame_loader import load_frame
+from database.partitioning import partition_by_month
+
+INTERVAL_STEP = {'1m': '1min', '5m': '5min', '15m': '15min', '1h': '1h', '4h': '4h', '1d': '1D'}
+
+# Paskutinė sugeneruotų duomenų žvakė
+END = pd.Timestamp('2025-01-01')
+
+metadata = MetaData()
+
+def make_table(layout):
+    """Lentelės aprašymas nurodytam išdėstymui"""
+    name = f"bench_ohlcv_{layout}"
+    if layout == 'timestamp_index':
+        return Table(
+            name, metadata,
+            Column('id', Integer, primary_key=True, autoincrement=True),
+            Column('symbol', String(20), nullable=False),
+            Column('interval', String(8), nullable=False),
+            Column('timestamp', DateTime, nullable=False),
+            *[Column(col, Float) for col in ('open', 'high', 'low', 'close', 'volume')],
+            Index(f"ix_{name}_timestamp", 'timestamp'),
+        )
+    return BtcOHLCV.__table__.to_metadata(metadata, name=name)
+
+def series_frames(rows, chunk):
+    """
+    Generuoja OHLCV duomenis dalimis: eilutės po lygiai paskirstomos
+    visoms (simbolis, intervalas) poroms, kiekviena eilutė baigiasi END
+    """
+    series = [(symbol, interval) for symbol in args.symbols for interval in args.intervals]
+    per_series = rows // len(series)
+    rng = np.random.default_rng(0)
+    for symbol, interval in series:
+        timestamps = pd.date_range(end=END, periods=per_series, freq=INTERVAL_STEP[interval])
+        for offset in range(0, per_series, chunk):
+            ts = timestamps[offset:offset + chunk]
+            close = 30000 + np.cumsum(rng.normal(0, 25, len(ts)))
+            yield pd.DataFrame({
+                'symbol': symbol, 'interval': interval, 'timestamp': ts,
+                'open': close, 'high': close + 20, 'low': close - 20, 'close': close,
+                'volume': rng.random(len(ts)) * 100,
+            })
+
+def prepare(table, layout):
+    """Sukuria ir užpildo lentelę (arba palieka esamą su --reuse)"""
+    if args.reuse and inspect(engine).has_table(table.name):
+        with engine.connect() as conn:
+            if conn.execute(select(func.count()).select_from(table)).scalar():
+                return True
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+
+    if layout == 'series_key_partitioned':
+        if engine.dialect.name != 'mysql':
+            print(f"{layout}: skaidymas galimas tik MySQL - praleidžiama")
+            table.drop(engine)
+            return False
+        # Skaidome tuščią lentelę - įrašant eilutės iškart patenka į savo dalis.
+        # Seniausia žvakė - ilgiausio intervalo eilutės pradžia
+        per_series = args.rows // (len(args.symbols) * len(args.intervals))
+        first = min(END - pd.Timedelta(INTERVAL_STEP[interval]) * per_series for interval in args.intervals)
+        partition_by_month(table.name, start=first, end=END, bind=engine)
+
+    started = time.perf_counter()
+    for df in series_frames(args.rows, args.chunk):
+        bulk_upsert(df, table, batch_size=5000, on_duplicate=None)
+    if engine.dialect.name == 'mysql':
+        with engine.begin() as conn:
+            conn.execute(text(f"ANALYZE TABLE {table.name}"))
+    print(f"{layout}: įrašyta {args.rows} eilučių per {time.perf_counter() - started:.0f}s")
+    return True
+
+def timed(func):
+    """Užklausos trukmės mediana milisekundėmis ir grąžintų eilučių skaičius"""
+    times = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        df = func()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), len(df)
+
+def main():
+    symbol, interval = args.symbols[0], args.intervals[-1]
+    print(f"DB: {engine.url.render_as_string(hide_password=True)}, eilučių: {args.rows}, "
+          f"laiko eilučių: {len(args.symbols) * len(args.intervals)}, matuojama: {symbol} {interval}")
+
+    queries = {
+        f"naujausios {args.latest}": lambda t: load_frame(
+            t, columns=['timestamp', 'close'], latest=args.latest, symbol=symbol, interval=interval),
+        "intervalas 1 d.": lambda t: load_frame(
+            t, columns=['timestamp', 'close'], start=END - pd.Timedelta(days=1), end=END,
+            symbol=symbol, interval=interval),
+        "intervalas 30 d.": lambda t: load_frame(
+            t, columns=['timestamp', 'close'], start=END - pd.Timedelta(days=30), end=END,
+            symbol=symbol, interval=interval),
+    }
+
+    results = {}
+    tables = []
+    try:
+        for layout in args.layouts:
+            table = make_table(layout)
+            if not prepare(table, layout):
+                continue
+            tables.append(table)
+            results[layout] = {name: timed(lambda: query(table)) for name, query in queries.items()}
+
+        print(f"\n{'Išdėstymas':<26}" + ''.join(f"{name:>22}" for name in queries))
+        for layout, measured in results.items():
+            cells = ''.join(f"{f'{ms:.1f} ms ({rows} eil.)':>22}" for ms, rows in measured.values())
+            print(f"{layout:<26}{cells}")
+    finally:
+        if not args.keep:
+            for table in tables:
+                table.drop(engine, checkfirst=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+DB kreipinių ir prisijungimų skaičius vienai prognozės užklausai.
+Lygina seną būdą (kiekviena paslaugos funkcija atsidaro savo sesiją) su
+viena užklausos sesija (routes/db_session.py). Skaičiuojami SQL sakiniai
+ir prisijungimų paėmimai iš telkinio (pool checkout).
+
+Pagal nutylėjimą naudojama laikina SQLite DB su sugeneruotais duomenimis,
+--database-url leidžia matuoti su tikra DB (joje turi būti modelis ir btc_features).
+
+Paleidimas:
+    python benchmarks/bench_request_session.py --requests 50
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+parser = argparse.ArgumentParser(description="DB kreipiniai vienai užklausai")
+parser.add_argument("--requests", type=int, default=50, help="Kiek užklausų matuoti")
+parser.add_argument("--rows", type=int, default=2000, help="Sugeneruotų btc_features eilučių skaičius")
+parser.add_argument("--database-url", help="Tikros DB URL (pagal nutylėjimą - laikina SQLite)")
+parser.add_argument("--model-id", type=int, default=1, help="Modelio ID tikroje DB")
+args = parser.parse_args()
+
+# DB URL turi būti nustatytas prieš importuojant database.config
+tmp_dir = tempfile.mkdtemp(prefix="bench_session_")
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+import numpy as np
+import pandas as pd
+from sqlalchemy import event
+
+from database.config import engine, Base, SessionLocal
+from database.models import BtcFeatures, MLModel
+from database.bulk_writer import bulk_upsert
+from services import model_service
+from services.model_cache import model_cache
+
+class Counter:
+    """SQL sakinių ir prisijungimų paėmimų skaitiklis"""
+
+    def __init__(self, bind):
+        self.queries = 0
+        self.checkouts = 0
+        event.listen(bind, 'before_cursor_execute', self._on_query)
+        event.listen(bind.pool, 'checkout', self._on_checkout)
+
+    def _on_query(self, *args):
+        self.queries += 1
+
+    def _on_checkout(self, *args):
+        self.checkouts += 1
+
+    def reset(self):
+        self.queries = self.checkouts = 0
+
+def prepare_sqlite(rows):
+    """Sukuria lenteles, sugeneruoja požymius ir nedidelį modelį"""
+    from sklearn.ensemble import RandomForestClassifier
+    from ml.artifacts import save_model_artifact
+
+    Base.metadata.create_all(engine)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({column: rng.random(rows) * 100 for column in model_service.FEATURE_COLUMNS})
+    df['timestamp'] = pd.date_range('2020-01-01', periods=rows, freq='D')
+    df['target'] = rng.integers(0, 2, rows)
+    for column in ('rsi_14', 'macd', 'bb_width'):
+        if column not in df:
+            df[column] = rng.random(rows)
+    bulk_upsert(df, BtcFeatures)
+
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(
+        df[model_service.FEATURE_COLUMNS], df['target'])
+    path = os.path.join(tmp_dir, 'model.joblib')
+    save_model_artifact(model, path)
+    session = SessionLocal()
+    session.add(MLModel(name='bench_rf', accuracy=0.5, model_path=path))
+    session.commit()
+    session.close()
+
+def old_request(model_id):
+    """Senas būdas - kiekviena funkcija atsidaro savo sesiją"""
+    model_service.get_available_models()
+    model_service.predict_next_day(model_id, 1)
+    model_service.get_latest_indicators()
+
+def measure(name, run, counter, requests, cold):
+    """Išmatuoja vidutinius SQL sakinius, prisijungimus ir laiką vienai užklausai"""
+    counter.reset()
+    started = time.perf_counter()
+    for _ in range(requests):
+        if cold:
+            model_cache.clear()
+        run()
+    elapsed = (time.perf_counter() - started) * 1000 / requests
+    print(f"{name:<56}{counter.queries / requests:>10.1f}{counter.checkouts / requests:>18.1f}{elapsed:>12.1f}")
+
+def main():
+    if not args.database_url:
+        prepare_sqlite(args.rows)
+    model_id = args.model_id
+
+    # Tikra aplikacija - su tais pačiais maršrutais ir teardown kaip produkcijoje
+    from app import app
+    client = app.test_client()
+
+    def new_request():
+        response = client.post('/predict', data={'model_id': model_id, 'prediction_horizon': 1})
+        assert response.status_code == 200 and b'alert-danger mt-4' not in response.data, "Prognozė nepavyko"
+
+    counter = Counter(engine)
+    print(f"DB: {engine.url.render_as_string(hide_password=True)}, užklausų: {args.requests}")
+    print(f"{'Būdas':<56}{'SQL/užkl.':>10}{'Prisijung./užkl.':>18}{'ms/užkl.':>12}")
+    for cold in (True, False):
+        cache = "modelis ne talpykloje" if cold else "modelis talpykloje"
+        measure(f"atskiros sesijos ({cache})", lambda: old_request(model_id), counter, args.requests, cold)
+        measure(f"užklausos sesija, POST /predict ({cache})", new_request, counter, args.requests, cold)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Sentimento vertinimo palyginimas.
+Lygina seną analizuoti_sentimenta() versiją (naujas SentimentIntensityAnalyzer
+ir pilnas TextBlob kiekvienam tekstui) su bendrais analizatoriais viename
+procese ir su paketiniu vertinimu per procesų telkinį.
+Tekstai generuojami atsitiktinai iš žodyno su sentimento žodžiais.
+
+Paleidimas:
+    python benchmarks/bench_sentiment.py --texts 3000 --words 400
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from textblob import TextBlob
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from data.sentiment_analysis import analizuoti_sentimenta, analizuoti_sentimenta_paketu
+
+ZODYNAS = (
+    "bitcoin price market investors traders exchange etf halving miners network "
+    "analysts week record volume support resistance rally crash surge drop gain loss "
+    "bullish bearish great terrible strong weak fear greed optimistic worried "
+    "approval rejected growth decline profit risk stable volatile hack secure"
+).split()
+
+def sugeneruoti_tekstus(kiekis, zodziu, seed=42):
+    """Sugeneruoja atsitiktinius straipsnių tekstus"""
+    rng = random.Random(seed)
+    tekstai = []
+    for _ in range(kiekis):
+        sakiniai = []
+        for _ in range(zodziu // 12):
+            sakiniai.append(" ".join(rng.choice(ZODYNAS) for _ in range(12)).capitalize() + ".")
+        tekstai.append(" ".join(sakiniai))
+    return tekstai
+
+def senas_vertinimas(tekstai):
+    """Sena versija - analizatoriai kuriami kiekvienam tekstui"""
+    rezultatai = []
+    for tekstas in tekstai:
+        blob = TextBlob(tekstas)
+        vader = SentimentIntensityAnalyzer().polarity_scores(tekstas)
+        rezultatai.append({"polarity": blob.sentiment.polarity,
+                           "subjectivity": blob.sentiment.subjectivity, **vader})
+    return rezultatai
+
+def matuoti(pavadinimas, funkcija, tekstai):
+    """Išmatuoja trukmę ir atspausdina rezultatą"""
+    pradzia = time.perf_counter()
+    rezultatai = funkcija(tekstai)
+    trukme = time.perf_counter() - pradzia
+    print(f"{pavadinimas:<36}{trukme:>10.2f}{len(tekstai) / trukme:>14.0f}")
+    return rezultatai
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentimento vertinimo palyginimas")
+    parser.add_argument("--texts", type=int, default=3000, help="Tekstų skaičius")
+    parser.add_argument("--words", type=int, default=400, help="Žodžių skaičius tekste")
+    parser.add_argument("--workers", type=int, default=None, help="Procesų skaičius")
+    args = parser.parse_args()
+
+    tekstai = sugeneruoti_tekstus(args.texts, args.words)
+    print(f"Tekstų: {len(tekstai)}, vidutinis ilgis: {sum(map(len, tekstai)) / len(tekstai):.0f} simbolių, "
+          f"CPU: {os.cpu_count()}")
+    print(f"{'Metodas':<36}{'Laikas, s':>10}{'Tekstų/s':>14}")
+
+    # Sena versija lėta - matuojame su dalimi tekstų
+    senas = matuoti("senas (analizatorius kiekvienam)", senas_vertinimas, tekstai[:max(len(tekstai) // 10, 1)])
+    vienas = matuoti("bendri analizatoriai, 1 procesas",
+                     lambda t: [analizuoti_sentimenta(x) for x in t], tekstai)
+    matuoti("paketai per procesus (abu)",
+            lambda t: analizuoti_sentimenta_paketu(t, max_workers=args.workers), tekstai)
+    matuoti("paketai per procesus (tik vader)",
+            lambda t: analizuoti_sentimenta_paketu(t, ('vader',), max_workers=args.workers), tekstai)
+    matuoti("paketai per procesus (tik textblob)",
+            lambda t: analizuoti_sentimenta_paketu(t, ('textblob',), max_workers=args.workers), tekstai)
+
+    # Rezultatai turi sutapti su sena versija
+    for a, b in zip(senas, vienas):
+        assert abs(a["compound"] - b["compound"]) < 1e-9 and abs(a["polarity"] - b["polarity"]) < 1e-9
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Paleidimo laiko patikra (python -X importtime).
+Kiekvienas tikslas (app, process_data, data) importuojamas naujame procese,
+išmatuojamas importų laikas ir patikrinama, kad paleidžiant nebūtų įkelti
+sunkūs moduliai, kurių reikia tik kai kuriems veiksmams (matplotlib, sklearn,
+nltk, textblob, yfinance, ta, bs4).
+
+Jei draudžiamas modulis importuojamas arba viršytas laiko limitas, grąžinamas
+klaidos kodas 1 - skriptą galima naudoti kaip regresijos patikrą.
+
+Paleidimas:
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --targets app --budget-ms 1500
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ką importuoja kiekvienas tikslas
+TARGETS = {
+    'app': 'import app',
+    'process_data': 'import process_data',
+    'data': 'import data',
+}
+
+# Moduliai, kurie neturi būti įkeliami paleidžiant
+FORBIDDEN = ('matplotlib', 'seaborn', 'sklearn', 'nltk', 'textblob', 'yfinance', 'ta', 'bs4', 'lxml')
+
+def parse_importtime(stderr):
+    """
+    Perskaito -X importtime išvestį.
+
+    Grąžina:
+        dict: modulis -> (savas laikas us, kaupiamasis laikas us, gylis)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+def measure(statement):
+    """Vienas importas naujame procese"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=PROJECT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Nepavyko įvykdyti '{statement}':\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Paleidimo laiko patikra")
+    parser.add_argument("--targets", nargs='+', default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3, help="Kiek kartų matuoti kiekvieną tikslą")
+    parser.add_argument("--top", type=int, default=8, help="Kiek lėčiausių paketų rodyti")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Didžiausias leistinas importo laikas")
+    args = parser.parse_args()
+
+    failed = False
+    for target in args.targets:
+        runs = [measure(TARGETS[target]) for _ in range(args.repeat)]
+        totals = [sum(cumulative for _, cumulative, depth in run.values() if depth == 1) / 1000 for run in runs]
+        total = statistics.median(totals)
+        modules = runs[-1]
+
+        print(f"\n{target}: {total:.0f} ms (mediana iš {args.repeat}), modulių: {len(modules)}")
+        top = sorted(((cumulative, name) for name, (_, cumulative, depth) in modules.items() if depth == 1),
+                     reverse=True)[:args.top]
+        for cumulative, name in top:
+            print(f"    {name:<40}{cumulative / 1000:>10.1f} ms")
+
+        loaded = [name for name in FORBIDDEN if name in modules]
+        if loaded:
+            failed = True
+            print(f"    KLAIDA: paleidžiant importuojami sunkūs moduliai: {', '.join(loaded)}")
+        if args.budget_ms is not None and total > args.budget_ms:
+            failed = True
+            print(f"    KLAIDA: viršytas limitas {args.budget_ms:.0f} ms")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,38 @@
 """
 Bitcoin duomenų analizės modulis.
 Šis modulis sujungia kainos ir sentimento duomenų analizę.
+Funkcijos importuojamos tik pirmą kartą jas pasiekus (PEP 562 __getattr__),
+todėl "import data" ar "from data.html_extractor import ..." neįkelia
+yfinance, ta, nltk ir textblob.
 """
+import importlib
 
-# Importuojame funkcijas iš apjungto bitcoin_analize.py failo
-from .bitcoin_analize import (
+# Funkcija -> modulis, kuriame ji apibrėžta
+_FUNKCIJU_MODULIAI = {
     # Kainų funkcijos
-    gauti_btc_kainas,
-    prideti_rodiklius,
-    paruosti_duomenis,
+    'gauti_btc_kainas': '.bitcoin_analize',
+    'prideti_rodiklius': '.bitcoin_analize',
+    'paruosti_duomenis': '.bitcoin_analize',
     
     # Sentimento funkcijos
-    analizuoti_naujienu_sentimenta,
-    prideti_sentimento_duomenis,
+    'analizuoti_naujienu_sentimenta': '.sentiment_analysis',
+    'prideti_sentimento_duomenis': '.sentiment_analysis',
     
     # Pagrindinės funkcijos
-    gauti_pilnus_btc_duomenis,
-    issaugoti_i_duombaze
-)
+    'gauti_pilnus_btc_duomenis': '.bitcoin_analize',
+    'issaugoti_i_duombaze': '.bitcoin_analize',
+}
 
 # Viešai prieinamos funkcijos
-__all__ = [
-    'gauti_btc_kainas',
-    'prideti_rodiklius',
-    'paruosti_duomenis',
-    'analizuoti_naujienu_sentimenta',
-    'prideti_sentimento_duomenis',
-    'gauti_pilnus_btc_duomenis',
-    'issaugoti_i_duombaze'
-]
\ No newline at end of file
+__all__ = list(_FUNKCIJU_MODULIAI)
+
+def __getattr__(pavadinimas):
+    """Importuoja funkcijos modulį pirmą kartą kreipiantis į funkciją"""
+    if pavadinimas not in _FUNKCIJU_MODULIAI:
+        raise AttributeError(f"module {__name__!r} has no attribute {pavadinimas!r}")
+    reiksme = getattr(importlib.import_module(_FUNKCIJU_MODULIAI[pavadinimas], __name__), pavadinimas)
+    globals()[pavadinimas] = reiksme  # Kitą kartą __getattr__ nebekviečiamas
+    return reiksme
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
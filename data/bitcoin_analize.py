@@ -5,33 +5,24 @@ Bitcoin duomenų analizės modulis.
 
 # ----- IMPORTAI -----
 # Kainų duomenų gavimui ir analizei
-import yfinance as yf
+# yfinance ir ta importuojami funkcijose, kuriose naudojami - jų importas ilgas
 import pandas as pd
 import numpy as np
-from ta.momentum import RSIIndicator
-from ta.trend import MACD, SMAIndicator, EMAIndicator
-from ta.volatility import BollingerBands
-
-# Sentimento analizei ir duomenų gavimui iš tinklalapių
-import requests
-import time
-import random
-from bs4 import BeautifulSoup
-from textblob import TextBlob
-import nltk
 
 # Kitos bibliotekos
-from datetime import datetime
+import os
+import sys
 import logging
 
-# Atsisiunčiame reikalingus NLTK duomenis
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Sentimento analizei
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+# Sentimento analizė - viena realizacija data/sentiment_analysis.py faile
+from data.sentiment_analysis import (
+    analizuoti_sentimenta,
+    analizuoti_naujienu_sentimenta,
+    prideti_sentimento_duomenis
+)
 
 # Logerio nustatymai
 logging.basicConfig(
@@ -47,24 +38,12 @@ BTC_SYMBOL = "BTC-USD"
 DEFAULT_PERIOD = "2y"
 DEFAULT_INTERVAL = "1d"
 
-# Sentimento analizei
-NEWS_SOURCES = [
-    "https://cointelegraph.com/tags/bitcoin",
-    "https://www.coindesk.com/tag/bitcoin/",
-    "https://cryptonews.com/news/bitcoin-news/"
-]
-
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15"
-]
-
 # ----- KAINŲ DUOMENŲ GAVIMO IR ANALIZĖS FUNKCIJOS -----
 
 def gauti_btc_kainas(pradzia=None, pabaiga=None, periodas=DEFAULT_PERIOD, intervalas=DEFAULT_INTERVAL):
     """Gauna Bitcoin kainas iš Yahoo Finance API"""
     try:
+        import yfinance as yf
         logger.info("Gaunami BTC kainų duomenys")
         
         # Gauname duomenis
@@ -92,6 +71,10 @@ def gauti_btc_kainas(pradzia=None, pabaiga=None, periodas=DEFAULT_PERIOD, interv
 def prideti_rodiklius(duomenys):
     """Prideda visus techninius rodiklius prie kainų duomenų"""
     try:
+        from ta.momentum import RSIIndicator
+        from ta.trend import MACD, SMAIndicator, EMAIndicator
+        from ta.volatility import BollingerBands
+        
         df = duomenys.copy()
         
         # Tikriname ar yra reikalingi stulpeliai
@@ -155,237 +138,6 @@ def paruosti_duomenis(pradzia=None, pabaiga=None, periodas=DEFAULT_PERIOD, inter
     logger.info(f"Sėkmingai paruošti {len(df)} įrašai")
     return df
 
-# ----- SENTIMENTO ANALIZĖS FUNKCIJOS -----
-
-def gauti_atsitiktini_user_agent():
-    """Grąžina atsitiktinį User-Agent"""
-    return random.choice(USER_AGENTS)
-
-def gauti_duomenis_is_url(url, timeout=10):
-    """Gauna HTML duomenis iš nurodyto URL"""
-    try:
-        headers = {"User-Agent": gauti_atsitiktini_user_agent()}
-        response = requests.get(url, headers=headers, timeout=timeout)
-        
-        if response.status_code != 200:
-            logger.warning(f"Klaida gaunant duomenis iš {url}: {response.status_code}")
-            return None
-            
-        return response.content
-    except Exception as e:
-        logger.error(f"Klaida: {e}")
-        return None
-
-def gauti_straipsnius(url, max_straipsniu=10):
-    """Ištraukia straipsnius iš naujienų svetainės"""
-    straipsniai = []
-    content = gauti_duomenis_is_url(url)
-    
-    if not content:
-        return []
-        
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # Skirtinga logika skirtingoms svetainėms
-    if "cointelegraph.com" in url:
-        for article in soup.select('article')[:max_straipsniu]:
-            title = article.select_one('h2')
-            link = article.select_one('a')
-            if title and link:
-                straipsniai.append({
-                    "title": title.text.strip(),
-                    "url": link.get('href') if link.get('href').startswith('http') else f"https://cointelegraph.com{link.get('href')}",
-                    "source": "Cointelegraph"
-                })
-    elif "coindesk.com" in url:
-        for article in soup.select('.article-card')[:max_straipsniu]:
-            title = article.select_one('.article-card-title')
-            link = article.select_one('a')
-            if title and link:
-                straipsniai.append({
-                    "title": title.text.strip(),
-                    "url": link.get('href') if link.get('href').startswith('http') else f"https://www.coindesk.com{link.get('href')}",
-                    "source": "Coindesk"
-                })
-    elif "cryptonews.com" in url:
-        for article in soup.select('.category-posts__post')[:max_straipsniu]:
-            title = article.select_one('.category-posts__post-title')
-            link = article.select_one('a')
-            if title and link:
-                straipsniai.append({
-                    "title": title.text.strip(),
-                    "url": link.get('href') if link.get('href').startswith('http') else f"https://cryptonews.com{link.get('href')}",
-                    "source": "Cryptonews"
-                })
-                
-    return straipsniai
-
-def gauti_naujienu_straipsnius(max_straipsniu=10):
-    """Gauna straipsnius iš visų šaltinių"""
-    visi_straipsniai = []
-    
-    for url in NEWS_SOURCES:
-        logger.info(f"Ieškoma straipsnių: {url}")
-        straipsniai = gauti_straipsnius(url, max_straipsniu)
-        visi_straipsniai.extend(straipsniai)
-        time.sleep(1)  # Pauzė tarp užklausų
-        
-    logger.info(f"Rasta straipsnių: {len(visi_straipsniai)}")
-    return visi_straipsniai
-
-def gauti_straipsnio_turini(url):
-    """Gauna straipsnio tekstinį turinį"""
-    content = gauti_duomenis_is_url(url)
-    
-    if not content:
-        return ""
-        
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # Pašaliname nereikalingus elementus
-    for script in soup(["script", "style"]):
-        script.extract()
-    
-    # Gauname tekstą
-    text = soup.get_text(separator=' ')
-    
-    # Išvalome tekstą
-    lines = (line.strip() for line in text.splitlines())
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    text = ' '.join(chunk for chunk in chunks if chunk)
-    
-    return text
-
-def analizuoti_sentimenta(tekstas):
-    """Analizuoja teksto sentimentą"""
-    try:
-        # TextBlob analizė
-        blob = TextBlob(tekstas)
-        polarity = blob.sentiment.polarity      # Nuo -1 (neigiamas) iki 1 (teigiamas)
-        subjectivity = blob.sentiment.subjectivity  # Nuo 0 (objektyvus) iki 1 (subjektyvus)
-        
-        # NLTK Vader analizė
-        sia = SentimentIntensityAnalyzer()
-        vader_scores = sia.polarity_scores(tekstas)
-        
-        # Rezultatai
-        return {
-            "polarity": polarity,
-            "subjectivity": subjectivity,
-            "compound": vader_scores["compound"],
-            "neg": vader_scores["neg"],
-            "neu": vader_scores["neu"],
-            "pos": vader_scores["pos"]
-        }
-    except Exception as e:
-        logger.error(f"Klaida analizuojant sentimentą: {e}")
-        return {"polarity": 0, "subjectivity": 0, "compound": 0, "neg": 0, "neu": 0, "pos": 0}
-
-def analizuoti_naujienu_sentimenta(max_straipsniu=5):
-    """Analizuoja naujienų straipsnių sentimentą"""
-    # Gauname straipsnius
-    straipsniai = gauti_naujienu_straipsnius(max_straipsniu)
-    
-    if not straipsniai:
-        logger.warning("Nerasta straipsnių analizei")
-        return pd.DataFrame()
-    
-    rezultatai = []
-    
-    # Analizuojame kiekvieną straipsnį
-    for straipsnis in straipsniai:
-        # Gauname turinį
-        turinys = gauti_straipsnio_turini(straipsnis["url"])
-        
-        if not turinys:
-            turinys = straipsnis["title"]  # Jei nepavyko gauti turinio, naudojame antraštę
-        
-        # Analizuojame
-        sentimentas = analizuoti_sentimenta(turinys)
-        
-        # Nustatome sentimento kategoriją
-        if sentimentas["compound"] > 0.05:
-            sentiment_category = "positive"
-        elif sentimentas["compound"] < -0.05:
-            sentiment_category = "negative"
-        else:
-            sentiment_category = "neutral"
-        
-        # Pridedame rezultatą
-        rezultatai.append({
-            "title": straipsnis["title"],
-            "source": straipsnis["source"],
-            "url": straipsnis["url"],
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "polarity": sentimentas["polarity"],
-            "subjectivity": sentimentas["subjectivity"],
-            "compound": sentimentas["compound"],
-            "sentiment": sentiment_category
-        })
-        
-        time.sleep(1)  # Pauzė
-    
-    # Sukuriame DataFrame
-    df = pd.DataFrame(rezultatai)
-    
-    # Apskaičiuojame vidutinį sentimentą
-    vidutinis_sentimentas = df["compound"].mean() if not df.empty else 0
-    logger.info(f"Vidutinis sentimentas: {vidutinis_sentimentas:.2f} ({len(df)} straipsniai)")
-    
-    return df
-
-def prideti_sentimento_duomenis(kainu_df):
-    """Prideda sentimento duomenis prie kainų DataFrame"""
-    try:
-        df = kainu_df.copy()
-        
-        # Tikriname ar yra Date stulpelis
-        if 'Date' not in df.columns:
-            logger.error("Nėra 'Date' stulpelio - negalima pridėti sentimento duomenų")
-            return kainu_df
-        
-        # Gauname sentimento duomenis
-        sentimento_df = analizuoti_naujienu_sentimenta(max_straipsniu=10)
-        
-        if sentimento_df.empty:
-            # Pridedame tuščius stulpelius
-            df['Sentiment_Score'] = float('nan')
-            df['Sentiment_TextBlob'] = float('nan')
-            logger.warning("Nėra sentimento duomenų, pridėti tušti stulpeliai")
-            return df
-        
-        # Konvertuojame datas
-        sentimento_df['date'] = pd.to_datetime(sentimento_df['date'])
-        df['Date'] = pd.to_datetime(df['Date'])
-        
-        # Grupuojame duomenis
-        sentimento_agg = sentimento_df.groupby('date').agg({
-            'compound': 'mean',
-            'polarity': 'mean'
-        }).reset_index().rename(columns={
-            'compound': 'Sentiment_Score',
-            'polarity': 'Sentiment_TextBlob'
-        })
-        
-        # Sujungiame duomenis
-        df = pd.merge(df, sentimento_agg, left_on='Date', right_on='date', how='left')
-        if 'date' in df.columns:
-            df = df.drop('date', axis=1)
-        
-        # Užpildome trūkstamas reikšmes
-        df['Sentiment_Score'] = df['Sentiment_Score'].fillna(method='ffill').fillna(method='bfill')
-        df['Sentiment_TextBlob'] = df['Sentiment_TextBlob'].fillna(method='ffill').fillna(method='bfill')
-        
-        # Slankusis vidurkis
-        df['Sentiment_Score_SMA7'] = df['Sentiment_Score'].rolling(window=7).mean()
-        
-        logger.info("Sėkmingai pridėti sentimento duomenys")
-        return df
-    
-    except Exception as e:
-        logger.error(f"Klaida pridedant sentimento duomenis: {e}")
-        return kainu_df
-
 # ----- PAGRINDINĖS FUNKCIJOS -----
 
 def gauti_pilnus_btc_duomenis(periodas=DEFAULT_PERIOD, prideti_sentimenta=True):
@@ -412,28 +164,22 @@ def gauti_pilnus_btc_duomenis(periodas=DEFAULT_PERIOD, prideti_sentimenta=True):
     
     return df
 
-def issaugoti_i_duombaze(duomenys, db_session):
-    """Išsaugo duomenis į duomenų bazę"""
+def issaugoti_i_duombaze(duomenys, db_session, paketo_dydis=None):
+    """Išsaugo duomenis į duomenų bazę (upsert pagal timestamp, dideliais paketais)"""
     try:
         from database.models import BtcPrice
+        from database.bulk_writer import bulk_upsert
+        from data.btc_data import kainos_i_irasus
         
-        įrašų_skaičius = 0
-        
-        for _, eilute in duomenys.iterrows():
-            btc_kaina = BtcPrice(
-                timestamp=eilute['Date'],
-                open=eilute['Open'],
-                high=eilute['High'],
-                low=eilute['Low'],
-                close=eilute['Close'],
-                volume=eilute['Volume']
-            )
-            
-            db_session.add(btc_kaina)
-            įrašų_skaičius += 1
+        rezultatas = bulk_upsert(
+            kainos_i_irasus(duomenys), BtcPrice,
+            batch_size=paketo_dydis,
+            update_columns=['open', 'high', 'low', 'close', 'volume'],
+            bind=db_session.connection()
+        )
         
         db_session.commit()
-        logger.info(f"Išsaugoti {įrašų_skaičius} įrašai į DB")
+        logger.info(f"Išsaugoti {rezultatas['rows']} įrašai į DB")
         return True
     
     except Exception as e:
@@ -165,32 +165,75 @@ def paruosti_duomenis(pradzia=None, pabaiga=None, periodas=DEFAULT_PERIOD, inter
     logger.info(f"Sėkmingai paruošti {len(df)} įrašai")
     return df
 
-def issaugoti_i_duombaze(duomenys, db_session):
-    """Išsaugo duomenis į duomenų bazę"""
+def gauti_btc_kainas_dalimis(pradzia, pabaiga, intervalas=DEFAULT_INTERVAL, dalies_dienos=7):
+    """
+    Generatorius, kuris gauna Bitcoin kainas laiko dalimis.
+    Skirtas ilgiems minučių duomenų laikotarpiams - atmintyje laikoma tik viena dalis.
+    
+    Parametrai:
+        pradzia, pabaiga: Laikotarpio pradžia ir pabaiga
+        intervalas: Duomenų intervalas (pvz. '1m', '1h', '1d')
+        dalies_dienos: Kiek dienų gauti viena užklausa (Yahoo 1m duomenims leidžia 7)
+    """
+    dalies_pradzia = pd.Timestamp(pradzia)
+    pabaiga = pd.Timestamp(pabaiga)
+    
+    while dalies_pradzia < pabaiga:
+        dalies_pabaiga = min(dalies_pradzia + pd.Timedelta(days=dalies_dienos), pabaiga)
+        dalis = gauti_btc_kainas(dalies_pradzia, dalies_pabaiga, intervalas=intervalas)
+        if not dalis.empty:
+            yield dalis
+        dalies_pradzia = dalies_pabaiga
+
+def kainos_i_irasus(duomenys):
+    """
+    Paverčia yfinance DataFrame į btc_prices lentelės stulpelius
+    (timestamp, open, high, low, close, volume) vienu vektoriniu veiksmu
+    """
+    df = duomenys
+    
+    # Naujesnės yfinance versijos grąžina dviejų lygių stulpelius (pvz. ('Close', 'BTC-USD'))
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    
+    irasai = pd.DataFrame({
+        'timestamp': pd.to_datetime(df['Date']),
+        'open': df['Open'].astype(float),
+        'high': df['High'].astype(float),
+        'low': df['Low'].astype(float),
+        'close': df['Close'].astype(float),
+        'volume': df['Volume'].astype(float),
+    })
+    
+    # Laiko juostą turinčius laikus saugome kaip UTC be laiko juostos
+    if irasai['timestamp'].dt.tz is not None:
+        irasai['timestamp'] = irasai['timestamp'].dt.tz_convert('UTC').dt.tz_localize(None)
+    
+    # Tame pačiame pakete to paties laiko eilutė turi būti viena
+    return irasai.drop_duplicates(subset='timestamp', keep='last')
+
+def issaugoti_i_duombaze(duomenys, db_session, paketo_dydis=None):
+    """
+    Išsaugo duomenis į duomenų bazę dideliais paketais.
+    Jei toks timestamp jau yra - įrašas atnaujinamas, todėl pakartotinis
+    paleidimas lentelės nedidina.
+    """
     try:
         from database.models import BtcPrice
+        from database.bulk_writer import bulk_upsert
         
-        # Išsaugome duomenis
-        įrašų_skaičius = 0
-        
-        for _, eilute in duomenys.iterrows():
-            # Sukuriame naują įrašą
-            btc_kaina = BtcPrice(
-                timestamp=eilute['Date'],
-                open=eilute['Open'],
-                high=eilute['High'],
-                low=eilute['Low'],
-                close=eilute['Close'],
-                volume=eilute['Volume']
-            )
-            
-            # Pridedame į sesiją
-            db_session.add(btc_kaina)
-            įrašų_skaičius += 1
+        # Įrašome per sesijos ryšį, kad commit/rollback valdytų sesija
+        rezultatas = bulk_upsert(
+            kainos_i_irasus(duomenys), BtcPrice,
+            batch_size=paketo_dydis,
+            update_columns=['open', 'high', 'low', 'close', 'volume'],
+            bind=db_session.connection()
+        )
         
         # Įrašome pakeitimus
         db_session.commit()
-        logger.info(f"Išsaugoti {įrašų_skaičius} įrašai į DB")
+        logger.info(f"Išsaugoti {rezultatas['rows']} įrašai į DB")
         return True
     
     except Exception as e:
@@ -198,6 +241,24 @@ def issaugoti_i_duombaze(duomenys, db_session):
         logger.error(f"Klaida išsaugant į DB: {e}")
         return False
 
+def issaugoti_srautu(dalys, db_session, paketo_dydis=None):
+    """
+    Išsaugo duomenis dalimis (pvz. iš gauti_btc_kainas_dalimis()),
+    kiekvieną dalį patvirtinant atskirai - atmintyje niekada nėra visų metų duomenų.
+    
+    Grąžina:
+        int: Iš viso išsaugotų eilučių skaičius
+    """
+    is_viso = 0
+    for dalis in dalys:
+        if not issaugoti_i_duombaze(dalis, db_session, paketo_dydis):
+            logger.error(f"Srautinis išsaugojimas nutrauktas po {is_viso} eilučių")
+            break
+        is_viso += len(dalis)
+    
+    logger.info(f"Srautu išsaugota {is_viso} eilučių")
+    return is_viso
+
 # Jei šis failas vykdomas tiesiogiai
 if __name__ == "__main__":
     # Gauname duomenis
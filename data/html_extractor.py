@@ -0,0 +1,203 @@
+"""
+HTML turinio ištraukimas naujienų straipsniams.
+Yra du ištraukimo būdai:
+- 'lxml' - tiesiogiai lxml medis ir XPath (C parseris, greičiausias);
+- 'bs4'  - BeautifulSoup su SoupStrainer: analizuojami tik reikalingi elementai,
+           o parseris - lxml, jei įdiegtas, kitu atveju html.parser.
+Numatytasis būdas - 'lxml', jei biblioteka įdiegta (galima keisti per HTML_EXTRACTOR).
+"""
+
+# ----- IMPORTAI -----
+import os       # Aplinkos kintamiesiems nuskaityti
+import re       # Tarpų normalizavimui vienu reguliariuoju reiškiniu
+import logging  # Įvykių registravimui
+from bs4 import BeautifulSoup, SoupStrainer   # Atsarginis parseris ir dalinis analizavimas
+
+# lxml nebūtina - be jos naudojamas BeautifulSoup su html.parser
+try:
+    import lxml.html   # C pagrindu veikiantis HTML parseris
+    from lxml import etree
+    LXML_YRA = True
+except ImportError:
+    LXML_YRA = False
+
+logger = logging.getLogger("html_extractor")
+
+# ----- KONSTANTOS -----
+# BeautifulSoup parseris - lxml kelis kartus greitesnis už gryną Python html.parser
+BS4_PARSER = 'lxml' if LXML_YRA else 'html.parser'
+
+# Elementai be naudingo teksto - pašalinami prieš ištraukiant tekstą
+NEREIKALINGOS_ZYMES = ('script', 'style', 'noscript')
+
+# Straipsnio turinio konteineris - jei jo puslapyje nėra, imamas visas puslapis
+STRAIPSNIO_ZYMES = ('article',)
+
+# Bet kokia tarpų seka (tarpai, tabuliacijos, naujos eilutės) keičiama vienu tarpu
+TARPAI_RE = re.compile(r'\s+')
+
+# Naujienų sąrašų išdėstymas kiekvienai svetainei: elementai nurodomi (žymė, klasė),
+# kad tą patį aprašymą galėtų naudoti ir lxml (XPath), ir BeautifulSoup (find_all)
+SALTINIU_ISDESTYMAS = {
+    "cointelegraph.com": {
+        "source": "Cointelegraph",
+        "base": "https://cointelegraph.com",
+        "item": ("article", None),  # Kiekvienas straipsnis - 'article' elementas
+        "title": ("h2", None),      # Antraštė - h2 elementas
+    },
+    "coindesk.com": {
+        "source": "Coindesk",
+        "base": "https://www.coindesk.com",
+        "item": (None, "article-card"),
+        "title": (None, "article-card-title"),
+    },
+    "cryptonews.com": {
+        "source": "Cryptonews",
+        "base": "https://cryptonews.com",
+        "item": (None, "category-posts__post"),
+        "title": (None, "category-posts__post-title"),
+    },
+}
+
+# ----- BENDROS FUNKCIJOS -----
+def normalizuoti_tarpus(tekstas):
+    """Sutraukia visas tarpų sekas į vieną tarpą ir pašalina tarpus kraštuose"""
+    return TARPAI_RE.sub(' ', tekstas).strip()
+
+def rasti_isdestyma(url):
+    """Grąžina svetainės sąrašo išdėstymą pagal URL arba None, jei svetainė nežinoma"""
+    for domenas, isdestymas in SALTINIU_ISDESTYMAS.items():
+        if domenas in url:
+            return isdestymas
+    return None
+
+def _pilnas_url(href, isdestymas):
+    """Santykinę nuorodą paverčia pilnu URL"""
+    return href if href.startswith('http') else f"{isdestymas['base']}{href}"
+
+# ----- LXML -----
+def _xpath(zyme, klase, kelias='//'):
+    """XPath elementui pagal žymę ir (ar) klasę (klasė tikrinama kaip atskiras žodis)"""
+    xpath = f"{kelias}{zyme or '*'}"
+    if klase:
+        xpath += f"[contains(concat(' ', normalize-space(@class), ' '), ' {klase} ')]"
+    return xpath
+
+def _lxml_dokumentas(content):
+    """lxml dokumentas arba None, jei puslapis tuščias (tik tarpai ar komentarai)"""
+    try:
+        return lxml.html.document_fromstring(content)
+    except etree.ParserError:
+        return None
+
+def _lxml_medis(content):
+    """Sukuria lxml medį be komentarų, skriptų ir stilių (None - tuščias puslapis)"""
+    medis = _lxml_dokumentas(content)
+    if medis is None:
+        return None
+    etree.strip_elements(medis, etree.Comment, *NEREIKALINGOS_ZYMES, with_tail=False)
+    return medis
+
+def lxml_straipsniai(content, isdestymas, max_straipsniu):
+    """Straipsnių sąrašas iš naujienų puslapio (lxml)"""
+    medis = _lxml_dokumentas(content)
+    if medis is None:
+        return []
+    straipsniai = []
+    for elementas in medis.xpath(_xpath(*isdestymas["item"]))[:max_straipsniu]:
+        antraste = elementas.xpath(_xpath(*isdestymas["title"], kelias='.//'))
+        nuoroda = elementas.xpath('.//a[@href]')
+        if antraste and nuoroda:
+            straipsniai.append({
+                "title": antraste[0].text_content().strip(),
+                "url": _pilnas_url(nuoroda[0].get('href'), isdestymas),
+                "source": isdestymas["source"],
+            })
+    return straipsniai
+
+def lxml_tekstas(content):
+    """Straipsnio tekstas (lxml) - tik iš straipsnio konteinerio, jei jis yra"""
+    medis = _lxml_medis(content)
+    if medis is None:
+        return ""
+    elementai = [el for zyme in STRAIPSNIO_ZYMES for el in medis.iter(zyme)] or [medis]
+    return normalizuoti_tarpus(' '.join(tekstas for el in elementai for tekstas in el.itertext()))
+
+# ----- BEAUTIFULSOUP -----
+def _bs4_filtras(zyme, klase):
+    """find_all/SoupStrainer argumentai (class_=None reikštų "be klasės", todėl jo neperduodame)"""
+    return (zyme,), ({'class_': klase} if klase else {})
+
+def bs4_straipsniai(content, isdestymas, max_straipsniu):
+    """Straipsnių sąrašas iš naujienų puslapio (BeautifulSoup, analizuojami tik straipsnių elementai)"""
+    args, kwargs = _bs4_filtras(*isdestymas["item"])
+    antrastes_args, antrastes_kwargs = _bs4_filtras(*isdestymas["title"])
+    # SoupStrainer - į medį patenka tik straipsnių elementai (su vidiniais elementais)
+    soup = BeautifulSoup(content, BS4_PARSER, parse_only=SoupStrainer(*args, **kwargs))
+    straipsniai = []
+    for elementas in soup.find_all(*args, **kwargs)[:max_straipsniu]:
+        antraste = elementas.find(*antrastes_args, **antrastes_kwargs)
+        nuoroda = elementas.find('a', href=True)
+        if antraste and nuoroda:
+            straipsniai.append({
+                "title": antraste.text.strip(),
+                "url": _pilnas_url(nuoroda.get('href'), isdestymas),
+                "source": isdestymas["source"],
+            })
+    return straipsniai
+
+def bs4_tekstas(content):
+    """Straipsnio tekstas (BeautifulSoup) - tik iš straipsnio konteinerio, jei jis yra"""
+    soup = BeautifulSoup(content, BS4_PARSER, parse_only=SoupStrainer(STRAIPSNIO_ZYMES))
+    if not soup.contents:
+        # Konteinerio nėra - analizuojame visą puslapį
+        soup = BeautifulSoup(content, BS4_PARSER)
+    for zyme in soup(NEREIKALINGOS_ZYMES):
+        zyme.extract()
+    return normalizuoti_tarpus(soup.get_text(separator=' '))
+
+# ----- PASIRINKIMAS -----
+EKSTRAKTORIAI = {
+    'bs4': {'straipsniai': bs4_straipsniai, 'tekstas': bs4_tekstas},
+}
+if LXML_YRA:
+    EKSTRAKTORIAI['lxml'] = {'straipsniai': lxml_straipsniai, 'tekstas': lxml_tekstas}
+
+NUMATYTASIS_EKSTRAKTORIUS = os.environ.get("HTML_EXTRACTOR", 'lxml' if LXML_YRA else 'bs4')
+
+def gauti_ekstraktoriu(pavadinimas=None):
+    """
+    Grąžina ištraukimo funkcijas {'straipsniai', 'tekstas'}.
+    Jei prašomas lxml, bet jis neįdiegtas - naudojamas bs4.
+    """
+    pavadinimas = pavadinimas or NUMATYTASIS_EKSTRAKTORIUS
+    if pavadinimas not in EKSTRAKTORIAI:
+        logger.warning(f"HTML ištraukimo būdas '{pavadinimas}' nepasiekiamas - naudojamas bs4")
+        pavadinimas = 'bs4'
+    return EKSTRAKTORIAI[pavadinimas]
+
+def istraukti_straipsnius(content, url, max_straipsniu=10, ekstraktorius=None):
+    """
+    Ištraukia straipsnių antraštes ir nuorodas iš naujienų puslapio.
+
+    Grąžina:
+        list: [{'title', 'url', 'source'}] (tuščias, jei svetainė nežinoma)
+    """
+    isdestymas = rasti_isdestyma(url)
+    if not content:
+        return []
+    if isdestymas is None:
+        logger.warning(f"Nežinoma naujienų svetainė: {url}")
+        return []
+    return gauti_ekstraktoriu(ekstraktorius)['straipsniai'](content, isdestymas, max_straipsniu)
+
+def istraukti_teksta(content, ekstraktorius=None):
+    """
+    Ištraukia išvalytą straipsnio tekstą iš HTML.
+
+    Grąžina:
+        str: Tekstas be HTML, skriptų ir perteklinių tarpų
+    """
+    if not content:
+        return ""
+    return gauti_ekstraktoriu(ekstraktorius)['tekstas'](content)
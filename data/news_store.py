@@ -0,0 +1,231 @@
+"""
+Naujienų straipsnių saugykla.
+Straipsniai ir jų sentimento įverčiai saugomi news_articles lentelėje pagal URL.
+Jau matyti straipsniai tikrinami sąlyginėmis užklausomis (ETag/Last-Modified),
+o pasikeitęs HTML iš naujo vertinamas tik tada, kai pasikeitė ištrauktas tekstas.
+Dienos sentimento vidurkiai skaičiuojami iš saugyklos, o ne iš naujo naršant svetaines.
+"""
+
+# ----- IMPORTAI -----
+import os
+import re
+import sys
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import func
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.config import SessionLocal
+from database.models import NewsArticle
+from data.sentiment_analysis import (
+    MAX_WORKERS, NUMATYTIEJI_VERTINTOJAI, gauti_naujienu_straipsnius, gauti_salygiskai,
+    analizuoti_sentimenta_paketu, _patikrinti_vertintojus
+)
+from data.html_extractor import istraukti_teksta
+
+logger = logging.getLogger("news_store")
+
+# ----- KONSTANTOS -----
+# Per kiek valandų nuo paskutinės užklausos straipsnio visai netikriname
+# (vėliau - tikriname sąlygine užklausa, kuri nepasikeitusiam straipsniui grąžina 304)
+NEWS_REFRESH_HOURS = float(os.environ.get("NEWS_REFRESH_HOURS", 6))
+
+# Kuris stulpelis rodo, kad straipsnis jau įvertintas šiuo vertintoju
+VERTINTOJO_STULPELIS = {'vader': 'compound', 'textblob': 'polarity'}
+
+# Straipsnio paskelbimo laikas (Open Graph meta žymė)
+PASKELBIMO_LAIKAS_RE = re.compile(
+    rb'<meta[^>]+property=["\']article:published_time["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE
+)
+
+# ----- FUNKCIJOS -----
+def teksto_maisa(tekstas):
+    """Grąžina teksto sha256 maišą (šešioliktainiu formatu)"""
+    return hashlib.sha256(tekstas.encode('utf-8')).hexdigest()
+
+def istraukti_paskelbimo_laika(content):
+    """
+    Ištraukia straipsnio paskelbimo laiką iš article:published_time meta žymės.
+
+    Grąžina:
+        datetime (UTC, be laiko juostos) arba None, jei žymės nėra ar jos nepavyko perskaityti
+    """
+    atitikmuo = PASKELBIMO_LAIKAS_RE.search(content or b"")
+    if not atitikmuo:
+        return None
+    try:
+        laikas = pd.Timestamp(atitikmuo.group(1).decode('utf-8', 'ignore'))
+        if laikas.tzinfo is not None:
+            laikas = laikas.tz_convert('UTC').tz_localize(None)
+        return laikas.to_pydatetime()
+    except Exception:
+        return None
+
+def _ivertintas(irasas, vertintojai):
+    """Ar įraše yra visų nurodytų vertintojų įverčiai"""
+    return all(getattr(irasas, VERTINTOJO_STULPELIS[v]) is not None for v in vertintojai)
+
+def atnaujinti_straipsnius(max_straipsniu=10, saltiniai=None, max_workers=MAX_WORKERS,
+                           vertintojai=NUMATYTIEJI_VERTINTOJAI, session=None):
+    """
+    Suranda naujausius straipsnius ir atnaujina saugyklą.
+
+    - nauji straipsniai atsiunčiami ir įvertinami;
+    - neseniai (per NEWS_REFRESH_HOURS) tikrinti straipsniai praleidžiami be užklausos;
+    - kiti tikrinami sąlygine užklausa - 304 atsakymas nieko nekainuoja;
+    - jei HTML pasikeitė, bet ištrauktas tekstas toks pat (sutampa maiša), įverčiai paliekami.
+
+    Parametrai:
+        max_straipsniu (int): Maksimalus straipsnių skaičius iš kiekvieno šaltinio
+        saltiniai (list): Šaltinių URL sąrašas (pagal nutylėjimą - NEWS_SOURCES)
+        max_workers (int): Kiek užklausų vykdyti vienu metu
+        vertintojai (tuple): Sentimento vertintojai - 'vader', 'textblob' arba abu
+        session: DB sesija (pagal nutylėjimą sukuriama nauja)
+
+    Grąžina:
+        dict: Statistika (found, skipped, not_modified, unchanged, scored, failed) arba None, jei įvyko klaida
+    """
+    vertintojai = _patikrinti_vertintojus(vertintojai)
+    nuosava_sesija = session is None
+    session = session or SessionLocal()
+    statistika = {'found': 0, 'skipped': 0, 'not_modified': 0, 'unchanged': 0, 'scored': 0, 'failed': 0}
+    try:
+        straipsniai = gauti_naujienu_straipsnius(max_straipsniu, saltiniai, max_workers)
+        # Tas pats straipsnis gali būti keliuose šaltiniuose - paliekame pirmą
+        matyti = set()
+        unikalus = []
+        for straipsnis in straipsniai:
+            if straipsnis['url'] not in matyti:
+                matyti.add(straipsnis['url'])
+                unikalus.append(straipsnis)
+        straipsniai = unikalus
+        statistika['found'] = len(straipsniai)
+        if not straipsniai:
+            logger.warning("Nerasta straipsnių saugyklai atnaujinti")
+            return statistika
+
+        # Jau saugomi straipsniai viena užklausa
+        urls = [straipsnis['url'] for straipsnis in straipsniai]
+        esami = {irasas.url: irasas for irasas in
+                 session.query(NewsArticle).filter(NewsArticle.url.in_(urls)).all()}
+
+        dabar = datetime.utcnow()
+        riba = dabar - timedelta(hours=NEWS_REFRESH_HOURS)
+        tikrinti = []
+        for straipsnis in straipsniai:
+            irasas = esami.get(straipsnis['url'])
+            ivertintas = irasas is not None and _ivertintas(irasas, vertintojai)
+            if ivertintas and irasas.fetched_at and irasas.fetched_at > riba:
+                statistika['skipped'] += 1
+                continue
+            # Neįvertintam straipsniui reikia turinio, todėl sąlyginių antraščių nesiunčiame
+            etag = irasas.etag if ivertintas else None
+            last_modified = irasas.last_modified if ivertintas else None
+            tikrinti.append((straipsnis, irasas, etag, last_modified))
+
+        # Lygiagrečios (sąlyginės) užklausos - ribotuvas riboja dažnį kiekvienam serveriui
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            atsakymai = list(executor.map(lambda t: gauti_salygiskai(t[0]['url'], t[2], t[3]), tikrinti))
+
+        vertinti = []
+        for (straipsnis, irasas, _, _), atsakymas in zip(tikrinti, atsakymai):
+            if irasas is None:
+                irasas = NewsArticle(url=straipsnis['url'], source=straipsnis['source'],
+                                     title=straipsnis['title'], first_seen_at=dabar)
+                session.add(irasas)
+
+            if atsakymas is None:
+                statistika['failed'] += 1
+                if _ivertintas(irasas, vertintojai):
+                    continue
+                # Kaip ir anksčiau - jei turinio gauti nepavyko, vertiname antraštę.
+                # fetched_at nenustatome, todėl kitą kartą bandysime dar kartą
+                vertinti.append((irasas, straipsnis['title'], None))
+                continue
+
+            irasas.fetched_at = dabar
+            irasas.etag = atsakymas['etag']
+            irasas.last_modified = atsakymas['last_modified']
+            if atsakymas['status'] == 304:
+                statistika['not_modified'] += 1
+                continue
+
+            irasas.published_at = istraukti_paskelbimo_laika(atsakymas['content']) or irasas.published_at
+            tekstas = istraukti_teksta(atsakymas['content']) or straipsnis['title']
+            maisa = teksto_maisa(tekstas)
+            if maisa == irasas.content_hash and _ivertintas(irasas, vertintojai):
+                statistika['unchanged'] += 1
+                continue
+            vertinti.append((irasas, tekstas, maisa))
+
+        # Vertiname tik naujus arba pasikeitusius tekstus - vienu paketu
+        sentimentai = analizuoti_sentimenta_paketu([tekstas for _, tekstas, _ in vertinti], vertintojai)
+        for (irasas, _, maisa), sentimentas in zip(vertinti, sentimentai):
+            for stulpelis in ('polarity', 'subjectivity', 'compound', 'neg', 'neu', 'pos'):
+                # Nenaudoto vertintojo senų įverčių neištriname
+                if sentimentas[stulpelis] is not None:
+                    setattr(irasas, stulpelis, sentimentas[stulpelis])
+            irasas.content_hash = maisa
+            irasas.scored_at = dabar
+        statistika['scored'] = len(vertinti)
+
+        session.commit()
+        logger.info(f"Straipsnių saugykla atnaujinta: {statistika}")
+        return statistika
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Klaida atnaujinant straipsnių saugyklą: {e}")
+        return None
+    finally:
+        if nuosava_sesija:
+            session.close()
+
+def dienos_sentimentas(nuo=None, iki=None, session=None):
+    """
+    Dienos sentimento vidurkiai iš saugyklos.
+    Straipsnio diena - paskelbimo data, o jei jos nėra - data, kai straipsnis pirmą kartą rastas.
+
+    Parametrai:
+        nuo, iki: Datų intervalas (imtinai), None - be ribos
+        session: DB sesija (pagal nutylėjimą sukuriama nauja)
+
+    Grąžina:
+        pandas.DataFrame: date, Sentiment_Score, Sentiment_TextBlob, articles
+                          (tuščias, jei duomenų nėra arba įvyko klaida)
+    """
+    nuosava_sesija = session is None
+    session = session or SessionLocal()
+    try:
+        diena = func.date(func.coalesce(NewsArticle.published_at, NewsArticle.first_seen_at))
+        uzklausa = session.query(
+            diena.label('date'),
+            func.avg(NewsArticle.compound).label('Sentiment_Score'),
+            func.avg(NewsArticle.polarity).label('Sentiment_TextBlob'),
+            func.count(NewsArticle.id).label('articles'),
+        ).filter(NewsArticle.scored_at.isnot(None))
+        if nuo is not None:
+            uzklausa = uzklausa.filter(diena >= pd.Timestamp(nuo).date())
+        if iki is not None:
+            uzklausa = uzklausa.filter(diena <= pd.Timestamp(iki).date())
+        eilutes = uzklausa.group_by(diena).order_by(diena).all()
+
+        df = pd.DataFrame(eilutes, columns=['date', 'Sentiment_Score', 'Sentiment_TextBlob', 'articles'])
+        df['date'] = pd.to_datetime(df['date'])
+        df[['Sentiment_Score', 'Sentiment_TextBlob']] = df[['Sentiment_Score', 'Sentiment_TextBlob']].astype(float)
+        return df
+    except Exception as e:
+        logger.error(f"Klaida skaičiuojant dienos sentimentą: {e}")
+        return pd.DataFrame()
+    finally:
+        if nuosava_sesija:
+            session.close()
+
+# Jei failas vykdomas tiesiogiai (ne importuojamas kaip modulis)
+if __name__ == "__main__":
+    print(atnaujinti_straipsnius(max_straipsniu=10))
+    print(dienos_sentimentas())
@@ -6,27 +6,25 @@ ir surenka informaciją iš populiarių kriptovaliutų naujienų tinklalapių.
 """
 
 # ----- IMPORTAI -----
+import os           # Aplinkos kintamiesiems nuskaityti
 import requests     # HTTP užklausoms atlikti - gauti duomenis iš tinklalapių
 import pandas as pd    # Duomenų apdorojimui ir analizei su DataFrame struktūromis
 from datetime import datetime   # Darbui su datomis ir laiku
 import logging      # Įvykių registravimui (logging) - sistemos pranešimams
-import time         # Laiko operacijoms - uždelsti tarp užklausų
+import time         # Laiko operacijoms - pauzėms tarp užklausų į tą patį serverį
 import random       # Atsitiktinumui - atsitiktiniam User-Agent pasirinkimui
-from bs4 import BeautifulSoup   # HTML analizei ir duomenų ištraukimui iš tinklalapių
-from textblob import TextBlob   # Teksto sentimento analizei
-import nltk         # Natūralios kalbos apdorojimo biblioteka
-
-# Atsisiunčiame NLTK duomenis jei reikia
-# NLTK Vader reikalauja specialių žodynų analizei, čia tikriname ar jie jau įdiegti
-# Jei neįdiegti, juos atsisiunčiame automatiškai - tai būtina sentimento analizei
-try:
-    nltk.data.find('vader_lexicon')  # Tikriname ar Vader leksikonas jau įdiegtas sistemoje
-except LookupError:  # Jei leksikono nėra, atsisiunčiame jį
-    nltk.download('vader_lexicon')  # Atsisiunčiame Vader leksikoną, kuriame yra žodžių jausmų įverčiai
-
-# Importuojame SentimentIntensityAnalyzer iš NLTK bibliotekos - šis įrankis leidžia
-# atlikti greitą ir tikslų sentimento vertinimą, ypač tinkamą trumpiems tekstams
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import threading    # Užraktams - keli thread'ai dalijasi ta pačia sesija ir ribotuvu
+from urllib.parse import urlparse   # Serverio (host) išskyrimui iš URL
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor   # Lygiagrečiam atsisiuntimui ir vertinimui
+from requests.adapters import HTTPAdapter   # Prisijungimų telkinio dydžiui nustatyti
+import sys          # Kelio papildymui, kad modulį būtų galima paleisti tiesiogiai
+
+# Šis kelias leidžia importuoti modulius iš kitų direktorijų
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.html_extractor import istraukti_straipsnius, istraukti_teksta   # Greitas HTML ištraukimas (lxml, jei įdiegtas)
+
+# NLTK ir TextBlob importuojami tik pirmą kartą vertinant sentimentą (žr. gauti_vader()),
+# todėl šio modulio importas nelėtina programos paleidimo ir nesiunčia žodynų
 
 # Logerio nustatymai - konfigūruojame programos pranešimų sistemą
 # Tai padeda sekti programos vykdymą ir geriau suprasti klaidas
@@ -56,6 +54,95 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15"  # Safari Mac
 ]
 
+# Kiek užklausų vienu metu siunčiama (skirtingiems serveriams jos vyksta lygiagrečiai)
+MAX_WORKERS = int(os.environ.get("NEWS_FETCH_WORKERS", 8))
+
+# Mažiausias laikas sekundėmis tarp dviejų užklausų į tą patį serverį
+# Vietoj bendros 1 s pauzės po kiekvieno straipsnio - skirtingi serveriai vienas kito nelaukia
+HOST_MIN_INTERVAL = float(os.environ.get("NEWS_HOST_INTERVAL", 1.0))
+
+# Laiko limitai sekundėmis: (prisijungimas, atsakymo skaitymas)
+REQUEST_TIMEOUT = (5, 10)
+
+# Sentimento vertintojai: 'vader' (NLTK Vader) ir 'textblob' (TextBlob polarity/subjectivity)
+# Numatytuosius galima pakeisti aplinkos kintamuoju, pvz. SENTIMENT_SCORERS=vader
+VISI_VERTINTOJAI = ('vader', 'textblob')
+NUMATYTIEJI_VERTINTOJAI = tuple(
+    v.strip() for v in os.environ.get("SENTIMENT_SCORERS", ",".join(VISI_VERTINTOJAI)).split(",") if v.strip()
+)
+
+# Nuo kiek tekstų vertinimas skirstomas per procesus (mažiau - greičiau viename procese)
+PROCESU_RIBA = int(os.environ.get("SENTIMENT_POOL_THRESHOLD", 200))
+
+# Kiek tekstų siunčiama vienam procesui vienu kartu
+PAKETO_DYDIS = 50
+
+# ----- UŽKLAUSŲ RIBOJIMAS -----
+class HostRateLimiter:
+    """
+    Užklausų į tą patį serverį ribotuvas.
+    
+    Kiekvienam serveriui (host) įsimena, kada galima siųsti kitą užklausą.
+    Thread'as, norintis siųsti užklausą, gauna sekantį laisvą laiko tarpą
+    ir palaukia tik tiek, kiek reikia - užklausos į kitus serverius nelaukia.
+    """
+    
+    def __init__(self, interval=HOST_MIN_INTERVAL):
+        self.interval = interval  # Mažiausias tarpas tarp užklausų į tą patį serverį
+        self._next_time = {}  # Serveris -> laikas, nuo kurio galima siųsti kitą užklausą
+        self._lock = threading.Lock()  # Apsaugo _next_time nuo kelių thread'ų vienu metu
+    
+    def wait(self, url):
+        """Palaukia, kol bus galima siųsti užklausą į šio URL serverį"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            # Rezervuojame artimiausią laisvą laiką šiam serveriui
+            slot = max(now, self._next_time.get(host, now))
+            self._next_time[host] = slot + self.interval
+        # Laukiame už užrakto ribų, kad kiti serveriai nebūtų blokuojami
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+# Bendra sesija ir ribotuvas visam moduliui (sukuriami pirmo naudojimo metu)
+_sesija = None
+_ribotuvas = None
+_bendras_lock = threading.Lock()
+
+def sukurti_sesija(max_workers=MAX_WORKERS):
+    """
+    Sukuria requests.Session su keep-alive prisijungimais.
+    
+    Sesija pakartotinai naudoja TCP/TLS prisijungimus tam pačiam serveriui,
+    todėl kiekvienam straipsniui nereikia iš naujo jungtis.
+    
+    Parametrai:
+        max_workers (int): Kiek prisijungimų vienam serveriui laikyti telkinyje
+    
+    Grąžina:
+        requests.Session: Paruošta sesija
+    """
+    sesija = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(NEWS_SOURCES) * 2, pool_maxsize=max_workers)
+    sesija.mount("http://", adapter)
+    sesija.mount("https://", adapter)
+    # Vienas User-Agent visai sesijai - kaip tikra naršyklė
+    sesija.headers["User-Agent"] = gauti_atsitiktini_user_agent()
+    return sesija
+
+def gauti_bendra_sesija():
+    """Grąžina bendrą modulio sesiją ir ribotuvą (prireikus juos sukuria)"""
+    global _sesija, _ribotuvas
+    with _bendras_lock:
+        if _sesija is None:
+            _sesija = sukurti_sesija()
+            _ribotuvas = HostRateLimiter()
+        return _sesija, _ribotuvas
+
+# Šaltinių sąrašų puslapių ETag/Last-Modified ir ištraukti straipsniai (šiame procese)
+_saltiniu_talpykla = {}
+
 # ----- FUNKCIJOS -----
 def gauti_atsitiktini_user_agent():
     """
@@ -69,26 +156,35 @@ def gauti_atsitiktini_user_agent():
     """
     return random.choice(USER_AGENTS)  # Išrenkame ir grąžiname atsitiktinę reikšmę iš sąrašo
 
-def gauti_duomenis_is_url(url, timeout=10):
+def gauti_duomenis_is_url(url, timeout=REQUEST_TIMEOUT, sesija=None, ribotuvas=None):
     """
     Funkcija gauna duomenis (HTML) iš nurodyto URL adreso.
     
-    Siunčia HTTP GET užklausą į nurodytą tinklalapį, naudodama atsitiktinį User-Agent.
+    Siunčia HTTP GET užklausą per bendrą keep-alive sesiją. Prieš užklausą
+    palaukia, jei į tą patį serverį ką tik buvo kreiptasi (ribotuvas).
     Nustato laiko limitą, kad užklausa neužstrigtų per ilgai.
     
     Parametrai:
         url (str): Tinklalapio URL adresas, iš kurio norime gauti duomenis
-        timeout (int): Maksimalus laukimo laikas sekundėmis, kol nutrauks užklausą
+        timeout: Maksimalus laukimo laikas sekundėmis (arba (prisijungimas, skaitymas))
+        sesija (requests.Session): Sesija (pagal nutylėjimą - bendra modulio sesija)
+        ribotuvas (HostRateLimiter): Ribotuvas (pagal nutylėjimą - bendras modulio ribotuvas)
     
     Grąžina:
         bytes arba None: Tinklalapio HTML turinys baitų formatu arba None, jei įvyko klaida
     """
     try:
-        # Sukuriame antraštę su atsitiktiniu User-Agent, kad tinklalapis manytų, jog esame tikras naršytojas
-        headers = {"User-Agent": gauti_atsitiktini_user_agent()}
+        # Jei sesija ar ribotuvas neperduoti - naudojame bendrus
+        if sesija is None or ribotuvas is None:
+            bendra_sesija, bendras_ribotuvas = gauti_bendra_sesija()
+            sesija = sesija or bendra_sesija
+            ribotuvas = ribotuvas or bendras_ribotuvas
         
-        # Siunčiame GET užklausą į nurodytą URL su mūsų antraštėmis ir laiko limitu
-        response = requests.get(url, headers=headers, timeout=timeout)
+        # Laukiame savo eilės šiam serveriui
+        ribotuvas.wait(url)
+        
+        # Siunčiame GET užklausą per sesiją (User-Agent nustatytas sesijoje) su laiko limitu
+        response = sesija.get(url, timeout=timeout)
         
         # Tikriname ar užklausa sėkminga (HTTP statusas 200 OK)
         if response.status_code != 200:
@@ -103,7 +199,58 @@ def gauti_duomenis_is_url(url, timeout=10):
         logger.error(f"Klaida: {e}")
         return None
 
-def gauti_straipsnius(url, max_straipsniu=10):
+def gauti_salygiskai(url, etag=None, last_modified=None, timeout=REQUEST_TIMEOUT, sesija=None, ribotuvas=None):
+    """
+    Sąlyginė GET užklausa (If-None-Match / If-Modified-Since).
+    
+    Jei serveris atsako 304 Not Modified, turinys nesiunčiamas - taip
+    nepasikeitę straipsniai nekainuoja nei srauto, nei apdorojimo.
+    
+    Parametrai:
+        url (str): Tinklalapio URL adresas
+        etag (str): Ankstesnio atsakymo ETag antraštė
+        last_modified (str): Ankstesnio atsakymo Last-Modified antraštė
+        timeout, sesija, ribotuvas: Kaip gauti_duomenis_is_url()
+    
+    Grąžina:
+        dict arba None: {'status': 200 arba 304, 'content': bytes arba None,
+                         'etag': str, 'last_modified': str} arba None, jei įvyko klaida
+    """
+    try:
+        # Jei sesija ar ribotuvas neperduoti - naudojame bendrus
+        if sesija is None or ribotuvas is None:
+            bendra_sesija, bendras_ribotuvas = gauti_bendra_sesija()
+            sesija = sesija or bendra_sesija
+            ribotuvas = ribotuvas or bendras_ribotuvas
+        
+        # Sąlyginės antraštės - serveris gali atsakyti 304 be turinio
+        antrastes = {}
+        if etag:
+            antrastes["If-None-Match"] = etag
+        if last_modified:
+            antrastes["If-Modified-Since"] = last_modified
+        
+        ribotuvas.wait(url)
+        response = sesija.get(url, headers=antrastes, timeout=timeout)
+        
+        if response.status_code == 304:
+            # Turinys nepasikeitė - paliekame senas antraštes, jei serveris naujų neatsiuntė
+            return {"status": 304, "content": None,
+                    "etag": response.headers.get("ETag", etag),
+                    "last_modified": response.headers.get("Last-Modified", last_modified)}
+        
+        if response.status_code != 200:
+            logger.warning(f"Klaida gaunant duomenis iš {url}: {response.status_code}")
+            return None
+        
+        return {"status": 200, "content": response.content,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")}
+    except Exception as e:
+        logger.error(f"Klaida: {e}")
+        return None
+
+def gauti_straipsnius(url, max_straipsniu=10, sesija=None, ribotuvas=None):
     """
     Ištraukia straipsnius iš nurodytos naujienų svetainės.
     
@@ -113,99 +260,63 @@ def gauti_straipsnius(url, max_straipsniu=10):
     Parametrai:
         url (str): Tinklalapio URL adresas
         max_straipsniu (int): Maksimalus straipsnių skaičius, kurį norime ištraukti
+        sesija, ribotuvas: Perduodami gauti_duomenis_is_url()
     
     Grąžina:
         list: Straipsnių sąrašas, kur kiekvienas straipsnis yra žodynas su antrašte, URL ir šaltiniu
     """
-    # Sukuriame tuščią sąrašą straipsniams
-    straipsniai = []
-    
-    # Gauname tinklalapio turinį
-    content = gauti_duomenis_is_url(url)
+    # Gauname tinklalapio turinį sąlygine užklausa - jei sąrašas nepasikeitė nuo
+    # paskutinio karto, serveris atsako 304 ir naudojame jau ištrauktus straipsnius
+    raktas = (url, max_straipsniu)
+    ankstesnis = _saltiniu_talpykla.get(raktas, {})
+    atsakymas = gauti_salygiskai(url, ankstesnis.get("etag"), ankstesnis.get("last_modified"),
+                                 sesija=sesija, ribotuvas=ribotuvas)
     
     # Jei turinio negavome, grąžiname tuščią sąrašą
-    if not content:
+    if atsakymas is None:
         return []
+    if atsakymas["status"] == 304:
+        logger.info(f"Straipsnių sąrašas nepasikeitė: {url}")
+        return list(ankstesnis["straipsniai"])
+    content = atsakymas["content"]
     
-    # Sukuriame BeautifulSoup objektą HTML analizei
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # Atpažįstame svetainę pagal URL ir taikome atitinkamą duomenų ištraukimo logiką
-    if "cointelegraph.com" in url:
-        # Cointelegraph straipsnių ištraukimas
-        # Ieškome visų 'article' elementų ir pasirenkame tik tiek, kiek nurodyta max_straipsniu
-        for article in soup.select('article')[:max_straipsniu]:
-            # Ieškome antraštės h2 elemente
-            title = article.select_one('h2')
-            # Ieškome nuorodos a elemente
-            link = article.select_one('a')
-            
-            # Jei radome ir antraštę, ir nuorodą
-            if title and link:
-                # Sukuriame straipsnio žodyną ir pridedame į sąrašą
-                # Tikriname ar nuoroda pilna, jei ne - pridedame domeno adresą
-                straipsniai.append({
-                    "title": title.text.strip(),  # Ištraukiame antraštės tekstą ir pašaliname tarpus pradžioje/pabaigoje
-                    "url": link.get('href') if link.get('href').startswith('http') else f"https://cointelegraph.com{link.get('href')}",
-                    "source": "Cointelegraph"  # Nurodome šaltinį
-                })
-    elif "coindesk.com" in url:
-        # Coindesk straipsnių ištraukimas - logika panaši, tik skiriasi HTML elementų klasės
-        for article in soup.select('.article-card')[:max_straipsniu]:
-            title = article.select_one('.article-card-title')
-            link = article.select_one('a')
-            
-            if title and link:
-                straipsniai.append({
-                    "title": title.text.strip(),
-                    "url": link.get('href') if link.get('href').startswith('http') else f"https://www.coindesk.com{link.get('href')}",
-                    "source": "Coindesk"
-                })
-    elif "cryptonews.com" in url:
-        # Cryptonews straipsnių ištraukimas
-        for article in soup.select('.category-posts__post')[:max_straipsniu]:
-            title = article.select_one('.category-posts__post-title')
-            link = article.select_one('a')
-            
-            if title and link:
-                straipsniai.append({
-                    "title": title.text.strip(),
-                    "url": link.get('href') if link.get('href').startswith('http') else f"https://cryptonews.com{link.get('href')}",
-                    "source": "Cryptonews"
-                })
+    # Ištraukiame straipsnius pagal svetainės išdėstymą (žr. data/html_extractor.py)
+    # Analizuojami tik straipsnių elementai, o ne visas puslapis
+    straipsniai = istraukti_straipsnius(content, url, max_straipsniu)
+    
+    # Įsimename sąrašą ir jo antraštes sekančiai sąlyginei užklausai
+    if atsakymas["etag"] or atsakymas["last_modified"]:
+        _saltiniu_talpykla[raktas] = {"etag": atsakymas["etag"], "last_modified": atsakymas["last_modified"],
+                                      "straipsniai": list(straipsniai)}
     
     # Grąžiname visus rastus straipsnius
     return straipsniai
 
-def gauti_naujienu_straipsnius(max_straipsniu=10):
+def gauti_naujienu_straipsnius(max_straipsniu=10, saltiniai=None, max_workers=MAX_WORKERS):
     """
     Gauna straipsnius iš visų apibrėžtų šaltinių.
     
-    Funkcija aplanko kiekvieną naujienų šaltinį iš NEWS_SOURCES sąrašo
+    Funkcija lygiagrečiai aplanko kiekvieną naujienų šaltinį iš NEWS_SOURCES sąrašo
     ir surenka straipsnius, sujungdama juos į vieną didelį sąrašą.
+    Šaltiniai yra skirtinguose serveriuose, todėl vienas kito nelaukia.
     
     Parametrai:
         max_straipsniu (int): Maksimalus straipsnių skaičius iš kiekvieno šaltinio
+        saltiniai (list): Šaltinių URL sąrašas (pagal nutylėjimą - NEWS_SOURCES)
+        max_workers (int): Kiek užklausų vykdyti vienu metu
     
     Grąžina:
-        list: Bendras visų šaltinių straipsnių sąrašas
+        list: Bendras visų šaltinių straipsnių sąrašas (šaltinių tvarka išlaikoma)
     """
-    # Sukuriame tuščią sąrašą visiems straipsniams
-    visi_straipsniai = []
+    saltiniai = saltiniai or NEWS_SOURCES
     
-    # Einame per visus naujienų šaltinius
-    for url in NEWS_SOURCES:
-        # Registruojame, kad pradedame ieškoti straipsnių
-        logger.info(f"Ieškoma straipsnių: {url}")
-        
-        # Gauname straipsnius iš šio šaltinio
-        straipsniai = gauti_straipsnius(url, max_straipsniu)
-        
-        # Pridedame rastus straipsnius prie bendro sąrašo
-        visi_straipsniai.extend(straipsniai)
-        
-        # Padarome 1 sekundės pauzę, kad neapkrautume serverio per daug užklausų
-        time.sleep(1)
+    # Registruojame, kad pradedame ieškoti straipsnių
+    logger.info(f"Ieškoma straipsnių {len(saltiniai)} šaltiniuose")
+    
+    # Kiekvienas šaltinis apdorojamas atskirame thread'e, o map() grąžina rezultatus šaltinių tvarka
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rezultatai = executor.map(lambda url: gauti_straipsnius(url, max_straipsniu), saltiniai)
+        visi_straipsniai = [straipsnis for straipsniai in rezultatai for straipsnis in straipsniai]
     
     # Registruojame bendrą rastų straipsnių skaičių
     logger.info(f"Rasta straipsnių: {len(visi_straipsniai)}")
@@ -213,7 +324,7 @@ def gauti_naujienu_straipsnius(max_straipsniu=10):
     # Grąžiname visus rastus straipsnius
     return visi_straipsniai
 
-def gauti_straipsnio_turini(url):
+def gauti_straipsnio_turini(url, sesija=None, ribotuvas=None):
     """
     Gauna straipsnio tekstinį turinį iš nurodyto URL.
     
@@ -227,77 +338,178 @@ def gauti_straipsnio_turini(url):
         str: Išvalytas straipsnio tekstas
     """
     # Gauname straipsnio HTML turinį
-    content = gauti_duomenis_is_url(url)
+    content = gauti_duomenis_is_url(url, sesija=sesija, ribotuvas=ribotuvas)
     
     # Jei turinio negavome, grąžiname tuščią tekstą
     if not content:
         return ""
     
-    # Sukuriame BeautifulSoup objektą HTML analizei
-    soup = BeautifulSoup(content, 'html.parser')
+    return istraukti_teksta(content)
+
+def gauti_straipsniu_turinius(urls, max_workers=MAX_WORKERS):
+    """
+    Lygiagrečiai gauna kelių straipsnių turinį.
     
-    # Pašaliname script ir style elementus, nes juose nėra naudingo teksto
-    for script in soup(["script", "style"]):
-        script.extract()
+    Užklausos į skirtingus serverius vyksta vienu metu, o į tą patį serverį -
+    ne dažniau nei kas HOST_MIN_INTERVAL sekundžių. Todėl bendras laikas
+    priklauso nuo lėčiausio serverio, o ne nuo visų straipsnių sumos.
     
-    # Ištraukiame visą tekstą, naudodami tarpą kaip skyriklį tarp elementų
-    text = soup.get_text(separator=' ')
+    Parametrai:
+        urls (list): Straipsnių URL sąrašas
+        max_workers (int): Kiek užklausų vykdyti vienu metu
     
-    # Išvalome tekstą - pašaliname per daug tarpų ir tuščias eilutes
-    # Pirmiausia paimame kiekvieną eilutę ir pašaliname tarpus pradžioje/pabaigoje
-    lines = (line.strip() for line in text.splitlines())
+    Grąžina:
+        list: Straipsnių tekstai ta pačia tvarka kaip urls (tuščias tekstas, jei nepavyko)
+    """
+    if not urls:
+        return []
     
-    # Tada skaidome eilutes į frazes, pašalindami daugybines tarpų sekas
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    pradzia = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        turiniai = list(executor.map(gauti_straipsnio_turini, urls))
     
-    # Sujungiame visas netuščias frazes į vieną tekstą
-    text = ' '.join(chunk for chunk in chunks if chunk)
+    logger.info(f"Gautas {len(urls)} straipsnių turinys per {time.monotonic() - pradzia:.1f}s")
+    return turiniai
+
+# ----- SENTIMENTO VERTINIMAS -----
+# Analizatoriai kuriami vieną kartą procese - Vader žodyno įkėlimas užtrunka
+_vader = None
+_textblob = None
+_analizatoriu_lock = threading.Lock()
+
+def paruosti_vader_zodyna():
+    """
+    Patikrina, ar įdiegtas NLTK Vader žodynas, ir jei ne - jį atsisiunčia.
     
-    # Grąžiname išvalytą tekstą
-    return text
+    Kviečiama pirmą kartą kuriant Vader analizatorių, o ne importuojant modulį.
+    Serveryje žodyną geriau įdiegti iš anksto: python -m nltk.downloader vader_lexicon
+    """
+    import nltk  # Natūralios kalbos apdorojimo biblioteka (importas užtrunka)
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')  # Tikriname ar Vader leksikonas jau įdiegtas sistemoje
+    except LookupError:  # Jei leksikono nėra, atsisiunčiame jį
+        logger.info("Atsisiunčiamas NLTK Vader žodynas")
+        nltk.download('vader_lexicon', quiet=True)  # Žodžių jausmų įverčiai
+
+def gauti_vader():
+    """Grąžina proceso bendrą Vader analizatorių (žodynas įkeliamas tik vieną kartą)"""
+    global _vader
+    with _analizatoriu_lock:
+        if _vader is None:
+            paruosti_vader_zodyna()
+            # SentimentIntensityAnalyzer - greitas sentimento vertinimas, ypač tinkamas trumpiems tekstams
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+            _vader = SentimentIntensityAnalyzer()
+        return _vader
 
-def analizuoti_sentimenta(tekstas):
+def gauti_textblob():
+    """Grąžina proceso bendrą TextBlob (Pattern) analizatorių"""
+    global _textblob
+    with _analizatoriu_lock:
+        if _textblob is None:
+            # TextBlob sentimento analizatorius (be viso teksto apdorojimo)
+            from textblob.en.sentiments import PatternAnalyzer
+            _textblob = PatternAnalyzer()
+        return _textblob
+
+def _patikrinti_vertintojus(vertintojai):
+    """Patikrina vertintojų pavadinimus ir grąžina juos kaip tuple"""
+    vertintojai = tuple(vertintojai)
+    nezinomi = set(vertintojai) - set(VISI_VERTINTOJAI)
+    if nezinomi or not vertintojai:
+        raise ValueError(f"Nežinomi sentimento vertintojai: {sorted(nezinomi) or vertintojai}")
+    return vertintojai
+
+def analizuoti_sentimenta(tekstas, vertintojai=NUMATYTIEJI_VERTINTOJAI):
     """
-    Analizuoja teksto sentimentą naudojant TextBlob ir NLTK Vader.
+    Analizuoja teksto sentimentą naudojant TextBlob ir/arba NLTK Vader.
     
-    Ši funkcija atlieka dvigubą sentimento analizę - naudoja ir TextBlob, ir NLTK Vader.
     TextBlob nustato polarity (teigiamumas/neigiamumas) ir subjectivity (subjektyvumas),
     o NLTK Vader pateikia detalesnę analizę su compound, neg, neu ir pos reikšmėmis.
+    Analizatoriai nekuriami kiekvienam tekstui - naudojami proceso bendri.
     
     Parametrai:
         tekstas (str): Tekstas, kurį reikia analizuoti
+        vertintojai (tuple): Kuriuos vertintojus naudoti - 'vader', 'textblob' arba abu
     
     Grąžina:
-        dict: Žodynas su įvairiais sentimento įverčiais
+        dict: Žodynas su sentimento įverčiais (nenaudoto vertintojo reikšmės - None)
     """
+    rezultatas = {"polarity": None, "subjectivity": None,
+                  "compound": None, "neg": None, "neu": None, "pos": None}
     try:
-        # TextBlob analizė
-        blob = TextBlob(tekstas)
-        # Polarity: nuo -1 (labai neigiamas) iki 1 (labai teigiamas)
-        polarity = blob.sentiment.polarity
-        # Subjectivity: nuo 0 (labai objektyvus) iki 1 (labai subjektyvus)
-        subjectivity = blob.sentiment.subjectivity
+        if 'textblob' in vertintojai:
+            # Polarity: nuo -1 (labai neigiamas) iki 1 (labai teigiamas)
+            # Subjectivity: nuo 0 (labai objektyvus) iki 1 (labai subjektyvus)
+            sentiment = gauti_textblob().analyze(tekstas)
+            rezultatas["polarity"] = sentiment.polarity
+            rezultatas["subjectivity"] = sentiment.subjectivity
         
-        # NLTK Vader analizė - specializuota socialinių tinklų tekstų analizei
-        sia = SentimentIntensityAnalyzer()
-        # Gauna įverčius: compound (bendras), neg (neigiamas), neu (neutralus), pos (teigiamas)
-        vader_scores = sia.polarity_scores(tekstas)
+        if 'vader' in vertintojai:
+            # Gauna įverčius: compound (bendras), neg (neigiamas), neu (neutralus), pos (teigiamas)
+            rezultatas.update(gauti_vader().polarity_scores(tekstas))
         
-        # Grąžiname visus sentimento rodiklius viename žodyne
-        return {
-            "polarity": polarity,
-            "subjectivity": subjectivity,
-            "compound": vader_scores["compound"],  # Bendras įvertis nuo -1 iki 1
-            "neg": vader_scores["neg"],  # Neigiamo sentimento dalis (0-1)
-            "neu": vader_scores["neu"],  # Neutralaus sentimento dalis (0-1)
-            "pos": vader_scores["pos"]   # Teigiamo sentimento dalis (0-1)
-        }
+        return rezultatas
     except Exception as e:
         # Įvykus klaidai, užregistruojame ją ir grąžiname nulines reikšmes
         logger.error(f"Klaida analizuojant sentimentą: {e}")
         return {"polarity": 0, "subjectivity": 0, "compound": 0, "neg": 0, "neu": 0, "pos": 0}
 
-def analizuoti_naujienu_sentimenta(max_straipsniu=5):
+def _inicializuoti_vertinimo_procesa(vertintojai):
+    """Proceso inicializavimas - analizatoriai ir žodynai įkeliami iš karto, vieną kartą"""
+    if 'vader' in vertintojai:
+        gauti_vader()
+    if 'textblob' in vertintojai:
+        gauti_textblob().analyze("")
+
+def _analizuoti_paketa(tekstai, vertintojai):
+    """Įvertina tekstų paketą viename procese"""
+    return [analizuoti_sentimenta(tekstas, vertintojai) for tekstas in tekstai]
+
+def analizuoti_sentimenta_paketu(tekstai, vertintojai=NUMATYTIEJI_VERTINTOJAI,
+                                 max_workers=None, paketo_dydis=PAKETO_DYDIS):
+    """
+    Įvertina daug tekstų iš karto.
+    
+    Nedidelis tekstų kiekis vertinamas šiame procese, o didesnis
+    (nuo PROCESU_RIBA tekstų) - paketais per procesų telkinį, nes
+    Vader ir TextBlob skaičiavimai apkrauna CPU ir thread'ai nepadėtų.
+    
+    Parametrai:
+        tekstai (list): Tekstų sąrašas
+        vertintojai (tuple): 'vader', 'textblob' arba abu
+        max_workers (int): Procesų skaičius (None - pagal CPU skaičių)
+        paketo_dydis (int): Kiek tekstų siųsti procesui vienu kartu
+    
+    Grąžina:
+        list: Sentimento žodynai ta pačia tvarka kaip tekstai
+    """
+    vertintojai = _patikrinti_vertintojus(vertintojai)
+    tekstai = list(tekstai)
+    
+    if len(tekstai) < PROCESU_RIBA or max_workers == 1:
+        return _analizuoti_paketa(tekstai, vertintojai)
+    
+    paketai = [tekstai[i:i + paketo_dydis] for i in range(0, len(tekstai), paketo_dydis)]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializuoti_vertinimo_procesa,
+                             initargs=(vertintojai,)) as executor:
+        rezultatai = executor.map(_analizuoti_paketa, paketai, [vertintojai] * len(paketai))
+        return [irasas for paketas in rezultatai for irasas in paketas]
+
+def sentimento_kategorija(sentimentas):
+    """
+    Nustato sentimento kategoriją pagal Vader compound (arba TextBlob polarity,
+    jei Vader nenaudotas): > 0.05 teigiamas, < -0.05 neigiamas, kitu atveju neutralus
+    """
+    ivertis = sentimentas["compound"] if sentimentas["compound"] is not None else sentimentas["polarity"]
+    if ivertis > 0.05:
+        return "positive"
+    elif ivertis < -0.05:
+        return "negative"
+    return "neutral"
+
+def analizuoti_naujienu_sentimenta(max_straipsniu=5, saltiniai=None, max_workers=MAX_WORKERS,
+                                   vertintojai=NUMATYTIEJI_VERTINTOJAI):
     """
     Analizuoja naujienų straipsnių sentimentą.
     
@@ -306,12 +518,15 @@ def analizuoti_naujienu_sentimenta(max_straipsniu=5):
     
     Parametrai:
         max_straipsniu (int): Maksimalus straipsnių skaičius iš kiekvieno šaltinio
+        saltiniai (list): Šaltinių URL sąrašas (pagal nutylėjimą - NEWS_SOURCES)
+        max_workers (int): Kiek užklausų vykdyti vienu metu
+        vertintojai (tuple): Sentimento vertintojai - 'vader', 'textblob' arba abu
     
     Grąžina:
         pandas.DataFrame: Straipsnių ir jų sentimento duomenų lentelė
     """
     # Gauname straipsnius iš visų šaltinių
-    straipsniai = gauti_naujienu_straipsnius(max_straipsniu)
+    straipsniai = gauti_naujienu_straipsnius(max_straipsniu, saltiniai, max_workers)
     
     # Jei negavome jokių straipsnių, užregistruojame įspėjimą ir grąžiname tuščią DataFrame
     if not straipsniai:
@@ -321,27 +536,16 @@ def analizuoti_naujienu_sentimenta(max_straipsniu=5):
     # Sukuriame tuščią sąrašą rezultatams
     rezultatai = []
     
-    # Analizuojame kiekvieną straipsnį
-    for straipsnis in straipsniai:
-        # Gauname straipsnio pilną tekstinį turinį
-        turinys = gauti_straipsnio_turini(straipsnis["url"])
-        
-        # Jei nepavyko gauti turinio, naudojame antraštę
-        if not turinys:
-            turinys = straipsnis["title"]
-        
-        # Analizuojame straipsnio sentimentą
-        sentimentas = analizuoti_sentimenta(turinys)
-        
-        # Nustatome sentimento kategoriją pagal compound reikšmę
-        # > 0.05 laikome teigiamu, < -0.05 laikome neigiamu, kitu atveju - neutraliu
-        if sentimentas["compound"] > 0.05:
-            sentiment_category = "positive"
-        elif sentimentas["compound"] < -0.05:
-            sentiment_category = "negative"
-        else:
-            sentiment_category = "neutral"
-        
+    # Lygiagrečiai gauname visų straipsnių pilną tekstinį turinį
+    # Jei nepavyko gauti turinio, naudojame antraštę
+    turiniai = gauti_straipsniu_turinius([straipsnis["url"] for straipsnis in straipsniai], max_workers)
+    turiniai = [turinys or straipsnis["title"] for straipsnis, turinys in zip(straipsniai, turiniai)]
+    
+    # Įvertiname visų straipsnių sentimentą vienu kartu
+    sentimentai = analizuoti_sentimenta_paketu(turiniai, vertintojai)
+    
+    # Sujungiame straipsnius su jų įverčiais
+    for straipsnis, sentimentas in zip(straipsniai, sentimentai):
         # Pridedame rezultatą į sąrašą
         rezultatai.append({
             "title": straipsnis["title"],  # Straipsnio antraštė
@@ -351,11 +555,8 @@ def analizuoti_naujienu_sentimenta(max_straipsniu=5):
             "polarity": sentimentas["polarity"],  # TextBlob polarity
             "subjectivity": sentimentas["subjectivity"],  # TextBlob subjectivity
             "compound": sentimentas["compound"],  # Vader compound įvertis
-            "sentiment": sentiment_category  # Sentimento kategorija
+            "sentiment": sentimento_kategorija(sentimentas)  # Sentimento kategorija
         })
-        
-        # Padarome 1 sekundės pauzę, kad neapkrautume serverio
-        time.sleep(1)
     
     # Sukuriame pandas DataFrame iš rezultatų sąrašo
     df = pd.DataFrame(rezultatai)
@@ -367,15 +568,18 @@ def analizuoti_naujienu_sentimenta(max_straipsniu=5):
     # Grąžiname DataFrame su rezultatais
     return df
 
-def prideti_sentimento_duomenis(kainu_df):
+def prideti_sentimento_duomenis(kainu_df, atnaujinti=True):
     """
     Prideda sentimento duomenis prie kainų DataFrame.
     
     Ši funkcija priima Bitcoin kainų DataFrame ir prideda prie jo
     sentimento rodiklius, sujungdama duomenis pagal datą.
+    Dienos vidurkiai imami iš straipsnių saugyklos (news_articles lentelės),
+    todėl jau matyti straipsniai neatsiunčiami ir nevertinami iš naujo.
     
     Parametrai:
         kainu_df (pandas.DataFrame): Bitcoin kainų duomenys
+        atnaujinti (bool): Ar prieš tai papildyti saugyklą naujausiais straipsniais
     
     Grąžina:
         pandas.DataFrame: Kainų duomenys papildyti sentimento rodikliais
@@ -389,29 +593,24 @@ def prideti_sentimento_duomenis(kainu_df):
             logger.error("Nėra 'Date' stulpelio - negalima pridėti sentimento duomenų.")
             return kainu_df  # Grąžiname originalą, jei negalime atlikti sujungimo
         
-        # Gauname sentimento duomenis
-        sentimento_df = analizuoti_naujienu_sentimenta(max_straipsniu=10)
+        # Importuojame čia, nes news_store pats importuoja šį modulį
+        from data.news_store import atnaujinti_straipsnius, dienos_sentimentas
+        
+        # Papildome saugyklą naujais straipsniais (nepasikeitę straipsniai nesiunčiami ir nevertinami)
+        if atnaujinti:
+            atnaujinti_straipsnius(max_straipsniu=10)
+        
+        # Dienos vidurkiai iš saugyklos - vienai dienai gali būti keli straipsniai
+        df['Date'] = pd.to_datetime(df['Date'])
+        sentimento_agg = dienos_sentimentas(iki=df['Date'].max())
         
         # Jei negavome sentimento duomenų, pridedame tuščius stulpelius
-        if sentimento_df.empty:
+        if sentimento_agg.empty:
             df['Sentiment_Score'] = float('nan')  # NaN reikšmė - nėra duomenų
             df['Sentiment_TextBlob'] = float('nan')
             logger.warning("Nėra sentimento duomenų, pridėti tušti stulpeliai.")
             return df
-        
-        # Konvertuojame datas į pandas datetime formatą, kad galėtume sujungti
-        sentimento_df['date'] = pd.to_datetime(sentimento_df['date'])
-        df['Date'] = pd.to_datetime(df['Date'])
-        
-        # Grupuojame sentimento duomenis pagal datą ir skaičiuojame vidurkius
-        # Tai reikalinga, nes vienai dienai gali būti keli straipsniai
-        sentimento_agg = sentimento_df.groupby('date').agg({
-            'compound': 'mean',  # Sentimento compound įverčių vidurkis
-            'polarity': 'mean'   # TextBlob polarity įverčių vidurkis
-        }).reset_index().rename(columns={
-            'compound': 'Sentiment_Score',  # Pervardijame stulpelius
-            'polarity': 'Sentiment_TextBlob'
-        })
+        sentimento_agg = sentimento_agg[['date', 'Sentiment_Score', 'Sentiment_TextBlob']]
         
         # Sujungiame kainų ir sentimento duomenis pagal datą
         # 'left' reiškia, kad išsaugosime visus kainų įrašus, net jei nėra sentimento duomenų
@@ -424,8 +623,8 @@ def prideti_sentimento_duomenis(kainu_df):
         # Užpildome trūkstamas reikšmes - forward fill, po to backward fill
         # Tai reiškia, kad tuščioms dienoms naudosime artimiausios ankstesnės,
         # o jei tokios nėra - artimiausios vėlesnės dienos reikšmes
-        df['Sentiment_Score'] = df['Sentiment_Score'].fillna(method='ffill').fillna(method='bfill')
-        df['Sentiment_TextBlob'] = df['Sentiment_TextBlob'].fillna(method='ffill').fillna(method='bfill')
+        df['Sentiment_Score'] = df['Sentiment_Score'].ffill().bfill()
+        df['Sentiment_TextBlob'] = df['Sentiment_TextBlob'].ffill().bfill()
         
         # Apskaičiuojame 7 dienų slankųjį vidurkį sentimento įverčiams
         # Tai padeda išlyginti didelius svyravimus ir matyti bendrą tendenciją
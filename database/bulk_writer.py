@@ -0,0 +1,145 @@
+"""
+Masinio duomenų įrašymo modulis.
+DataFrame įrašomas dideliais keliaeiliais INSERT ... ON DUPLICATE KEY UPDATE
+sakiniais, stulpelius imant iš lentelės apibrėžimo (Model.__table__).
+Neegzistuojantys DataFrame stulpeliai praleidžiami.
+"""
+import os
+import time
+import logging
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Connection
+
+from .config import engine
+
+logger = logging.getLogger("bulk_writer")
+
+# Kiek eilučių įrašome vienu INSERT sakiniu (galima keisti per aplinkos kintamąjį)
+DEFAULT_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", 1000))
+
+# SQLite datos saugomos tekstu - tokiu pačiu formatu kaip SQLAlchemy DateTime,
+# kitaip palyginimai (timestamp >= :start) su SQLAlchemy parametrais neteisingi
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+def _get_table(target):
+    """Grąžina Table objektą iš ORM klasės arba paties Table"""
+    return getattr(target, '__table__', target)
+
+def _column_values(series, datetime_format=None):
+    """
+    Konvertuoja stulpelį į Python reikšmių masyvą, tinkamą DB tvarkyklei
+    (datetime vietoj pandas Timestamp, None vietoj NaN/NaT)
+    """
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series) and datetime_format:
+        values = series.dt.strftime(datetime_format).to_numpy(dtype=object)
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        values = np.asarray(series.dt.to_pydatetime(), dtype=object)
+    else:
+        values = series.to_numpy(dtype=object)
+    if missing.any():
+        values = values.copy()
+        values[missing] = None
+    return values
+
+def dataframe_to_rows(df, columns, datetime_format=None):
+    """
+    Paverčia DataFrame į plokščią reikšmių sąrašą (eilutė po eilutės)
+    tik su nurodytais stulpeliais
+    """
+    arrays = [_column_values(df[col], datetime_format) for col in columns]
+    return np.column_stack(arrays).ravel().tolist()
+
+def _insert_sql(table, dialect, columns, row_count, on_duplicate, update_columns):
+    """
+    Sukuria keliaeilį INSERT sakinį su pozicinėmis vietomis parametrams.
+    SQL tekstą formuojame patys, nes SQLAlchemy kompiliavimas su dešimtimis
+    tūkstančių parametrų užtrunka ilgiau nei pats įrašymas.
+
+    Parametrai:
+        on_duplicate: 'update' - atnaujinti esamus įrašus,
+                      'ignore' - praleisti esamus įrašus,
+                      None - paprastas INSERT
+    """
+    quote = dialect.identifier_preparer.quote
+    placeholder = '?' if dialect.paramstyle in ('qmark', 'numeric') else '%s'
+
+    row_sql = '(' + ', '.join([placeholder] * len(columns)) + ')'
+    columns_sql = ', '.join(quote(col) for col in columns)
+    values_sql = ', '.join([row_sql] * row_count)
+
+    if dialect.name == 'sqlite':
+        # SQLite naudojamas tik testams be MySQL serverio.
+        # ON CONFLICT be stulpelių sąrašo (SQLite >= 3.35) tinka bet kuriam unikaliam raktui
+        if on_duplicate == 'ignore':
+            return f"INSERT OR IGNORE INTO {quote(table.name)} ({columns_sql}) VALUES {values_sql}"
+        sql = f"INSERT INTO {quote(table.name)} ({columns_sql}) VALUES {values_sql}"
+        if on_duplicate == 'update' and update_columns:
+            updates = ', '.join(f"{quote(col)} = excluded.{quote(col)}" for col in update_columns)
+            sql += f" ON CONFLICT DO UPDATE SET {updates}"
+        return sql
+
+    prefix = 'INSERT IGNORE' if on_duplicate == 'ignore' else 'INSERT'
+    sql = f"{prefix} INTO {quote(table.name)} ({columns_sql}) VALUES {values_sql}"
+    if on_duplicate == 'update' and update_columns:
+        updates = ', '.join(f"{quote(col)} = VALUES({quote(col)})" for col in update_columns)
+        sql += f" ON DUPLICATE KEY UPDATE {updates}"
+    return sql
+
+def bulk_upsert(df, target, batch_size=None, on_duplicate='update', update_columns=None, bind=None):
+    """
+    Įrašo DataFrame į lentelę dideliais paketais
+
+    Parametrai:
+        df: DataFrame su duomenimis
+        target: ORM klasė (pvz. BtcFeatures) arba Table objektas
+        batch_size: Eilučių skaičius viename INSERT sakinyje
+        on_duplicate: 'update', 'ignore' arba None
+        update_columns: Kuriuos stulpelius atnaujinti (pagal nutylėjimą - visus ne raktinius)
+        bind: Engine arba Connection (pagal nutylėjimą - bendras engine).
+              Jei perduotas Connection, transakciją valdo kviečiantysis kodas.
+
+    Grąžina:
+        dict su įrašytų eilučių skaičiumi, paveiktų eilučių skaičiumi,
+        trukme ir greičiu (eilutės per sekundę)
+    """
+    table = _get_table(target)
+    bind = bind if bind is not None else engine
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+
+    columns = [col.name for col in table.columns if col.name in df.columns]
+    if update_columns is None:
+        update_columns = [col for col in columns if col not in table.primary_key.columns]
+
+    stats = {'rows': 0, 'affected': 0, 'batches': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+    if df.empty:
+        return stats
+
+    started = time.perf_counter()
+    datetime_format = SQLITE_DATETIME_FORMAT if bind.dialect.name == 'sqlite' else None
+
+    for offset in range(0, len(df), batch_size):
+        # Konvertuojame tik vieną paketą, kad atmintyje nebūtų viso DataFrame kopijos
+        batch = df.iloc[offset:offset + batch_size]
+        params = dataframe_to_rows(batch, columns, datetime_format)
+
+        # Jei perduotas Connection - naudojame jį, kitu atveju kiekvienas paketas savo transakcijoje
+        context = nullcontext(bind) if isinstance(bind, Connection) else bind.begin()
+        with context as conn:
+            sql = _insert_sql(table, conn.dialect, columns, len(batch), on_duplicate, update_columns)
+            result = conn.exec_driver_sql(sql, tuple(params))
+
+        stats['rows'] += len(batch)
+        stats['affected'] += max(result.rowcount, 0)
+        stats['batches'] += 1
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['rows_per_sec'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+
+    logger.info(f"Į lentelę {table.name} įrašyta {stats['rows']} eilučių "
+                f"({stats['batches']} paketai) per {stats['seconds']:.2f}s - "
+                f"{stats['rows_per_sec']:.0f} eil./s")
+    return stats
@@ -1,23 +1,237 @@
 ﻿"""
 Duomenų bazės konfigūracija.
+Visi moduliai naudoja vieną bendrą engine (create_db_engine()), kurio
+prisijungimų telkinio dydį, tvarkyklę ir kitus nustatymus galima keisti
+aplinkos kintamaisiais. Telkinys matuoja prisijungimo gavimo laiką ir
+kiek kartų teko laukti laisvo prisijungimo (get_pool_status()).
 """
 import os
-from sqlalchemy import create_engine
+import time
+import logging
+import threading
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger("db_config")
 
 # Prisijungimo duomenys iš MySQL lango
-DB_USER = "root"  # Matome iš MySQL lango
+DB_USER = os.environ.get("DB_USER", "root")  # Matome iš MySQL lango
 DB_PASSWORD = os.environ.get("DB_PASSWORD", "final_boss")  # Slaptažodį imame iš aplinkos kintamųjų
-DB_HOST = "localhost"  # Serveris
-DB_PORT = "3306"  # Portas
-DB_NAME = "BTC"  # DB pavadinimas
+DB_HOST = os.environ.get("DB_HOST", "localhost")  # Serveris
+DB_PORT = os.environ.get("DB_PORT", "3306")  # Portas
+DB_NAME = os.environ.get("DB_NAME", "BTC")  # DB pavadinimas
+
+# Tvarkyklė: mysqlconnector (mysql-connector-python) arba pymysql
+DB_DRIVER = os.environ.get("DB_DRIVER", "mysqlconnector")
+
+# Prisijungimų telkinio nustatymai
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))  # Kiek prisijungimų laikoma atidarytų
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))  # Kiek papildomų galima atidaryti apkrovos metu
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))  # Kiek sekundžių laukti laisvo prisijungimo
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))  # Po kiek sekundžių prisijungimas atnaujinamas (MySQL wait_timeout)
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") not in ("0", "false", "False")  # Patikrinti prisijungimą prieš naudojant
+DB_ECHO = os.environ.get("DB_ECHO", "0") in ("1", "true", "True")
+
+# Numatytoji laiko eilutė btc_ohlcv ir btc_features lentelėse (simbolis ir žvakių intervalas)
+DEFAULT_SYMBOL = os.environ.get("DEFAULT_SYMBOL", "BTCUSDT")
+DEFAULT_INTERVAL = os.environ.get("DEFAULT_INTERVAL", "15m")
+
+def make_database_url(driver=DB_DRIVER):
+    """Sukuria MySQL prisijungimo URL nurodytai tvarkyklei"""
+    return f"mysql+{driver}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# URL - pagal nutylėjimą mysql-connector-python (visą URL galima nurodyti DATABASE_URL)
+DATABASE_URL = os.environ.get("DATABASE_URL") or make_database_url()
+
+# Prisijungimo gavimo laiko intervalų ribos milisekundėmis (histogramai)
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+class PoolMetrics:
+    """
+    Prisijungimų telkinio statistika.
+    Skaičiuoja prisijungimo gavimo (checkout) laiką, kiek kartų visi
+    prisijungimai buvo užimti (saturated), laukimo limito viršijimus,
+    kiek laiko prisijungimas laikomas (nuo checkout iki checkin),
+    naujus ir atmestus (invalidated) prisijungimus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Išvalo statistiką"""
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.waits = 0
+            self.saturated = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.peak_checked_out = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.total_hold = 0.0
+            self.max_hold = 0.0
+            self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record_wait(self, wait, saturated):
+        """Užregistruoja prisijungimo gavimo laiką"""
+        wait_ms = wait * 1000
+        bucket = next((i for i, limit in enumerate(LATENCY_BUCKETS_MS) if wait_ms <= limit), len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            self.waits += 1
+            self.saturated += int(saturated)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.buckets[bucket] += 1
+
+    def record_timeout(self):
+        """Užregistruoja nepavykusį prisijungimo gavimą (baigėsi DB_POOL_TIMEOUT)"""
+        with self._lock:
+            self.timeouts += 1
+            self.saturated += 1
+
+    def record_checkout(self, checked_out):
+        """Užregistruoja išduotą prisijungimą (checkout įvykis)"""
+        with self._lock:
+            self.checkouts += 1
+            if checked_out is not None:
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_checkin(self, held):
+        """Užregistruoja grąžintą prisijungimą ir kiek laiko jis buvo laikomas (checkin įvykis)"""
+        with self._lock:
+            self.checkins += 1
+            if held is not None:
+                self.total_hold += held
+                self.max_hold = max(self.max_hold, held)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        """Grąžina statistiką kaip žodyną"""
+        with self._lock:
+            labels = [f"<={limit}ms" for limit in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+            return {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'saturated': self.saturated,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'peak_checked_out': self.peak_checked_out,
+                'avg_wait_ms': round(self.total_wait * 1000 / self.waits, 3) if self.waits else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'avg_hold_ms': round(self.total_hold * 1000 / self.checkins, 3) if self.checkins else 0.0,
+                'max_hold_ms': round(self.max_hold * 1000, 3),
+                'wait_histogram': dict(zip(labels, self.buckets)),
+            }
 
-# URL - naudojame mysql-connector-python
-DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Bendra statistika visam procesui
+pool_metrics = PoolMetrics()
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool, matuojantis prisijungimo gavimo laiką.
+    Telkinio įvykių prieš laukimą eilėje nėra, todėl matuojamas viešas connect()
+    kvietimas: laukimas eilėje, naujo prisijungimo atidarymas ir pre-ping.
+    Kiti skaitikliai renkami per telkinio įvykius (create_db_engine()).
+    """
+    metrics = pool_metrics
+
+    def __init__(self, creator, max_overflow=10, **kw):
+        super().__init__(creator, max_overflow=max_overflow, **kw)
+        # QueuePool šios reikšmės viešai negrąžina
+        self.max_overflow = max_overflow
+
+    def connect(self):
+        # Visi prisijungimai užimti ir papildomų atidaryti nebegalima - teks laukti
+        saturated = (self.checkedin() == 0 and self.max_overflow > -1
+                     and self.overflow() >= self.max_overflow)
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - start, saturated)
+        return connection
+
+def create_db_engine(url=None, **overrides):
+    """
+    Sukuria engine su projekto telkinio nustatymais.
+    Kituose moduliuose naujų engine kurti nereikia - naudokite database.config.engine.
+
+    Parametrai:
+        url: Prisijungimo URL (pagal nutylėjimą DATABASE_URL)
+        overrides: create_engine() parametrai, kurie pakeičia numatytuosius
+
+    Grąžina:
+        sqlalchemy.engine.Engine
+    """
+    url = url or DATABASE_URL
+    options = {'echo': DB_ECHO, 'pool_pre_ping': DB_POOL_PRE_PING}
+    if not str(url).startswith('sqlite'):
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    options.update(overrides)
+    new_engine = create_engine(url, **options)
+
+    # Nauji ir atmesti (pvz. nepraėjus pre-ping) prisijungimai
+    event.listen(new_engine, 'connect', lambda *args: pool_metrics.record_connect())
+    event.listen(new_engine, 'invalidate', lambda *args: pool_metrics.record_invalidation())
+
+    # Išduoti ir grąžinti prisijungimai (new_engine.pool - po dispose() telkinys būna naujas)
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checkout_at'] = time.perf_counter()
+        pool = new_engine.pool
+        pool_metrics.record_checkout(pool.checkedout() if isinstance(pool, QueuePool) else None)
+
+    def on_checkin(dbapi_connection, connection_record):
+        checkout_at = connection_record.info.pop('checkout_at', None)
+        pool_metrics.record_checkin(time.perf_counter() - checkout_at if checkout_at is not None else None)
+
+    event.listen(new_engine, 'checkout', on_checkout)
+    event.listen(new_engine, 'checkin', on_checkin)
+    return new_engine
+
+def get_pool_status(bind=None):
+    """
+    Telkinio būsena ir statistika (naudojama /api/db-pool).
+
+    Grąžina:
+        dict: Telkinio dydis, užimti ir laisvi prisijungimai bei PoolMetrics statistika
+    """
+    pool = (bind if bind is not None else engine).pool
+    status = {'pool_class': type(pool).__name__, 'metrics': pool_metrics.snapshot()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'max_overflow': getattr(pool, 'max_overflow', None),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'timeout': pool.timeout(),
+        })
+    return status
 
 # Sukuriame SQLAlchemy objektus
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_db_engine()
 Base = declarative_base()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
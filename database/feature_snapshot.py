@@ -0,0 +1,248 @@
+"""
+Požymių matricos momentinės kopijos (snapshot) Arrow IPC (Feather v2) failuose.
+create_and_save_features() po įrašymo į DB parašo ir kopiją diske, o dideli
+nuskaitymai (treniravimas, backtest) ją atveria per mmap - be DB užklausų ir
+be duomenų dekodavimo. Failai nesuspausti, todėl stulpeliai skaitomi tiesiai iš
+OS page cache (zero-copy); kopijuojama tik sujungiant kelias dalis.
+
+Išdėstymas:
+    FEATURES_SNAPSHOT_DIR/<symbol>_<interval>/CURRENT          - aktyvios versijos pavadinimas
+    FEATURES_SNAPSHOT_DIR/<symbol>_<interval>/<versija>/manifest.json
+    FEATURES_SNAPSHOT_DIR/<symbol>_<interval>/<versija>/p202401.arrow, ...
+
+Kiekviena versija - atskiras katalogas, o CURRENT pakeičiamas atomiškai, todėl
+skaitytojai niekada nemato pusiau įrašytos kopijos. Inkrementinis atnaujinimas
+perrašo tik paliestus mėnesius, kiti failai susiejami (hard link) iš ankstesnės versijos.
+
+pyarrow nebūtina - be jos kopijos nekuriamos ir visada skaitoma iš DB.
+"""
+import os
+import json
+import time
+import shutil
+import logging
+
+import pandas as pd
+
+from .config import DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from .models import SERIES_COLUMNS
+
+logger = logging.getLogger("feature_snapshot")
+
+# Ar kurti ir naudoti kopijas (išjungiama FEATURES_SNAPSHOT=0)
+FEATURES_SNAPSHOT = os.environ.get("FEATURES_SNAPSHOT", "1") in ("1", "true", "True")
+
+# Kopijų katalogas (santykinis kelias - kaip ir models/)
+FEATURES_SNAPSHOT_DIR = os.environ.get("FEATURES_SNAPSHOT_DIR", os.path.join("snapshots", "features"))
+
+# Kiek naujausių versijų palikti (senesnės ištrinamos)
+FEATURES_SNAPSHOT_KEEP = int(os.environ.get("FEATURES_SNAPSHOT_KEEP", 2))
+
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+
+def _pyarrow():
+    """pyarrow importuojama tik kai reikia (None, jei neįdiegta)"""
+    try:
+        import pyarrow
+        import pyarrow.feather
+        return pyarrow
+    except ImportError:
+        return None
+
+def snapshots_enabled():
+    """Ar kopijos įjungtos ir pyarrow įdiegta"""
+    return FEATURES_SNAPSHOT and _pyarrow() is not None
+
+def _series_dir(symbol=None, interval=None):
+    return os.path.join(FEATURES_SNAPSHOT_DIR, f"{symbol or DEFAULT_SYMBOL}_{interval or DEFAULT_INTERVAL}")
+
+def current_manifest(symbol=None, interval=None):
+    """
+    Aktyvios kopijos aprašas
+
+    Grąžina:
+        dict su version, rows, columns ir partitions arba None, jei kopijos nėra
+    """
+    series_dir = _series_dir(symbol, interval)
+    try:
+        with open(os.path.join(series_dir, CURRENT_FILE), encoding='utf-8') as f:
+            version = f.read().strip()
+        with open(os.path.join(series_dir, version, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    manifest['path'] = os.path.join(series_dir, version)
+    return manifest
+
+def invalidate_snapshot(symbol=None, interval=None):
+    """
+    Išjungia aktyvią kopiją (pvz. nepavykus ją atnaujinti po DB pakeitimų),
+    kad skaitytojai grįžtų prie DB
+    """
+    try:
+        os.remove(os.path.join(_series_dir(symbol, interval), CURRENT_FILE))
+        logger.info(f"Požymių kopija {symbol or DEFAULT_SYMBOL} {interval or DEFAULT_INTERVAL} išjungta")
+    except FileNotFoundError:
+        pass
+
+def _read_part(path, columns=None):
+    """Atveria dalies failą per mmap (Arrow lentelė rodo tiesiai į failo puslapius)"""
+    pa = _pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+def _write_part(df, path):
+    """Įrašo dalį nesuspaustu Feather v2 (Arrow IPC) failu"""
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa.feather.write_feather(table, path, compression='uncompressed')
+
+def _link_or_copy(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def _prune_versions(series_dir, keep):
+    """Ištrina senas versijas, palikdama keep naujausių (atidaryti mmap failai lieka galioti)"""
+    versions = sorted(name for name in os.listdir(series_dir)
+                      if os.path.isdir(os.path.join(series_dir, name)) and not name.startswith('.'))
+    for name in versions[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(series_dir, name), ignore_errors=True)
+
+def write_snapshot(df, symbol=None, interval=None, merge=False):
+    """
+    Įrašo naują požymių kopijos versiją ir padaro ją aktyvia.
+
+    Parametrai:
+        df: Požymių DataFrame (kaip create_all_features() rezultatas)
+        symbol, interval: Laiko eilutė
+        merge: True - df sujungiamas su aktyvia kopija (inkrementinis atnaujinimas),
+               perrašomi tik paliesti mėnesiai; jei aktyvios kopijos nėra - nieko nedaroma
+
+    Grąžina:
+        str: Naujos versijos pavadinimas arba None, jei kopija nesukurta
+    """
+    if not snapshots_enabled() or df.empty:
+        return None
+
+    started = time.perf_counter()
+    series_dir = _series_dir(symbol, interval)
+    try:
+        # timestamp - tokia pati raiška kaip load_frame() rezultate
+        df = (df.drop(columns=[col for col in SERIES_COLUMNS if col in df.columns])
+              .astype({'timestamp': 'datetime64[ns]'}))
+        previous = current_manifest(symbol, interval) if merge else None
+        if merge and (previous is None or previous['columns'] != list(df.columns)):
+            # Be pilnos ankstesnės kopijos dalinė kopija būtų neteisinga
+            invalidate_snapshot(symbol, interval)
+            logger.info("Aktyvios požymių kopijos nėra - ji bus sukurta per pilną perskaičiavimą")
+            return None
+
+        version = pd.Timestamp.now().strftime('%Y%m%dT%H%M%S%f')
+        version_dir = os.path.join(series_dir, version)
+        os.makedirs(version_dir)
+
+        months = df['timestamp'].dt.to_period('M')
+        groups = {f"p{month.strftime('%Y%m')}": group for month, group in df.groupby(months, sort=True)}
+        partitions = {}
+        for old in (previous['partitions'] if previous else []):
+            path = os.path.join(previous['path'], old['file'])
+            if old['name'] in groups:
+                groups[old['name']] = (pd.concat([_read_part(path).to_pandas(), groups[old['name']]])
+                                       .drop_duplicates('timestamp', keep='last')
+                                       .sort_values('timestamp'))
+            else:
+                _link_or_copy(path, os.path.join(version_dir, old['file']))
+                partitions[old['name']] = old
+
+        for name, group in groups.items():
+            _write_part(group, os.path.join(version_dir, f"{name}.arrow"))
+            partitions[name] = {
+                'name': name,
+                'file': f"{name}.arrow",
+                'rows': len(group),
+                'start': group['timestamp'].min().isoformat(),
+                'end': group['timestamp'].max().isoformat(),
+            }
+
+        partitions = [partitions[name] for name in sorted(partitions)]
+        manifest = {
+            'version': version,
+            'symbol': symbol or DEFAULT_SYMBOL,
+            'interval': interval or DEFAULT_INTERVAL,
+            'rows': sum(part['rows'] for part in partitions),
+            'columns': list(df.columns),
+            'partitions': partitions,
+        }
+        with open(os.path.join(version_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Atominis perjungimas į naują versiją
+        current_tmp = os.path.join(series_dir, f".{CURRENT_FILE}.{version}")
+        with open(current_tmp, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(current_tmp, os.path.join(series_dir, CURRENT_FILE))
+
+        _prune_versions(series_dir, FEATURES_SNAPSHOT_KEEP)
+        logger.info(f"Požymių kopija {version}: {manifest['rows']} eilučių, {len(partitions)} dalių, "
+                    f"perrašyta {len(groups)} dalių per {time.perf_counter() - started:.2f}s")
+        return version
+    except Exception as e:
+        logger.error(f"Klaida kuriant požymių kopiją: {e}")
+        invalidate_snapshot(symbol, interval)
+        return None
+
+def load_snapshot(columns=None, start=None, end=None, symbol=None, interval=None):
+    """
+    Nuskaito požymius iš aktyvios kopijos (tik reikalingi mėnesiai ir stulpeliai).
+
+    Parametrai:
+        columns: Stulpelių sąrašas (pagal nutylėjimą - visi)
+        start, end: Laiko intervalas (imtinai)
+        symbol, interval: Laiko eilutė
+
+    Grąžina:
+        DataFrame (skaitiniai stulpeliai gali būti tik skaitymui - rodo į mmap failą)
+        arba None, jei kopijos nėra ar joje trūksta stulpelių
+    """
+    if not snapshots_enabled():
+        return None
+    manifest = current_manifest(symbol, interval)
+    if manifest is None:
+        return None
+    columns = list(columns or manifest['columns'])
+    if not set(columns) <= set(manifest['columns']):
+        return None
+
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    parts = [part for part in manifest['partitions']
+             if (start is None or pd.Timestamp(part['end']) >= start)
+             and (end is None or pd.Timestamp(part['start']) <= end)]
+    read_columns = columns if 'timestamp' in columns or (start is None and end is None) else columns + ['timestamp']
+
+    tables = []
+    for part in parts:
+        table = _read_part(os.path.join(manifest['path'], part['file']), read_columns)
+        timestamp_type = table.schema.field('timestamp').type if 'timestamp' in read_columns else None
+        # Filtruojame tik kraštines dalis, kitos lieka be kopijavimo
+        if start is not None and pd.Timestamp(part['start']) < start:
+            table = table.filter(pc.greater_equal(table['timestamp'], pa.scalar(start, timestamp_type)))
+        if end is not None and pd.Timestamp(part['end']) > end:
+            table = table.filter(pc.less_equal(table['timestamp'], pa.scalar(end, timestamp_type)))
+        tables.append(table)
+
+    if not tables:
+        return pd.DataFrame({col: pd.Series(dtype='datetime64[ns]' if col == 'timestamp' else float)
+                             for col in columns})
+    # split_blocks - kiekvienas stulpelis atskiras blokas, todėl vienos dalies
+    # skaitiniai stulpeliai nekopijuojami
+    df = pa.concat_tables(tables).select(columns).to_pandas(split_blocks=True)
+    logger.info(f"Iš požymių kopijos {manifest['version']} nuskaityta {len(df)} eilučių")
+    return df
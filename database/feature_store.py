@@ -0,0 +1,282 @@
+"""
+Požymių saugojimo būdai (FEATURES_STORAGE):
+- 'wide'    - btc_features: visi stulpeliai, įskaitant close_lag_* ir return_lag_*;
+- 'compact' - btc_features_compact: 4 baitų FLOAT stulpeliai be lag stulpelių.
+              Lag stulpeliai atkuriami skaitant iš close (close.shift(k)), todėl
+              prieš prašomą intervalą papildomai nuskaitoma MAX_LAG eilučių.
+              Pirmosios MAX_LAG laiko eilutės eilutės lag reikšmių neturi (NaN),
+              nes ankstesnių kainų požymių lentelėje nėra - dropna() jas atmeta.
+Papildomai (FEATURES_DAILY_BLOBS=1) kiekvienos dienos kompaktiški požymiai
+saugomi vienu dvejetainiu įrašu btc_features_daily lentelėje - juos naudoja
+dideli nuskaitymai (treniravimas, intervalo prognozės).
+Dideli nuskaitymai pirmiausia bando Arrow kopiją diske (feature_snapshot.py).
+
+load_features() grąžina tokius pačius stulpelius kaip load_frame(BtcFeatures),
+nepriklausomai nuo saugojimo būdo. Pakeitus FEATURES_STORAGE, požymius reikia
+perskaičiuoti (create_and_save_features()).
+"""
+import io
+import os
+import re
+import logging
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, delete, Integer
+from sqlalchemy.engine import Connection
+
+from .config import engine, DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from .models import BtcFeatures, BtcFeaturesCompact, BtcFeaturesDaily, SERIES_COLUMNS, series_filter
+from .bulk_writer import bulk_upsert
+from .frame_loader import load_frame
+from .feature_snapshot import load_snapshot
+
+logger = logging.getLogger("feature_store")
+
+# Eilučių lentelė: 'wide' arba 'compact'
+FEATURES_STORAGE = os.environ.get("FEATURES_STORAGE", "wide")
+
+# Ar papildomai saugoti dienos dvejetainius įrašus
+FEATURES_DAILY_BLOBS = os.environ.get("FEATURES_DAILY_BLOBS", "0") in ("1", "true", "True")
+
+# Dienos įrašai dideli (iki ~150 KB su 1m intervalu), todėl viename INSERT jų mažiau,
+# kad neviršytume MySQL max_allowed_packet
+DAILY_BATCH_SIZE = int(os.environ.get("FEATURES_DAILY_BATCH_SIZE", 50))
+
+STORAGE_MODELS = {'wide': BtcFeatures, 'compact': BtcFeaturesCompact}
+
+# Wide stulpeliai, kurių kompaktiškoje lentelėje nėra: pavadinimas -> (close arba return, lag)
+LAG_COLUMN_RE = re.compile(r'(close|return)_lag_(\d+)')
+DERIVED_COLUMNS = {}
+for _column in BtcFeatures.__table__.columns:
+    _match = LAG_COLUMN_RE.fullmatch(_column.name)
+    if _match:
+        DERIVED_COLUMNS[_column.name] = (_match.group(1), int(_match.group(2)))
+MAX_LAG = max(lag for _, lag in DERIVED_COLUMNS.values())
+
+# Numatytieji load_features() stulpeliai - kaip load_frame(BtcFeatures)
+WIDE_COLUMNS = [col.name for col in BtcFeatures.__table__.columns if col.name not in SERIES_COLUMNS]
+COMPACT_COLUMNS = [col.name for col in BtcFeaturesCompact.__table__.columns if col.name not in SERIES_COLUMNS]
+INTEGER_COLUMNS = [col.name for col in BtcFeaturesCompact.__table__.columns if isinstance(col.type, Integer)]
+FLOAT_COLUMNS = [col for col in COMPACT_COLUMNS if col != 'timestamp' and col not in INTEGER_COLUMNS]
+
+def features_model(storage=None):
+    """ORM klasė požymių eilučių lentelei (pagal nutylėjimą - FEATURES_STORAGE)"""
+    storage = storage or FEATURES_STORAGE
+    if storage not in STORAGE_MODELS:
+        raise ValueError(f"Nežinomas požymių saugojimo būdas: {storage}")
+    return STORAGE_MODELS[storage]
+
+def _connect(bind):
+    """Perduotas Connection naudojamas toks, koks yra, kitaip atidaromas naujas"""
+    bind = bind if bind is not None else engine
+    return nullcontext(bind) if isinstance(bind, Connection) else bind.connect()
+
+def restore_derived_columns(df, columns):
+    """
+    Atkuria close_lag_* ir return_lag_* stulpelius iš close
+    (tomis pačiomis formulėmis kaip compute_indicator_columns())
+    """
+    derived = [col for col in columns if col in DERIVED_COLUMNS]
+    if not derived:
+        return df
+    close = df['close'].to_numpy(dtype=np.float64)
+    restored = {}
+    for col in derived:
+        kind, lag = DERIVED_COLUMNS[col]
+        lagged = np.full_like(close, np.nan)
+        lagged[lag:] = close[:-lag]
+        values = lagged if kind == 'close' else close / lagged - 1
+        restored[col] = values.astype(df['close'].dtype)
+    return df.assign(**restored)
+
+# ----- DIENOS ĮRAŠAI -----
+def pack_day(df):
+    """
+    Supakuoja dienos eilutes į NumPy .npy struktūrinį masyvą:
+    timestamp - int64 nanosekundės, kiti stulpeliai - float32
+    """
+    dtype = [('timestamp', '<i8')] + [(col, '<f4') for col in COMPACT_COLUMNS if col != 'timestamp']
+    packed = np.empty(len(df), dtype=dtype)
+    packed['timestamp'] = df['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    for col in COMPACT_COLUMNS[1:]:
+        packed[col] = df[col].to_numpy(dtype=np.float32)
+    buffer = io.BytesIO()
+    np.save(buffer, packed, allow_pickle=False)
+    return buffer.getvalue()
+
+def unpack_day(data):
+    """Išpakuoja dienos įrašą į DataFrame (sveikieji stulpeliai grąžinami int64, jei nėra NaN)"""
+    packed = np.load(io.BytesIO(data), allow_pickle=False)
+    columns = {'timestamp': packed['timestamp'].view('datetime64[ns]')}
+    for name in packed.dtype.names[1:]:
+        values = packed[name]
+        if name in INTEGER_COLUMNS and not np.isnan(values).any():
+            values = values.astype(np.int64)
+        columns[name] = values
+    return pd.DataFrame(columns)
+
+def save_daily_blobs(df, symbol=None, interval=None, bind=None):
+    """
+    Įrašo požymius dienos įrašais. Jei dienos įrašas jau yra (pvz. inkrementinis
+    atnaujinimas dienos viduryje) - senos ir naujos eilutės sujungiamos.
+
+    Grąžina:
+        int: Įrašytų dienų skaičius
+    """
+    if df.empty:
+        return 0
+    table = BtcFeaturesDaily.__table__
+    symbol, interval = symbol or DEFAULT_SYMBOL, interval or DEFAULT_INTERVAL
+    days = df['timestamp'].dt.normalize()
+    first_day, last_day = days.min().date(), days.max().date()
+
+    context = nullcontext(bind) if isinstance(bind, Connection) else (bind or engine).begin()
+    with context as conn:
+        existing = dict(conn.execute(
+            select(table.c.day, table.c.data)
+            .where(series_filter(table, symbol, interval), table.c.day.between(first_day, last_day))
+        ).all())
+
+        records = []
+        for day, group in df.groupby(days, sort=True):
+            day = day.date()
+            if day in existing:
+                group = (pd.concat([unpack_day(existing[day]), group[COMPACT_COLUMNS]])
+                         .drop_duplicates('timestamp', keep='last')
+                         .sort_values('timestamp'))
+            records.append({'symbol': symbol, 'interval': interval, 'day': day,
+                            'row_count': len(group), 'data': pack_day(group)})
+
+        bulk_upsert(pd.DataFrame(records), BtcFeaturesDaily, batch_size=DAILY_BATCH_SIZE, bind=conn)
+    return len(records)
+
+def _load_daily(start, end, symbol, interval, conn):
+    """
+    Nuskaito dienos įrašus intervalui ir MAX_LAG eilučių prieš jį (lag stulpeliams).
+
+    Grąžina:
+        DataFrame su COMPACT_COLUMNS
+    """
+    table = BtcFeaturesDaily.__table__
+    series = series_filter(table, symbol, interval)
+    stmt = select(table.c.data).where(series)
+
+    if start is not None:
+        first_day = pd.Timestamp(start).date()
+        # Ankstesnės dienos, kol surenkame MAX_LAG eilučių
+        warmup_rows = 0
+        previous = conn.execute(select(table.c.day, table.c.row_count)
+                                .where(series, table.c.day < first_day)
+                                .order_by(table.c.day.desc()))
+        for day, row_count in previous:
+            first_day = day
+            warmup_rows += row_count
+            if warmup_rows >= MAX_LAG:
+                break
+        previous.close()
+        stmt = stmt.where(table.c.day >= first_day)
+    if end is not None:
+        stmt = stmt.where(table.c.day <= pd.Timestamp(end).date())
+
+    # Srautinis skaitymas tik šiam sakiniui - perduotas prisijungimas nekeičiamas
+    result = conn.execute(stmt.order_by(table.c.day).execution_options(stream_results=True, yield_per=100))
+    frames = [unpack_day(data) for data, in result]
+    if not frames:
+        return pd.DataFrame({col: pd.Series(dtype='datetime64[ns]' if col == 'timestamp' else np.float32)
+                             for col in COMPACT_COLUMNS})
+    df = pd.concat(frames, ignore_index=True)
+    if end is not None:
+        df = df[df['timestamp'] <= pd.Timestamp(end)]
+    return df
+
+# ----- SKAITYMAS IR RAŠYMAS -----
+def _warmup_start(conn, start, symbol, interval):
+    """Laikas, nuo kurio skaityti, kad prieš start būtų MAX_LAG eilučių (None - nuo pradžios)"""
+    table = BtcFeaturesCompact.__table__
+    return conn.execute(
+        select(table.c.timestamp)
+        .where(series_filter(table, symbol, interval), table.c.timestamp < start)
+        .order_by(table.c.timestamp.desc())
+        .offset(MAX_LAG - 1)
+        .limit(1)
+    ).scalar()
+
+def load_features(columns=None, start=None, end=None, latest=None, symbol=None, interval=None,
+                  storage=None, bulk=False, bind=None):
+    """
+    Nuskaito požymius į DataFrame (stulpeliai kaip load_frame(BtcFeatures)).
+
+    Parametrai:
+        columns: Stulpelių sąrašas (pagal nutylėjimą - visi btc_features stulpeliai)
+        start, end, latest: Kaip load_frame()
+        symbol, interval: Laiko eilutė (pagal nutylėjimą - DEFAULT_SYMBOL ir DEFAULT_INTERVAL)
+        storage: 'wide' arba 'compact' (pagal nutylėjimą - FEATURES_STORAGE)
+        bulk: Didelis nuskaitymas - skaitoma iš Arrow kopijos, jei ji yra,
+              kitu atveju (jei įjungti FEATURES_DAILY_BLOBS) - iš dienos įrašų
+        bind: Engine arba Connection (pagal nutylėjimą - bendras engine)
+
+    Grąžina:
+        DataFrame; kompaktiškų šaltinių slankiojo kablelio stulpeliai - float32
+    """
+    storage = storage or FEATURES_STORAGE
+    columns = list(columns or WIDE_COLUMNS)
+    if bulk and latest is None:
+        df = load_snapshot(columns, start, end, symbol, interval)
+        if df is not None:
+            return df
+
+    use_daily = bulk and FEATURES_DAILY_BLOBS and latest is None
+    if storage == 'wide' and not use_daily:
+        return load_frame(BtcFeatures, columns=columns, start=start, end=end, latest=latest,
+                          bind=bind, symbol=symbol, interval=interval)
+
+    derived = [col for col in columns if col in DERIVED_COLUMNS]
+    stored = [col for col in columns if col not in DERIVED_COLUMNS]
+    read_columns = stored + [col for col in ('timestamp', 'close') if col not in stored]
+
+    with _connect(bind) as conn:
+        if use_daily:
+            df = _load_daily(start, end, symbol, interval, conn)[read_columns]
+        else:
+            read_start = _warmup_start(conn, start, symbol, interval) if (derived and start is not None) else start
+            read_latest = latest + MAX_LAG if (derived and latest is not None) else latest
+            df = load_frame(BtcFeaturesCompact, columns=read_columns, start=read_start, end=end,
+                            latest=read_latest, float_dtype=np.float32, bind=conn,
+                            symbol=symbol, interval=interval)
+
+    df = restore_derived_columns(df, derived)
+    # Papildomos eilutės buvo reikalingos tik lag stulpeliams atkurti
+    if latest is not None:
+        df = df.iloc[-latest:] if latest > 0 else df.iloc[:0]
+    elif start is not None:
+        df = df[df['timestamp'] >= pd.Timestamp(start)]
+    return df[columns].reset_index(drop=True)
+
+def save_features(df, symbol=None, interval=None, storage=None, batch_size=None):
+    """
+    Įrašo arba atnaujina požymius pagal (symbol, interval, timestamp) pasirinktoje
+    lentelėje, o jei įjungti FEATURES_DAILY_BLOBS - ir dienos įrašuose
+
+    Grąžina:
+        dict: bulk_upsert() statistika (+ 'days' - įrašytų dienos įrašų skaičius)
+    """
+    model = features_model(storage)
+    df = df.assign(symbol=symbol or DEFAULT_SYMBOL, interval=interval or DEFAULT_INTERVAL)
+    if model is BtcFeaturesCompact:
+        # Apvaliname iki float32 dar prieš įrašant, kad visose DB būtų tos pačios reikšmės
+        df = df.astype({col: np.float32 for col in FLOAT_COLUMNS if col in df.columns})
+    stats = bulk_upsert(df, model, batch_size=batch_size)
+    if FEATURES_DAILY_BLOBS:
+        stats['days'] = save_daily_blobs(df, symbol, interval)
+    return stats
+
+def delete_features(symbol=None, interval=None, storage=None, bind=None):
+    """Ištrina vienos laiko eilutės požymius (ir jos dienos įrašus)"""
+    model = features_model(storage)
+    context = nullcontext(bind) if isinstance(bind, Connection) else (bind or engine).begin()
+    with context as conn:
+        deleted = conn.execute(delete(model.__table__).where(series_filter(model, symbol, interval))).rowcount
+        conn.execute(delete(BtcFeaturesDaily.__table__).where(series_filter(BtcFeaturesDaily, symbol, interval)))
+    return deleted
@@ -0,0 +1,112 @@
+"""
+Stulpelinis duomenų skaitymo modulis.
+Skaito tik reikalingus stulpelius per SQLAlchemy Core select(), gauna eilutes
+dalimis (server-side cursor) ir DataFrame kuria tiesiai iš NumPy masyvų,
+nekurdamas ORM objektų ir žodynų kiekvienai eilutei.
+Lentelėse su symbol/interval stulpeliais skaitoma viena laiko eilutė.
+"""
+import logging
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, DateTime, Float, Integer
+from sqlalchemy.engine import Connection
+
+from .config import engine
+from .models import SERIES_COLUMNS, series_filter
+
+logger = logging.getLogger("frame_loader")
+
+# Kiek eilučių gauname iš DB vienu kartu
+DEFAULT_CHUNK_SIZE = 50000
+
+def _get_table(target):
+    """Grąžina Table objektą iš ORM klasės arba paties Table"""
+    return getattr(target, '__table__', target)
+
+def _to_array(values, column_type, float_dtype):
+    """
+    Paverčia vieno stulpelio reikšmių rinkinį į NumPy masyvą pagal stulpelio tipą
+    """
+    if isinstance(column_type, Float):
+        # None automatiškai tampa NaN
+        return np.array(values, dtype=float_dtype)
+    if isinstance(column_type, Integer):
+        try:
+            return np.array(values, dtype=np.int64)
+        except TypeError:
+            # Stulpelyje yra NULL reikšmių - naudojame float su NaN
+            return np.array(values, dtype=np.float64)
+    if isinstance(column_type, DateTime):
+        return np.array(values, dtype='datetime64[ns]')
+    return np.array(values, dtype=object)
+
+def load_frame(target, columns=None, start=None, end=None, latest=None,
+               float_dtype=np.float64, chunk_size=DEFAULT_CHUNK_SIZE, bind=None,
+               symbol=None, interval=None):
+    """
+    Nuskaito lentelę į DataFrame, surūšiuotą pagal timestamp didėjimo tvarka
+
+    Parametrai:
+        target: ORM klasė (pvz. BtcFeatures) arba Table objektas
+        columns: Stulpelių sąrašas (pagal nutylėjimą - visi lentelės stulpeliai, išskyrus symbol/interval)
+        start: Imti eilutes nuo šio laiko (imtinai)
+        end: Imti eilutes iki šio laiko (imtinai)
+        latest: Jei nurodytas - imamos tik paskutinės N eilučių
+        float_dtype: np.float64 arba np.float32 Float stulpeliams
+        chunk_size: Kiek eilučių gauti iš DB vienu kartu
+        bind: Engine arba Connection (pagal nutylėjimą - bendras engine).
+              Perduotas Connection (pvz. session.connection()) neuždaromas.
+        symbol, interval: Laiko eilutė lentelėse su symbol/interval stulpeliais
+                          (pagal nutylėjimą - DEFAULT_SYMBOL ir DEFAULT_INTERVAL)
+
+    Grąžina:
+        DataFrame su nurodytais stulpeliais
+    """
+    table = _get_table(target)
+    has_series = all(name in table.c for name in SERIES_COLUMNS)
+    if columns:
+        selected = [table.c[name] for name in columns]
+    else:
+        selected = [col for col in table.columns if not (has_series and col.name in SERIES_COLUMNS)]
+    names = [col.name for col in selected]
+    timestamp = table.c.timestamp
+
+    stmt = select(*selected)
+    if has_series:
+        # Lygybė pagal rakto pradžią (symbol, interval) - toliau skenuojamas tik timestamp intervalas
+        stmt = stmt.where(series_filter(table, symbol, interval))
+    if start is not None:
+        stmt = stmt.where(timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(timestamp <= end)
+    if latest is not None:
+        # Naujausios N eilučių - rūšiuojame mažėjimo tvarka ir vėliau apverčiame
+        stmt = stmt.order_by(timestamp.desc()).limit(latest)
+    else:
+        stmt = stmt.order_by(timestamp)
+
+    parts = {name: [] for name in names}
+    bind = bind if bind is not None else engine
+
+    context = nullcontext(bind) if isinstance(bind, Connection) else bind.connect()
+    with context as conn:
+        # stream_results - server-side cursor, todėl visas rezultatas nelaikomas atmintyje.
+        # Nustatoma tik šiam sakiniui: conn.execution_options() pakeistų perduotą
+        # (pvz. užklausos sesijos) prisijungimą ir visoms vėlesnėms jo užklausoms
+        result = conn.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+        for rows in result.partitions():
+            # zip(*rows) - eilutes paverčiame stulpeliais
+            for col, values in zip(selected, zip(*rows)):
+                parts[col.name].append(_to_array(values, col.type, float_dtype))
+
+    arrays = {}
+    for col in selected:
+        if parts[col.name]:
+            array = np.concatenate(parts[col.name])
+        else:
+            array = _to_array([], col.type, float_dtype)
+        arrays[col.name] = array[::-1] if latest is not None else array
+
+    return pd.DataFrame(arrays, columns=names)
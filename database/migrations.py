@@ -0,0 +1,231 @@
+"""
+Duomenų bazės schemos migracijos.
+Kiekviena migracija skirta jau egzistuojančioms lentelėms - naujose
+duomenų bazėse create_tables() iš karto sukuria naują schemą.
+"""
+import re
+import logging
+from sqlalchemy import inspect, text
+
+from .config import engine, DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from .partitioning import DB_PARTITION_BY_MONTH, PARTITIONED_TABLES, partition_by_month
+
+logger = logging.getLogger("db_migrations")
+
+def _index_names(table_name, bind=None):
+    """Grąžina lentelės indeksų pavadinimus"""
+    inspector = inspect(bind if bind is not None else engine)
+    return {index['name']: index for index in inspector.get_indexes(table_name)}
+
+def migrate_btc_prices_unique_timestamp(bind=None):
+    """
+    btc_prices.timestamp indeksą paverčia unikaliu, kad būtų galima daryti upsert.
+    Prieš tai pašalina pasikartojančius įrašus, palikdamas seniausią (mažiausią id).
+
+    Grąžina:
+        bool: True jei pavyko (arba migracija jau atlikta), False jei nepavyko
+    """
+    bind = bind if bind is not None else engine
+    try:
+        index = _index_names('btc_prices', bind).get('ix_btc_prices_timestamp')
+        if index and index.get('unique'):
+            logger.info("btc_prices.timestamp jau unikalus - migracija nereikalinga")
+            return True
+
+        with bind.begin() as conn:
+            deleted = conn.execute(text(
+                "DELETE p1 FROM btc_prices p1 "
+                "JOIN btc_prices p2 ON p1.timestamp = p2.timestamp AND p1.id > p2.id"
+            )).rowcount
+            logger.info(f"Pašalinta {deleted} pasikartojančių btc_prices įrašų")
+
+            drop = "DROP INDEX ix_btc_prices_timestamp, " if index else ""
+            conn.execute(text(
+                f"ALTER TABLE btc_prices {drop}"
+                "ADD UNIQUE INDEX ix_btc_prices_timestamp (timestamp)"
+            ))
+
+        logger.info("btc_prices.timestamp indeksas pakeistas į unikalų")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida migruojant btc_prices: {e}")
+        return False
+
+def migrate_ml_models_search_columns(bind=None):
+    """
+    Prideda ml_models lentelei params ir status stulpelius
+    (naudojami hiperparametrų paieškos bandymams saugoti)
+
+    Grąžina:
+        bool: True jei pavyko (arba migracija jau atlikta), False jei nepavyko
+    """
+    bind = bind if bind is not None else engine
+    try:
+        existing = {column['name'] for column in inspect(bind).get_columns('ml_models')}
+        additions = []
+        if 'params' not in existing:
+            additions.append("ADD COLUMN params TEXT")
+        if 'status' not in existing:
+            additions.append("ADD COLUMN status VARCHAR(20) DEFAULT 'trained'")
+        if not additions:
+            logger.info("ml_models jau turi params ir status stulpelius - migracija nereikalinga")
+            return True
+
+        with bind.begin() as conn:
+            conn.execute(text(f"ALTER TABLE ml_models {', '.join(additions)}"))
+
+        logger.info("ml_models lentelei pridėti paieškos stulpeliai")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida migruojant ml_models: {e}")
+        return False
+
+def migrate_training_jobs_active_key(bind=None):
+    """
+    Prideda training_jobs.active stulpelį ir unikalų (dedup_key, active) raktą,
+    kad dvi vienu metu pateiktos vienodos užduotys nebūtų abi įrašytos.
+    Jei aktyvių dublikatų jau yra - aktyvia paliekama naujausia užduotis.
+
+    Grąžina:
+        bool: True jei pavyko (arba migracija jau atlikta), False jei nepavyko
+    """
+    bind = bind if bind is not None else engine
+    try:
+        inspector = inspect(bind)
+        if not inspector.has_table('training_jobs'):
+            logger.info("training_jobs lentelės nėra - migracija nereikalinga")
+            return True
+        existing = {column['name'] for column in inspector.get_columns('training_jobs')}
+        if 'active' in existing:
+            logger.info("training_jobs jau turi active stulpelį - migracija nereikalinga")
+            return True
+
+        with bind.begin() as conn:
+            conn.execute(text("ALTER TABLE training_jobs ADD COLUMN active BOOLEAN NULL"))
+            # Išvestinė lentelė reikalinga MySQL, kuri neleidžia UPDATE skaityti tos pačios lentelės
+            conn.execute(text(
+                "UPDATE training_jobs SET active = 1 WHERE id IN ("
+                "SELECT id FROM (SELECT MAX(id) AS id FROM training_jobs "
+                "WHERE status IN ('queued', 'running', 'done') GROUP BY dedup_key) AS latest)"
+            ))
+            conn.execute(text(
+                "CREATE UNIQUE INDEX uq_training_jobs_active ON training_jobs (dedup_key, active)"
+            ))
+
+        logger.info("training_jobs lentelei pridėtas unikalus (dedup_key, active) raktas")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida migruojant training_jobs: {e}")
+        return False
+
+# Naujas btc_ohlcv / btc_features pirminis raktas
+SERIES_KEY = ['symbol', 'interval', 'timestamp']
+
+# Senos API_TO_SQL lentelės kitiems intervalams, pvz. btc_ohlcv_1h
+LEGACY_INTERVAL_TABLE_RE = re.compile(r'btc_ohlcv_(\d+[mhdwM])')
+
+def migrate_series_key(table_name, bind=None):
+    """
+    Prideda symbol ir interval stulpelius ir pakeičia pirminį raktą į
+    (symbol, interval, timestamp). Esamiems įrašams priskiriama numatytoji
+    laiko eilutė (DEFAULT_SYMBOL, DEFAULT_INTERVAL).
+    Sena API_TO_SQL btc_ohlcv lentelė (id raktas ir unikalus uix_timestamp) taip pat pertvarkoma.
+
+    Grąžina:
+        bool: True jei pavyko (arba migracija jau atlikta), False jei nepavyko
+    """
+    bind = bind if bind is not None else engine
+    try:
+        inspector = inspect(bind)
+        if not inspector.has_table(table_name):
+            logger.info(f"Lentelės {table_name} nėra - ji bus sukurta su nauju raktu")
+            return True
+        if inspector.get_pk_constraint(table_name)['constrained_columns'] == SERIES_KEY:
+            logger.info(f"{table_name} jau turi (symbol, interval, timestamp) raktą - migracija nereikalinga")
+            return True
+
+        existing = {column['name'] for column in inspector.get_columns(table_name)}
+        changes = []
+        if 'symbol' not in existing:
+            changes.append(f"ADD COLUMN symbol VARCHAR(20) NOT NULL DEFAULT '{DEFAULT_SYMBOL}' FIRST")
+        if 'interval' not in existing:
+            changes.append(f"ADD COLUMN `interval` VARCHAR(8) NOT NULL DEFAULT '{DEFAULT_INTERVAL}' AFTER symbol")
+        if 'id' in existing:
+            # Pašalinus AUTO_INCREMENT id pašalinamas ir jo pirminis raktas
+            changes.append("DROP COLUMN id")
+        elif inspector.get_pk_constraint(table_name)['constrained_columns']:
+            changes.append("DROP PRIMARY KEY")
+        # Unikalus timestamp indeksas trukdytų saugoti kelias laiko eilutes
+        for index in inspector.get_indexes(table_name):
+            if index.get('unique') and index['column_names'] == ['timestamp']:
+                changes.append(f"DROP INDEX {index['name']}")
+        changes.append("ADD PRIMARY KEY (symbol, `interval`, timestamp)")
+
+        with bind.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table_name} {', '.join(changes)}"))
+
+        logger.info(f"{table_name} raktas pakeistas į (symbol, interval, timestamp)")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida migruojant {table_name} raktą: {e}")
+        return False
+
+def migrate_legacy_interval_tables(bind=None):
+    """
+    Perkelia senas btc_ohlcv_<intervalas> lenteles į btc_ohlcv su interval stulpeliu.
+    Jei intervalo duomenys btc_ohlcv jau yra, lentelė praleidžiama.
+    Senos lentelės neištrinamos - jas galima pašalinti rankiniu būdu.
+
+    Grąžina:
+        bool: True jei pavyko (arba perkelti nėra ką), False jei nepavyko
+    """
+    bind = bind if bind is not None else engine
+    try:
+        inspector = inspect(bind)
+        if not inspector.has_table('btc_ohlcv'):
+            logger.warning("Lentelės btc_ohlcv nėra - pirmiausia sukurkite lenteles (create_tables)")
+            return True
+        for table_name in inspector.get_table_names():
+            match = LEGACY_INTERVAL_TABLE_RE.fullmatch(table_name)
+            if not match:
+                continue
+            interval = match.group(1)
+            params = {'symbol': DEFAULT_SYMBOL, 'interval': interval}
+            with bind.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM btc_ohlcv WHERE symbol = :symbol AND `interval` = :interval LIMIT 1"
+                ), params).first()
+                if exists:
+                    logger.info(f"{table_name}: intervalas {interval} jau perkeltas į btc_ohlcv")
+                    continue
+                copied = conn.execute(text(
+                    "INSERT IGNORE INTO btc_ohlcv (symbol, `interval`, timestamp, open, high, low, close, volume) "
+                    f"SELECT :symbol, :interval, timestamp, open, high, low, close, volume FROM {table_name}"
+                ), params).rowcount
+            logger.info(f"{table_name}: į btc_ohlcv perkelta {copied} eilučių (sena lentelė paliekama)")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida perkeliant senas intervalų lenteles: {e}")
+        return False
+
+def run_migrations(bind=None, partition=DB_PARTITION_BY_MONTH):
+    """
+    Paleidžia visas migracijas iš eilės.
+    Jei partition=True (DB_PARTITION_BY_MONTH=1) - btc_ohlcv ir btc_features
+    suskaidomos pagal mėnesius arba pridedamos naujų mėnesių dalys.
+    """
+    results = [
+        migrate_btc_prices_unique_timestamp(bind),
+        migrate_ml_models_search_columns(bind),
+        migrate_training_jobs_active_key(bind),
+        migrate_series_key('btc_ohlcv', bind),
+        migrate_series_key('btc_features', bind),
+        migrate_legacy_interval_tables(bind),
+    ]
+    if partition:
+        results += [partition_by_month(table_name, bind=bind) for table_name in PARTITIONED_TABLES]
+    return all(results)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    run_migrations()
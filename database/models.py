@@ -4,16 +4,35 @@ Apibrėžia duomenų bazės struktūrą ir ryšius tarp lentelių.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, Boolean, Text
+from sqlalchemy import (
+    Column, Integer, Float, DateTime, Date, String, ForeignKey, Boolean, Text, LargeBinary, UniqueConstraint,
+    PrimaryKeyConstraint, and_
+)
 from sqlalchemy.orm import relationship
-from .config import Base, engine, SessionLocal
+from .config import Base, engine, SessionLocal, DEFAULT_SYMBOL, DEFAULT_INTERVAL
+
+# 4 baitų slankiojo kablelio tipas (MySQL FLOAT, PostgreSQL REAL) kompaktiškoms lentelėms.
+# Vien Float kai kuriose DB tampa 8 baitų DOUBLE, todėl tikslumas nurodomas aiškiai
+FLOAT32 = Float(precision=24)
+
+# Laiko eilutę nusakantys stulpeliai - kartu su timestamp sudaro btc_ohlcv ir btc_features raktą
+SERIES_COLUMNS = ('symbol', 'interval')
+
+def series_filter(target, symbol=None, interval=None):
+    """
+    Sąlyga vienai laiko eilutei (pagal nutylėjimą - DEFAULT_SYMBOL ir DEFAULT_INTERVAL).
+    Tinka ir ORM užklausoms, ir Core select(), nes naudojami lentelės stulpeliai.
+    """
+    table = getattr(target, '__table__', target)
+    return and_(table.c.symbol == (symbol or DEFAULT_SYMBOL),
+                table.c.interval == (interval or DEFAULT_INTERVAL))
 
 class BtcPrice(Base):
     """Bitcoin kainos"""
     __tablename__ = "btc_prices"
     
     id = Column(Integer, primary_key=True, index=True) 
-    timestamp = Column(DateTime, nullable=False, index=True) 
+    timestamp = Column(DateTime, nullable=False, index=True, unique=True)  # Unikalus - leidžia upsert pagal laiką
     open = Column(Float, nullable=False)
     high = Column(Float, nullable=False)
     low = Column(Float, nullable=False)
@@ -64,8 +83,15 @@ class ModelResult(Base):
 class BtcOHLCV(Base):
     """Bitcoin OHLCV duomenys (naujas modelis techninei analizei)"""
     __tablename__ = 'btc_ohlcv'
+    __table_args__ = (
+        # Sudėtinis raktas: "naujausios N" ir laiko intervalo užklausos vienai eilutei
+        # skaito tik raktą iš eilės, be rūšiavimo. timestamp rakte leidžia RANGE skaidymą
+        PrimaryKeyConstraint('symbol', 'interval', 'timestamp', name='pk_btc_ohlcv'),
+    )
     
-    timestamp = Column(DateTime, primary_key=True)
+    symbol = Column(String(20), nullable=False, default=DEFAULT_SYMBOL, server_default=DEFAULT_SYMBOL)
+    interval = Column(String(8), nullable=False, default=DEFAULT_INTERVAL, server_default=DEFAULT_INTERVAL)
+    timestamp = Column(DateTime, nullable=False)
     open = Column(Float, nullable=False)
     high = Column(Float, nullable=False)
     low = Column(Float, nullable=False)
@@ -74,15 +100,22 @@ class BtcOHLCV(Base):
     
     def __repr__(self):
         """Kaip atvaizduojamas objektas spausdinant"""
-        return f"<BtcOHLCV(timestamp='{self.timestamp}', close={self.close})>"
+        return f"<BtcOHLCV(symbol='{self.symbol}', interval='{self.interval}', timestamp='{self.timestamp}', close={self.close})>"
 
 
 class BtcFeatures(Base):
     """Bitcoin techniniai indikatoriai (naujas modelis)"""
     __tablename__ = 'btc_features'
+    __table_args__ = (
+        PrimaryKeyConstraint('symbol', 'interval', 'timestamp', name='pk_btc_features'),
+    )
+    
+    # Laiko eilutė (žr. BtcOHLCV)
+    symbol = Column(String(20), nullable=False, default=DEFAULT_SYMBOL, server_default=DEFAULT_SYMBOL)
+    interval = Column(String(8), nullable=False, default=DEFAULT_INTERVAL, server_default=DEFAULT_INTERVAL)
     
     # Pagrindiniai duomenys
-    timestamp = Column(DateTime, primary_key=True)
+    timestamp = Column(DateTime, nullable=False)
     open = Column(Float, nullable=False)
     high = Column(Float, nullable=False)
     low = Column(Float, nullable=False)
@@ -141,7 +174,78 @@ class BtcFeatures(Base):
     
     def __repr__(self):
         """Kaip atvaizduojamas objektas spausdinant"""
-        return f"<BtcFeatures(timestamp='{self.timestamp}', target={self.target})>"
+        return f"<BtcFeatures(symbol='{self.symbol}', interval='{self.interval}', timestamp='{self.timestamp}', target={self.target})>"
+
+
+class BtcFeaturesCompact(Base):
+    """
+    Kompaktiška btc_features versija (FEATURES_STORAGE=compact):
+    visi indikatoriai 4 baitų FLOAT, o close_lag_* ir return_lag_* nesaugomi -
+    jie atkuriami skaitant iš close stulpelio (žr. database/feature_store.py)
+    """
+    __tablename__ = 'btc_features_compact'
+    __table_args__ = (
+        PrimaryKeyConstraint('symbol', 'interval', 'timestamp', name='pk_btc_features_compact'),
+    )
+    
+    symbol = Column(String(20), nullable=False, default=DEFAULT_SYMBOL, server_default=DEFAULT_SYMBOL)
+    interval = Column(String(8), nullable=False, default=DEFAULT_INTERVAL, server_default=DEFAULT_INTERVAL)
+    timestamp = Column(DateTime, nullable=False)
+    open = Column(FLOAT32, nullable=False)
+    high = Column(FLOAT32, nullable=False)
+    low = Column(FLOAT32, nullable=False)
+    close = Column(FLOAT32, nullable=False)
+    volume = Column(FLOAT32, nullable=False)
+    
+    sma_5 = Column(FLOAT32)
+    sma_10 = Column(FLOAT32)
+    sma_20 = Column(FLOAT32)
+    sma_50 = Column(FLOAT32)
+    sma_200 = Column(FLOAT32)
+    
+    ema_5 = Column(FLOAT32)
+    ema_10 = Column(FLOAT32)
+    ema_20 = Column(FLOAT32)
+    ema_50 = Column(FLOAT32)
+    ema_200 = Column(FLOAT32)
+    
+    rsi_14 = Column(FLOAT32)
+    
+    macd = Column(FLOAT32)
+    macd_signal = Column(FLOAT32)
+    macd_histogram = Column(FLOAT32)
+    
+    bb_middle = Column(FLOAT32)
+    bb_upper = Column(FLOAT32)
+    bb_lower = Column(FLOAT32)
+    bb_width = Column(FLOAT32)
+    
+    target = Column(Integer)
+    
+    def __repr__(self):
+        """Kaip atvaizduojamas objektas spausdinant"""
+        return f"<BtcFeaturesCompact(symbol='{self.symbol}', interval='{self.interval}', timestamp='{self.timestamp}')>"
+
+class BtcFeaturesDaily(Base):
+    """
+    Vienos dienos kompaktiški požymiai viename dvejetainiame įraše (FEATURES_DAILY_BLOBS=1).
+    Skirta dideliems nuskaitymams (treniravimui) - viena eilutė vietoj šimtų
+    """
+    __tablename__ = 'btc_features_daily'
+    __table_args__ = (
+        PrimaryKeyConstraint('symbol', 'interval', 'day', name='pk_btc_features_daily'),
+    )
+    
+    symbol = Column(String(20), nullable=False, default=DEFAULT_SYMBOL, server_default=DEFAULT_SYMBOL)
+    interval = Column(String(8), nullable=False, default=DEFAULT_INTERVAL, server_default=DEFAULT_INTERVAL)
+    day = Column(Date, nullable=False)
+    row_count = Column(Integer, nullable=False)  # Eilučių skaičius dienoje
+    # NumPy .npy struktūrinis masyvas (timestamp int64 + float32 stulpeliai), MySQL - MEDIUMBLOB
+    data = Column(LargeBinary(length=2 ** 24 - 1), nullable=False)
+    
+    def __repr__(self):
+        """Kaip atvaizduojamas objektas spausdinant"""
+        return f"<BtcFeaturesDaily(symbol='{self.symbol}', interval='{self.interval}', day='{self.day}', rows={self.row_count})>"
 
 
 class MLModel(Base):
@@ -156,11 +260,90 @@ class MLModel(Base):
     recall = Column(Float)
     f1_score = Column(Float)
     model_path = Column(String(255))
+    params = Column(Text)  # Modelio parametrai JSON formatu
+    status = Column(String(20), default='trained')  # trained, trial arba promoted
     
     def __repr__(self):
         """Kaip atvaizduojamas objektas spausdinant"""
         return f"<MLModel(id={self.id}, name='{self.name}', accuracy={self.accuracy})>"
 
+class TrainingJob(Base):
+    """Foninės modelio treniravimo užduotys"""
+    __tablename__ = 'training_jobs'
+    __table_args__ = (
+        # Vienu metu tik viena aktyvi užduotis su tuo pačiu raktu. Nepavykusių ir
+        # pasenusių užduočių active = NULL, o NULL reikšmės unikalumo nepažeidžia
+        UniqueConstraint('dedup_key', 'active', name='uq_training_jobs_active'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Užduoties parametrų ir duomenų versijos maiša - tos pačios užduotys nepaleidžiamos du kartus
+    dedup_key = Column(String(64), nullable=False, index=True)
+    active = Column(Boolean, nullable=True, default=True)  # True - laukia, vykdoma arba baigta; NULL - nepavyko
+    model_type = Column(String(50), nullable=False)
+    params = Column(Text)  # Modelio parametrai JSON formatu
+    test_size = Column(Float)
+    data_version = Column(String(100))
+    status = Column(String(20), nullable=False, default='queued')  # queued, running, done, failed
+    progress = Column(Float, default=0.0)  # Nuo 0 iki 1
+    message = Column(String(255))
+    result = Column(Text)  # Metrikos JSON formatu
+    model_id = Column(Integer, ForeignKey("ml_models.id"), nullable=True)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    def __repr__(self):
+        """Kaip atvaizduojamas objektas spausdinant"""
+        return f"<TrainingJob(id={self.id}, model_type='{self.model_type}', status='{self.status}')>"
+
+class Prediction(Base):
+    """Modelio prognozės kiekvienam btc_features laiko žymeniui"""
+    __tablename__ = 'predictions'
+    __table_args__ = (
+        # Vienam modeliui viena prognozė kiekvienam laikui - leidžia upsert
+        UniqueConstraint('model_id', 'timestamp', name='uq_predictions_model_timestamp'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    model_id = Column(Integer, ForeignKey("ml_models.id"), nullable=False)
+    timestamp = Column(DateTime, nullable=False, index=True)
+    prediction = Column(Integer, nullable=False)  # 1-kils, 0-kris
+    probability = Column(Float)  # Tikimybė kainai kilti
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        """Kaip atvaizduojamas objektas spausdinant"""
+        return f"<Prediction(model_id={self.model_id}, timestamp='{self.timestamp}', prediction={self.prediction})>"
+
+class NewsArticle(Base):
+    """Naujienų straipsniai su sentimento įverčiais (straipsnis atsiunčiamas ir vertinamas vieną kartą)"""
+    __tablename__ = 'news_articles'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String(768), nullable=False, unique=True, index=True)
+    source = Column(String(50))
+    title = Column(String(500))
+    published_at = Column(DateTime, index=True)  # Iš article:published_time, jei svetainė ją pateikia
+    first_seen_at = Column(DateTime, default=datetime.utcnow, index=True)
+    fetched_at = Column(DateTime)  # Paskutinė užklausa (taip pat ir 304 atsakymas)
+    scored_at = Column(DateTime)
+    # Sąlyginėms užklausoms (If-None-Match / If-Modified-Since)
+    etag = Column(String(255))
+    last_modified = Column(String(64))
+    content_hash = Column(String(64))  # Ištraukto teksto sha256 - nepasikeitęs tekstas nevertinamas iš naujo
+    polarity = Column(Float)
+    subjectivity = Column(Float)
+    compound = Column(Float)
+    neg = Column(Float)
+    neu = Column(Float)
+    pos = Column(Float)
+    
+    def __repr__(self):
+        """Kaip atvaizduojamas objektas spausdinant"""
+        return f"<NewsArticle(id={self.id}, source='{self.source}', url='{self.url}')>"
+
 def test_connection():
     """DB prisijungimo testas"""
     try:
@@ -0,0 +1,151 @@
+"""
+MySQL RANGE skaidymas (partitioning) pagal mėnesius.
+btc_ohlcv ir btc_features lentelės skaidomos pagal timestamp: kiekvienas mėnuo -
+atskira dalis, todėl užklausos su timestamp intervalu skaito tik reikiamas dalis
+(partition pruning), o seną istoriją galima pašalinti DROP PARTITION be DELETE.
+Skaidyti galima, nes pirminis raktas (symbol, interval, timestamp) turi timestamp.
+
+Skaidymas nebūtinas - įjungiamas DB_PARTITION_BY_MONTH=1 (žr. migrations.py).
+Kitose DB (pvz. SQLite testams) skaidymas praleidžiamas.
+"""
+import os
+import logging
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from .config import engine
+
+logger = logging.getLogger("db_partitioning")
+
+# Ar run_migrations() turi skaidyti lenteles
+DB_PARTITION_BY_MONTH = os.environ.get("DB_PARTITION_BY_MONTH", "0") in ("1", "true", "True")
+
+# Kiek mėnesių į priekį sukurti dalis (kad nauji duomenys nepatektų į p_future)
+PARTITION_MONTHS_AHEAD = int(os.environ.get("DB_PARTITION_MONTHS_AHEAD", 3))
+
+# Lentelės, kurios skaidomos pagal mėnesius
+PARTITIONED_TABLES = ('btc_ohlcv', 'btc_features')
+
+# Paskutinė dalis visiems vėlesniems laikams
+FUTURE_PARTITION = 'p_future'
+
+def month_partitions(start, end):
+    """
+    Mėnesių dalys nuo start iki end mėnesio (imtinai).
+
+    Grąžina:
+        list: [(pavadinimas, riba)], pvz. ('p202401', '2024-02-01') -
+              dalyje p202401 laikomi įrašai, kurių timestamp < 2024-02-01
+    """
+    first = pd.Timestamp(start).to_period('M')
+    last = pd.Timestamp(end).to_period('M')
+    return [(f"p{month.strftime('%Y%m')}", (month + 1).start_time.strftime('%Y-%m-%d'))
+            for month in pd.period_range(first, last, freq='M')]
+
+def partition_definitions(partitions):
+    """PARTITION ... VALUES LESS THAN (...) sąrašas su paskutine p_future dalimi"""
+    definitions = [f"PARTITION {name} VALUES LESS THAN ('{boundary}')" for name, boundary in partitions]
+    definitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return ', '.join(definitions)
+
+def _default_end():
+    """Paskutinis mėnuo, kuriam iš anksto kuriama dalis"""
+    return pd.Timestamp.now() + pd.DateOffset(months=PARTITION_MONTHS_AHEAD)
+
+def _boundary(description):
+    """Dalies riba YYYY-MM-DD formatu (information_schema ją grąžina kaip SQL literalą)"""
+    value = (description or '').strip("'")
+    return value if value in ('', 'MAXVALUE') else pd.Timestamp(value).strftime('%Y-%m-%d')
+
+def get_partitions(table_name, bind=None):
+    """
+    Grąžina lentelės dalių pavadinimus ir ribas (tuščias sąrašas, jei lentelė neskaidyta)
+
+    Grąžina:
+        list: [(pavadinimas, riba)] pagal eilės tvarką
+    """
+    bind = bind if bind is not None else engine
+    with bind.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ), {'table': table_name}).all()
+    return [(name, _boundary(description)) for name, description in rows]
+
+def partition_by_month(table_name, start=None, end=None, bind=None):
+    """
+    Suskaido lentelę pagal timestamp mėnesius (RANGE COLUMNS).
+    Jei lentelė jau suskaidyta - tik pridedamos trūkstamos dalys iki end.
+
+    Parametrai:
+        table_name: Lentelės pavadinimas (pvz. 'btc_ohlcv')
+        start: Pirmas mėnuo (pagal nutylėjimą - seniausias lentelės timestamp)
+        end: Paskutinis mėnuo (pagal nutylėjimą - PARTITION_MONTHS_AHEAD mėnesių į priekį)
+
+    Grąžina:
+        bool: True jei pavyko (arba skaidyti nereikia), False jei nepavyko
+    """
+    bind = bind if bind is not None else engine
+    if bind.dialect.name != 'mysql':
+        logger.info(f"{table_name}: RANGE skaidymas galimas tik MySQL - praleidžiama")
+        return True
+    try:
+        if not inspect(bind).has_table(table_name):
+            logger.info(f"Lentelės {table_name} nėra - skaidymas praleidžiamas")
+            return True
+        if get_partitions(table_name, bind):
+            return add_month_partitions(table_name, end, bind)
+
+        with bind.connect() as conn:
+            oldest = conn.execute(text(f"SELECT MIN(timestamp) FROM {table_name}")).scalar()
+        start = start or oldest or pd.Timestamp.now()
+        partitions = month_partitions(start, end or _default_end())
+
+        # ALTER perrašo visą lentelę - didelėms lentelėms gali užtrukti
+        logger.info(f"{table_name}: skaidoma į {len(partitions) + 1} dalis nuo {partitions[0][0]}")
+        with bind.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {table_name} PARTITION BY RANGE COLUMNS(timestamp) "
+                f"({partition_definitions(partitions)})"
+            ))
+        logger.info(f"{table_name}: suskaidyta pagal mėnesius")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida skaidant {table_name}: {e}")
+        return False
+
+def add_month_partitions(table_name, end=None, bind=None):
+    """
+    Prideda naujų mėnesių dalis iki end, padalindama p_future dalį
+    (REORGANIZE PARTITION - p_future paprastai tuščia, todėl greita).
+    Skirta periodiškai paleisti, kad nauji duomenys nepatektų į p_future.
+
+    Grąžina:
+        bool: True jei pavyko (arba naujų dalių nereikia), False jei nepavyko
+    """
+    bind = bind if bind is not None else engine
+    try:
+        existing = get_partitions(table_name, bind)
+        last_boundary = max((boundary for name, boundary in existing if name != FUTURE_PARTITION), default=None)
+        if last_boundary is None:
+            logger.warning(f"{table_name} neskaidyta mėnesiais - naudokite partition_by_month()")
+            return False
+
+        end = pd.Timestamp(end or _default_end())
+        partitions = [p for p in month_partitions(last_boundary, end) if p[1] > last_boundary]
+        if not partitions:
+            logger.info(f"{table_name}: visos dalys iki {end:%Y-%m} jau yra")
+            return True
+
+        with bind.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {table_name} REORGANIZE PARTITION {FUTURE_PARTITION} "
+                f"INTO ({partition_definitions(partitions)})"
+            ))
+        logger.info(f"{table_name}: pridėtos dalys {partitions[0][0]} - {partitions[-1][0]}")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida pridedant {table_name} dalis: {e}")
+        return False
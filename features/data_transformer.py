@@ -8,13 +8,19 @@ import os
 import sys
 import logging
 from datetime import datetime
+from sqlalchemy import func
 
 # Šis kelias leidžia importuoti modulius iš kitų direktorijų
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Importuojame duomenų bazės prisijungimą
 from database.config import engine, SessionLocal
 # Importuojame duomenų bazės modelius
-from database.models import BtcOHLCV, BtcFeatures
+from database.models import BtcOHLCV, series_filter
+# Importuojame požymių saugojimo funkcijas (wide arba compact lentelė, FEATURES_STORAGE)
+from database.feature_store import features_model, save_features, delete_features
+from database.feature_snapshot import write_snapshot, invalidate_snapshot
+# Importuojame stulpelinio skaitymo funkciją
+from database.frame_loader import load_frame
 # Importuojame techninių indikatorių skaičiavimo funkcijas
 from features.technical_indicators import create_all_features
 
@@ -22,39 +28,25 @@ from features.technical_indicators import create_all_features
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger("data_transformer")
 
-def get_ohlcv_data():
+# Kiek ankstesnių eilučių paimame prieš naujus duomenis inkrementiniame režime.
+# SMA 200 užtenka 200 eilučių, bet EMA 200 yra rekursinis - su 5x span langu
+# pradinės reikšmės įtaka galutiniam rezultatui tampa mažesnė nei 0.01%
+WARMUP_PERIODS = 1000
+
+def get_ohlcv_data(start=None, symbol=None, interval=None):
     """
-    Ši funkcija paima BTC kainos duomenis iš duomenų bazės naudojant SQLAlchemy ORM
+    Ši funkcija paima BTC kainos duomenis iš duomenų bazės stulpeliniu
+    skaitymu (be ORM objektų kūrimo kiekvienai eilutei)
+    
+    Parametrai:
+        start: Jei nurodytas - imamos tik eilutės nuo šio laiko (imtinai)
+        symbol, interval: Laiko eilutė (pagal nutylėjimą - DEFAULT_SYMBOL ir DEFAULT_INTERVAL)
     
     Grąžina:
         DataFrame su OHLCV (Open-High-Low-Close-Volume) duomenimis
     """
     try:
-        # Sukuriame sesiją
-        session = SessionLocal()
-        
-        # Naudojame ORM užklausą vietoj raw SQL
-        # query() metodas leidžia mums naudoti ORM klasę tiesiogiai
-        ohlcv_records = session.query(BtcOHLCV).order_by(BtcOHLCV.timestamp).all()
-        
-        # Konvertuojame ORM objektus į DataFrame
-        data = []
-        for record in ohlcv_records:
-            # Kiekvienas record yra BtcOHLCV objektas, kurį konvertuojame į žodyną
-            data.append({
-                'timestamp': record.timestamp,
-                'open': record.open,
-                'high': record.high,
-                'low': record.low,
-                'close': record.close,
-                'volume': record.volume
-            })
-        
-        # Sukuriame DataFrame iš duomenų sąrašo
-        df = pd.DataFrame(data)
-        
-        # Uždarome sesiją
-        session.close()
+        df = load_frame(BtcOHLCV, start=start, symbol=symbol, interval=interval)
         
         # Išvedame informaciją kiek eilučių gavome
         logger.info(f"Iš DB gauta {len(df)} OHLCV eilučių")
@@ -62,129 +54,166 @@ def get_ohlcv_data():
     except Exception as e:
         # Jei įvyko klaida - išvedame klaidą
         logger.error(f"Klaida gaunant duomenis: {e}")
-        # Užtikriname, kad sesija būtų uždaryta net jei įvyko klaida
-        if 'session' in locals():
-            session.close()
         # Grąžiname tuščią DataFrame
         return pd.DataFrame()
 
-def save_features_to_db(df, table_name='btc_features'):
+def save_features_to_db(df, table_name=None, batch_size=None, symbol=None, interval=None):
     """
     Ši funkcija įrašo apskaičiuotus techninius indikatorius į duomenų bazę
-    naudojant SQLAlchemy ORM objektus
+    dideliais INSERT ... ON DUPLICATE KEY UPDATE paketais
     
     Parametrai:
         df: DataFrame su techniniais indikatoriais
-        table_name: Lentelės pavadinimas duomenų bazėje
+        table_name: Lentelės pavadinimas žurnalui (pagal nutylėjimą - pagal FEATURES_STORAGE)
+        batch_size: Eilučių skaičius viename INSERT sakinyje
+        symbol, interval: Laiko eilutė (kitų eilučių įrašai neištrinami)
     
     Grąžina:
         bool: True jei pavyko, False jei nepavyko
     """
+    table_name = table_name or features_model().__tablename__
     try:
-        # Sukuriame sesiją
-        session = SessionLocal()
-        
-        # Ištriname visus senus įrašus - naudojame ORM
-        session.query(BtcFeatures).delete()
-        session.commit()
+        # Ištriname senus šios laiko eilutės įrašus (ir jos dienos įrašus)
+        delete_features(symbol, interval)
         logger.info(f"Lentelė {table_name} išvalyta")
         
-        # Įrašome naujus duomenis po vieną eilutę
-        records_added = 0
-        for _, row in df.iterrows():
-            # Sukuriame naują BtcFeatures objektą pagal mūsų ORM modelį
-            feature_record = BtcFeatures(
-                timestamp=row['timestamp'],
-                open=row['open'],
-                high=row['high'],
-                low=row['low'],
-                close=row['close'],
-                volume=row['volume'],
-                
-                # SMA
-                sma_5=row.get('sma_5'),
-                sma_10=row.get('sma_10'),
-                sma_20=row.get('sma_20'),
-                sma_50=row.get('sma_50'),
-                sma_200=row.get('sma_200'),
-                
-                # EMA
-                ema_5=row.get('ema_5'),
-                ema_10=row.get('ema_10'),
-                ema_20=row.get('ema_20'),
-                ema_50=row.get('ema_50'),
-                ema_200=row.get('ema_200'),
-                
-                # RSI
-                rsi_14=row.get('rsi_14'),
-                
-                # MACD
-                macd=row.get('macd'),
-                macd_signal=row.get('macd_signal'),
-                macd_histogram=row.get('macd_histogram'),
-                
-                # Bollinger Bands
-                bb_middle=row.get('bb_middle'),
-                bb_upper=row.get('bb_upper'),
-                bb_lower=row.get('bb_lower'),
-                bb_width=row.get('bb_width'),
-                
-                # Lag features
-                close_lag_1=row.get('close_lag_1'),
-                close_lag_2=row.get('close_lag_2'),
-                close_lag_3=row.get('close_lag_3'),
-                close_lag_5=row.get('close_lag_5'),
-                close_lag_7=row.get('close_lag_7'),
-                close_lag_14=row.get('close_lag_14'),
-                close_lag_21=row.get('close_lag_21'),
-                
-                return_lag_1=row.get('return_lag_1'),
-                return_lag_2=row.get('return_lag_2'),
-                return_lag_3=row.get('return_lag_3'),
-                return_lag_5=row.get('return_lag_5'),
-                return_lag_7=row.get('return_lag_7'),
-                return_lag_14=row.get('return_lag_14'),
-                return_lag_21=row.get('return_lag_21'),
-                
-                # Target
-                target=row.get('target')
-            )
-            
-            # Pridedame objektą į sesiją
-            session.add(feature_record)
-            records_added += 1
-            
-            # Komituojame kas 100 įrašų, kad neperkrauti atminties
-            if records_added % 100 == 0:
-                session.commit()
-                logger.info(f"Įrašyta {records_added} eilučių...")
-        
-        # Galutinis komitas
-        session.commit()
-        session.close()
+        # Stulpelių sąrašas imamas iš lentelės aprašymo, todėl nereikia kurti ORM objektų,
+        # o kompaktiškoje lentelėje nesančių lag stulpelių tiesiog neįrašome
+        stats = save_features(df, symbol, interval, batch_size=batch_size)
         
-        logger.info(f"Į lentelę {table_name} įrašyta {records_added} eilučių")
+        logger.info(f"Į lentelę {table_name} įrašyta {stats['rows']} eilučių "
+                    f"({stats['rows_per_sec']:.0f} eil./s)")
         return True
     except Exception as e:
         logger.error(f"Klaida įrašant duomenis: {e}")
-        # Atšaukiame pakeitimus jei buvo klaida
-        if 'session' in locals():
-            session.rollback()
-            session.close()
         return False
 
-def create_and_save_features():
+def upsert_features_to_db(df, batch_size=None, symbol=None, interval=None):
+    """
+    Įrašo arba atnaujina techninius indikatorius pagal (symbol, interval, timestamp),
+    neištrinant jau esamų lentelės įrašų
+    
+    Parametrai:
+        df: DataFrame su techniniais indikatoriais
+        batch_size: Eilučių skaičius viename INSERT sakinyje
+        symbol, interval: Laiko eilutė
+    
+    Grąžina:
+        bool: True jei pavyko, False jei nepavyko
+    """
+    try:
+        stats = save_features(df, symbol, interval, batch_size=batch_size)
+        logger.info(f"Įrašyta arba atnaujinta {stats['rows']} eilučių")
+        return True
+    except Exception as e:
+        logger.error(f"Klaida atnaujinant duomenis: {e}")
+        return False
+
+def get_incremental_start(warmup=WARMUP_PERIODS, symbol=None, interval=None):
+    """
+    Nustato, nuo kurios vietos reikia perskaičiuoti indikatorius
+    
+    Parametrai:
+        warmup: Kiek OHLCV eilučių paimti prieš paskutinį apskaičiuotą įrašą
+        symbol, interval: Laiko eilutė
+    
+    Grąžina:
+        tuple: (high_water_mark, start, has_new_data)
+            high_water_mark - paskutinis btc_features timestamp (None jei lentelė tuščia)
+            start - nuo kurio timestamp skaityti OHLCV duomenis (None - nuo pradžių)
+            has_new_data - ar btc_ohlcv yra naujesnių eilučių
+    """
+    session = SessionLocal()
+    try:
+        # High-water mark - naujausias jau apskaičiuotas įrašas
+        features = features_model()
+        high_water_mark = (session.query(func.max(features.timestamp))
+                           .filter(series_filter(features, symbol, interval)).scalar())
+        if high_water_mark is None:
+            return None, None, True
+        
+        ohlcv_series = series_filter(BtcOHLCV, symbol, interval)
+        latest_ohlcv = session.query(func.max(BtcOHLCV.timestamp)).filter(ohlcv_series).scalar()
+        if latest_ohlcv is None or latest_ohlcv <= high_water_mark:
+            return high_water_mark, None, False
+        
+        # Paimame warmup eilučių iki high-water mark, kad indikatoriai būtų tikslūs
+        start = (session.query(BtcOHLCV.timestamp)
+                 .filter(ohlcv_series, BtcOHLCV.timestamp <= high_water_mark)
+                 .order_by(BtcOHLCV.timestamp.desc())
+                 .offset(warmup)
+                 .limit(1)
+                 .scalar())
+        return high_water_mark, start, True
+    finally:
+        session.close()
+
+def update_features_incrementally(warmup=WARMUP_PERIODS, batch_size=None, symbol=None, interval=None):
+    """
+    Perskaičiuoja indikatorius tik naujoms OHLCV eilutėms:
+    1. Randa paskutinį apskaičiuotą įrašą (high-water mark)
+    2. Gauna naujas eilutes ir warmup langą prieš jas
+    3. Apskaičiuoja indikatorius ir atnaujina tik naujas eilutes
+    
+    Grąžina:
+        bool: True jei pavyko, False jei nepavyko
+    """
+    try:
+        high_water_mark, start, has_new_data = get_incremental_start(warmup, symbol, interval)
+    except Exception as e:
+        logger.error(f"Klaida nustatant high-water mark: {e}")
+        return False
+    
+    if high_water_mark is None:
+        logger.info("Lentelė btc_features tuščia - atliekamas pilnas perskaičiavimas")
+        return create_and_save_features(incremental=False, batch_size=batch_size,
+                                        symbol=symbol, interval=interval)
+    
+    if not has_new_data:
+        logger.info(f"Naujų OHLCV duomenų po {high_water_mark} nėra")
+        return True
+    
+    df = get_ohlcv_data(start=start, symbol=symbol, interval=interval)
+    if df.empty:
+        logger.error("Nepavyko gauti duomenų - DataFrame tuščias")
+        return False
+    
+    df_features = create_all_features(df)
+    
+    # Paskutinį jau įrašytą įrašą irgi perrašome, nes jo target
+    # buvo apskaičiuotas dar nežinant sekančios kainos
+    df_new = df_features[df_features['timestamp'] >= high_water_mark]
+    logger.info(f"Inkrementiškai apskaičiuota {len(df_new)} eilučių nuo {high_water_mark}")
+    
+    if not upsert_features_to_db(df_new, batch_size=batch_size, symbol=symbol, interval=interval):
+        invalidate_snapshot(symbol, interval)
+        return False
+    
+    # Arrow kopijoje perrašomi tik paliesti mėnesiai
+    write_snapshot(df_new, symbol=symbol, interval=interval, merge=True)
+    return True
+
+def create_and_save_features(incremental=False, batch_size=None, symbol=None, interval=None):
     """
     Pagrindinė funkcija, kuri:
     1. Gauna duomenis iš duomenų bazės
     2. Apskaičiuoja techninius indikatorius
     3. Įrašo rezultatus į duomenų bazę
+    4. Įrašo Arrow kopiją (feature_snapshot.py), jei įdiegta pyarrow
+    
+    Parametrai:
+        incremental: Jei True - perskaičiuojamos tik naujos eilutės
+        batch_size: Eilučių skaičius viename INSERT sakinyje
+        symbol, interval: Laiko eilutė (pagal nutylėjimą - DEFAULT_SYMBOL ir DEFAULT_INTERVAL)
     
     Grąžina:
         bool: True jei pavyko, False jei nepavyko
     """
+    if incremental:
+        return update_features_incrementally(batch_size=batch_size, symbol=symbol, interval=interval)
+    
     # Pirmas žingsnis - gauname pradinius duomenis
-    df = get_ohlcv_data()
+    df = get_ohlcv_data(symbol=symbol, interval=interval)
     
     # Patikriname ar gavome duomenis
     if df.empty:
@@ -202,12 +231,16 @@ def create_and_save_features():
     logger.info("Įrašome duomenis į duomenų bazę...")
     
     # Kviečiame funkciją, kuri įrašys duomenis
-    success = save_features_to_db(df_features)
+    success = save_features_to_db(df_features, batch_size=batch_size, symbol=symbol, interval=interval)
     
     # Patikriname ar pavyko įrašyti
     if success:
+        # Ketvirtas žingsnis - nauja Arrow kopijos versija treniravimui ir backtest'ui
+        write_snapshot(df_features, symbol=symbol, interval=interval)
         logger.info("Viskas pavyko! Duomenų transformacija baigta!")
     else:
+        # DB jau gali būti pakeista - sena kopija nebetinka
+        invalidate_snapshot(symbol, interval)
         logger.error("Kažkas nepavyko įrašant duomenis!")
     
     return success
@@ -182,32 +182,111 @@ def normalize_features(df, exclude_cols=['timestamp', 'target']):
     
     return df
 
+def compute_indicator_columns(close, sma_windows=(5, 10, 20, 50, 200), ema_windows=(5, 10, 20, 50, 200),
+                              rsi_window=14, macd_fast=12, macd_slow=26, macd_signal=9,
+                              bb_window=20, bb_num_std=2, lags=(1, 2, 3, 5, 7, 14, 21),
+                              forward_periods=1):
+    """
+    Apskaičiuoja visus indikatorius vienu perėjimu per 'close' NumPy masyvą.
+    Skirtingai nuo add_* funkcijų, DataFrame nekopijuojamas ir stulpeliai
+    neįterpiami po vieną - grąžinamas stulpelių žodynas.
+    
+    Parametrai:
+        close: NumPy masyvas su uždarymo kainomis
+        kiti parametrai - kaip atitinkamose add_* funkcijose
+    
+    Grąžina:
+        dict: stulpelio pavadinimas -> NumPy masyvas (tokia pat tvarka kaip create_all_features)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    # Viena Series be kopijos - rolling/ewm skaičiavimai vyksta C kode
+    series = pd.Series(close, copy=False)
+    columns = {}
+    
+    # SMA
+    rolling_means = {}
+    for window in sma_windows:
+        rolling_means[window] = series.rolling(window=window).mean()
+        columns[f'sma_{window}'] = rolling_means[window].to_numpy()
+    
+    # EMA
+    emas = {}
+    for window in ema_windows:
+        emas[window] = series.ewm(span=window, adjust=False).mean()
+        columns[f'ema_{window}'] = emas[window].to_numpy()
+    
+    # RSI
+    delta = np.empty_like(close)
+    delta[0] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = pd.Series(np.where(delta > 0, delta, 0.0), copy=False)
+    loss = pd.Series(np.where(delta < 0, -delta, 0.0), copy=False)
+    rs = gain.rolling(window=rsi_window).mean() / loss.rolling(window=rsi_window).mean()
+    columns[f'rsi_{rsi_window}'] = (100 - (100 / (1 + rs))).to_numpy()
+    
+    # MACD - jei EMA jau apskaičiuotas, naudojame jį pakartotinai
+    fast_ema = emas[macd_fast] if macd_fast in emas else series.ewm(span=macd_fast, adjust=False).mean()
+    slow_ema = emas[macd_slow] if macd_slow in emas else series.ewm(span=macd_slow, adjust=False).mean()
+    macd = fast_ema - slow_ema
+    signal = macd.ewm(span=macd_signal, adjust=False).mean()
+    columns['macd'] = macd.to_numpy()
+    columns['macd_signal'] = signal.to_numpy()
+    columns['macd_histogram'] = (macd - signal).to_numpy()
+    
+    # Bollinger juostos
+    bb_middle = rolling_means[bb_window] if bb_window in rolling_means else series.rolling(window=bb_window).mean()
+    bb_std = series.rolling(window=bb_window).std()
+    bb_middle = bb_middle.to_numpy()
+    bb_upper = bb_middle + bb_std.to_numpy() * bb_num_std
+    bb_lower = bb_middle - bb_std.to_numpy() * bb_num_std
+    columns['bb_middle'] = bb_middle
+    columns['bb_upper'] = bb_upper
+    columns['bb_lower'] = bb_lower
+    columns['bb_width'] = (bb_upper - bb_lower) / bb_middle
+    
+    # Lag features
+    for lag in lags:
+        lagged = np.full_like(close, np.nan)
+        lagged[lag:] = close[:-lag]
+        columns[f'close_lag_{lag}'] = lagged
+        columns[f'return_lag_{lag}'] = close / lagged - 1
+    
+    # Target: 1 jei ateities kaina didesnė už dabartinę
+    future_price = np.full_like(close, np.nan)
+    future_price[:-forward_periods] = close[forward_periods:]
+    columns['target'] = (future_price > close).astype(int)
+    
+    return columns
+
 def create_all_features(df):
     """
     Prideda visus techninius indikatorius ir features į vieną DataFrame.
+    Indikatoriai skaičiuojami compute_indicator_columns() vienu perėjimu
+    ir prijungiami vienu pd.concat, todėl DataFrame nekopijuojamas kelis kartus.
     
     Parametrai:
         df: DataFrame su pradiniais duomenimis (OHLCV)
     """
-    df = df.copy()
+    # Pridedame visus indikatorius ir target kintamąjį
+    columns = compute_indicator_columns(df['close'].to_numpy())
+    
+    # Jei tokie stulpeliai jau yra - juos pakeičiame naujais
+    base = df.drop(columns=[col for col in columns if col in df.columns])
     
-    # Pridedame visus indikatorius
-    df = add_moving_averages(df)
-    df = add_exponential_moving_averages(df)
-    df = add_rsi(df)
-    df = add_macd(df)
-    df = add_bollinger_bands(df)
-    df = add_lag_features(df)
+    # Eilutes su trūkstamomis reikšmėmis atmetame prieš sujungimą,
+    # kad nereikėtų dar kartą kopijuoti viso DataFrame su dropna()
+    valid = base.notna().all(axis=1).to_numpy(copy=True)
+    for values in columns.values():
+        valid &= ~np.isnan(values)
     
-    # Pridedame target kintamąjį
-    df = add_target_label(df)
+    # Pilnus masyvus atlaisviname iš karto po filtravimo; copy=False - be papildomos kopijos
+    masked = {name: columns.pop(name)[valid] for name in list(columns)}
+    features = pd.DataFrame(masked, index=base.index[valid], copy=False)
+    df = pd.concat([base[valid], features], axis=1)
     
     # Normalizuojame features
     # df = normalize_features(df)  # Komentaras: galite ištrinti jei norite išlaikyti originalius duomenis
     
-    # Išvalome eilutes su trūkstamomis reikšmėmis
-    df = df.dropna()
-    
     return df
 
 if __name__ == "__main__":
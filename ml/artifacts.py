@@ -0,0 +1,28 @@
+"""
+Modelių failų išsaugojimas ir įkėlimas.
+Modeliai saugomi be suspaudimo, todėl NumPy masyvai faile lieka tokie patys
+kaip atmintyje ir gali būti įkelti su joblib.load(..., mmap_mode=...).
+Tada keli Flask worker procesai tuos pačius masyvus dalijasi per OS page cache.
+"""
+import os
+import joblib
+
+# 'c' (copy-on-write), o ne 'r': kai kurie modeliai (pvz. SVC) reikalauja
+# rašomų masyvų, bet puslapiai lieka bendri, kol į juos nerašoma.
+# Tuščia reikšmė išjungia mmap.
+MODEL_MMAP_MODE = os.environ.get("MODEL_MMAP_MODE", "c") or None
+
+def save_model_artifact(model, path):
+    """
+    Išsaugo modelį į joblib failą be suspaudimo (compress=0),
+    kad jį būtų galima įkelti su mmap_mode
+    """
+    joblib.dump(model, path, compress=0)
+    return path
+
+def load_model_artifact(path, mmap_mode=MODEL_MMAP_MODE):
+    """
+    Įkelia modelį iš joblib failo.
+    Suspausti (seni) failai įkeliami įprastai - joblib mmap_mode tiesiog ignoruoja.
+    """
+    return joblib.load(path, mmap_mode=mmap_mode)
@@ -6,7 +6,6 @@ import sys
 import logging
 import pandas as pd
 import numpy as np
-import joblib
 from datetime import datetime
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
@@ -17,7 +16,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Importuojame duomenų bazės prisijungimą
 from database.config import SessionLocal
 # Importuojame duomenų bazės modelius
-from database.models import BtcFeatures, MLModel
+from database.models import MLModel
+# Importuojame požymių skaitymo funkciją (wide arba compact lentelė, FEATURES_STORAGE)
+from database.feature_store import load_features
+# Modelių failų išsaugojimas (be suspaudimo, tinka mmap)
+from ml.artifacts import save_model_artifact
 
 # Sukuriame modelių katalogą, jei jo nėra
 os.makedirs('models', exist_ok=True)
@@ -26,96 +29,25 @@ os.makedirs('models', exist_ok=True)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger("model_trainer")
 
-def get_training_data():
+def get_training_data(start=None, end=None):
     """
-    Gauna treniravimo duomenis naudojant SQLAlchemy ORM
+    Gauna treniravimo duomenis stulpeliniu skaitymu iš btc_features lentelės
+    
+    Parametrai:
+        start: Imti duomenis nuo šio laiko (imtinai)
+        end: Imti duomenis iki šio laiko (imtinai)
     
     Grąžina:
         DataFrame su feature ir target stulpeliais
     """
     try:
-        # Sukuriame sesiją
-        session = SessionLocal()
-        
-        # Gauname duomenis per ORM užklausą
-        features = session.query(BtcFeatures).order_by(BtcFeatures.timestamp).all()
-        
-        # Konvertuojame ORM objektus į DataFrame
-        data = []
-        for feature in features:
-            # Kiekvienas feature yra BtcFeatures objektas, kurį konvertuojame į žodyną
-            record = {
-                'timestamp': feature.timestamp,
-                'open': feature.open,
-                'high': feature.high,
-                'low': feature.low,
-                'close': feature.close,
-                'volume': feature.volume,
-                
-                # SMA
-                'sma_5': feature.sma_5,
-                'sma_10': feature.sma_10,
-                'sma_20': feature.sma_20,
-                'sma_50': feature.sma_50,
-                'sma_200': feature.sma_200,
-                
-                # EMA
-                'ema_5': feature.ema_5,
-                'ema_10': feature.ema_10,
-                'ema_20': feature.ema_20,
-                'ema_50': feature.ema_50,
-                'ema_200': feature.ema_200,
-                
-                # RSI
-                'rsi_14': feature.rsi_14,
-                
-                # MACD
-                'macd': feature.macd,
-                'macd_signal': feature.macd_signal,
-                'macd_histogram': feature.macd_histogram,
-                
-                # Bollinger
-                'bb_middle': feature.bb_middle,
-                'bb_upper': feature.bb_upper,
-                'bb_lower': feature.bb_lower,
-                'bb_width': feature.bb_width,
-                
-                # Lag features
-                'close_lag_1': feature.close_lag_1,
-                'close_lag_2': feature.close_lag_2,
-                'close_lag_3': feature.close_lag_3,
-                'close_lag_5': feature.close_lag_5,
-                'close_lag_7': feature.close_lag_7,
-                'close_lag_14': feature.close_lag_14,
-                'close_lag_21': feature.close_lag_21,
-                
-                'return_lag_1': feature.return_lag_1,
-                'return_lag_2': feature.return_lag_2,
-                'return_lag_3': feature.return_lag_3,
-                'return_lag_5': feature.return_lag_5,
-                'return_lag_7': feature.return_lag_7,
-                'return_lag_14': feature.return_lag_14,
-                'return_lag_21': feature.return_lag_21,
-                
-                # Target
-                'target': feature.target
-            }
-            
-            data.append(record)
-        
-        # Sukuriame DataFrame
-        df = pd.DataFrame(data)
-        
-        # Uždarome sesiją
-        session.close()
+        # Skaitome visus požymių stulpelius be ORM objektų kūrimo
+        df = load_features(start=start, end=end, bulk=True)
         
         logger.info(f"Iš DB gauta {len(df)} eilučių treniravimui")
         return df
     except Exception as e:
         logger.error(f"Klaida gaunant duomenis: {e}")
-        # Uždarome sesiją, jei ji buvo sukurta
-        if 'session' in locals():
-            session.close()
         return pd.DataFrame()
 
 def save_model_to_db(model_name, accuracy, precision, recall, f1, model_path):
@@ -209,7 +141,7 @@ def train_model():
         # Išsaugome modelį į failą
         model_name = f"btc_predictor_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         model_path = f"models/{model_name}.joblib"
-        joblib.dump(model, model_path)
+        save_model_artifact(model, model_path)
         logger.info(f"Modelis išsaugotas į {model_path}")
         
         # Išsaugome modelį į DB
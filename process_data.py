@@ -11,8 +11,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from database.test_connection import test_connection
 from database.config import create_tables
-from features.data_transformer import create_and_save_features
-from ml.model_trainer import train_model
+# features ir ml moduliai (pandas, sklearn) importuojami tik kai jų reikia - žr. main()
 
 # Logeris
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
@@ -24,6 +23,10 @@ def main():
     """
     parser = argparse.ArgumentParser(description="BTC duomenų apdorojimas")
     parser.add_argument("--transform", action="store_true", help="Transformuoti duomenis")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Transformuoti tik naujas eilutes (naudojama su --transform)")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Eilučių skaičius viename INSERT sakinyje")
     parser.add_argument("--train", action="store_true", help="Treniruoti ML modelį")
     parser.add_argument("--setup-db", action="store_true", help="Sukurti duomenų bazės lenteles")
     args = parser.parse_args()
@@ -42,14 +45,16 @@ def main():
     
     # Duomenų transformacija
     if args.transform:
+        from features.data_transformer import create_and_save_features
         logger.info("Pradedama duomenų transformacija...")
-        if create_and_save_features():
+        if create_and_save_features(incremental=args.incremental, batch_size=args.batch_size):
             logger.info("Duomenų transformacija sėkmingai baigta!")
         else:
             logger.error("Duomenų transformacija nepavyko!")
     
     # Modelio treniravimas
     if args.train:
+        from ml.model_trainer import train_model
         logger.info("Pradedamas modelio treniravimas...")
         if train_model():
             logger.info("Modelio treniravimas sėkmingai baigtas!")
@@ -5,9 +5,16 @@ from flask import Flask
 from .main_routes import main
 from .training_routes import training
 from .prediction_routes import prediction
+from .chart_routes import charts
+from .db_session import init_app as init_db_session
 
 def register_routes(app: Flask):
-    """Registruoja visus maršrutus"""
+    """
+    Registruoja visus maršrutus ir užklausos DB sesijos uždarymą
+    (viena sesija visai užklausai - uždaroma užklausos pabaigoje)
+    """
     app.register_blueprint(main)
     app.register_blueprint(training)
-    app.register_blueprint(prediction)
\ No newline at end of file
+    app.register_blueprint(prediction)
+    app.register_blueprint(charts)
+    init_db_session(app)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Maršrutai grafikų duomenims ir PNG paveikslėliams
+"""
+from flask import Blueprint, request, jsonify, abort, url_for, make_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+charts = Blueprint('charts', __name__, url_prefix='/charts')
+
+# Kiek laiko naršyklė gali laikyti PNG (turinys nesikeičia - raktas yra duomenų maiša)
+PNG_MAX_AGE = 24 * 3600
+
+def _chart_response(chart):
+    """JSON atsakymas su grafiko duomenimis, PNG nuoroda ir ETag"""
+    response = jsonify({
+        'key': chart['key'],
+        'kind': chart['kind'],
+        'data': chart['data'],
+        'image_url': url_for('charts.chart_png', key=chart['key']),
+    })
+    response.set_etag(chart['key'])
+    return response.make_conditional(request)
+
+@charts.route('/api/price')
+def api_price():
+    """
+    Paskutinių N kainų grafiko duomenys.
+    Parametrai: points - kiek eilučių imti, max_points - iki kiek taškų sumažinti,
+    method - 'lttb' arba 'minmax'
+    """
+    from database.feature_store import load_features
+    from services.chart_service import price_chart_data
+    from services.downsampling import CHART_MAX_POINTS
+    from routes.db_session import get_db_session
+
+    points = min(request.args.get('points', 500, type=int), 1000000)
+    max_points = request.args.get('max_points', CHART_MAX_POINTS, type=int)
+    method = request.args.get('method', 'lttb')
+    if method not in ('lttb', 'minmax'):
+        return jsonify({'error': f"Nežinomas mažinimo metodas: {method}"}), 400
+    try:
+        df = load_features(columns=['timestamp', 'close'], latest=points,
+                           bind=get_db_session().connection())
+    except Exception as e:
+        logger.error(f"Klaida gaunant kainas grafikui: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    chart = price_chart_data(df['timestamp'].to_numpy(), df['close'].to_numpy(),
+                             max_points=max_points, method=method)
+    return _chart_response(chart)
+
+@charts.route('/api/feature-importance/<int:model_id>')
+def api_feature_importance(model_id):
+    """Modelio požymių svarbos grafiko duomenys (10 svarbiausių)"""
+    from services.model_service import load_model, FEATURE_COLUMNS
+    from services.chart_service import feature_importance_chart_data
+    from routes.db_session import get_db_session
+
+    model, _ = load_model(model_id, session=get_db_session())
+    if model is None:
+        return jsonify({'error': f"Modelis {model_id} nerastas"}), 404
+    if not hasattr(model, 'feature_importances_'):
+        return jsonify({'error': "Modelis neturi požymių svarbos"}), 400
+
+    names = list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS))
+    ranked = sorted(zip(names, model.feature_importances_), key=lambda x: x[1], reverse=True)[:10]
+    chart = feature_importance_chart_data([x[0] for x in ranked], [x[1] for x in ranked])
+    return _chart_response(chart)
+
+@charts.route('/api/<key>')
+def api_chart(key):
+    """Jau paruošto grafiko duomenys pagal raktą (pvz. prognozės grafikas iš predict_next_day)"""
+    from services.chart_service import chart_cache
+
+    entry = chart_cache.get(key)
+    if entry is None:
+        return jsonify({'error': f"Grafikas {key} nerastas"}), 404
+    return _chart_response({'key': key, 'kind': entry['kind'], 'data': entry['data']})
+
+@charts.route('/<key>.png')
+def chart_png(key):
+    """Grafiko PNG (braižomas vieną kartą ir laikomas talpykloje)"""
+    from services.chart_service import render_png
+
+    if request.if_none_match.contains(key):
+        # Naršyklė jau turi šį paveikslėlį - nebraižome ir nesiunčiame
+        response = make_response('', 304)
+        response.set_etag(key)
+        return response
+
+    png = render_png(key)
+    if png is None:
+        abort(404)
+
+    response = make_response(png)
+    response.mimetype = 'image/png'
+    response.set_etag(key)
+    response.cache_control.public = True
+    response.cache_control.max_age = PNG_MAX_AGE
+    return response
+
+@charts.route('/api/cache')
+def api_cache():
+    """Grafikų talpyklos statistika"""
+    from services.chart_service import chart_cache
+    return jsonify(chart_cache.stats())
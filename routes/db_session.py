@@ -0,0 +1,36 @@
+"""
+Užklausos DB sesija.
+Visai Flask užklausai naudojama viena SQLAlchemy sesija (ir vienas
+prisijungimas iš telkinio): ji sukuriama pirmą kartą iškvietus
+get_db_session() ir uždaroma teardown metu, net jei įvyko klaida.
+"""
+import logging
+from flask import g
+
+from database.config import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def get_db_session():
+    """Grąžina šios užklausos sesiją (sukuria pirmo kreipimosi metu)"""
+    session = g.get('db_session')
+    if session is None:
+        session = g.db_session = SessionLocal()
+    return session
+
+def close_db_session(exception=None):
+    """Uždaro užklausos sesiją - nepatvirtinti pakeitimai atšaukiami"""
+    session = g.pop('db_session', None)
+    if session is None:
+        return
+    try:
+        if exception is not None:
+            logger.warning(f"Užklausa baigėsi klaida, DB pakeitimai atšaukiami: {exception}")
+            session.rollback()
+    finally:
+        # close() grąžina prisijungimą į telkinį (nepatvirtinta transakcija atšaukiama)
+        session.close()
+
+def init_app(app):
+    """Užregistruoja sesijos uždarymą kiekvienos užklausos pabaigoje"""
+    app.teardown_appcontext(close_db_session)
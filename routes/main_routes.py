@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template
-from database.config import SessionLocal
+from flask import Blueprint, render_template, jsonify
+from database.config import get_pool_status
 from database.models import MLModel
+from routes.db_session import get_db_session
 
 main = Blueprint('main', __name__, url_prefix='')  # Pagrindinis URL be prefikso
 
@@ -8,10 +9,9 @@ main = Blueprint('main', __name__, url_prefix='')  # Pagrindinis URL be prefikso
 def index():
     """Pradinis puslapis"""
     try:
-        # Gauname paskutinius 5 modelius
-        session = SessionLocal()
+        # Gauname paskutinius 5 modelius (sesija uždaroma užklausos pabaigoje)
+        session = get_db_session()
         models = session.query(MLModel).order_by(MLModel.created_at.desc()).limit(5).all()
-        session.close()
         
         return render_template('index.html', 
                               title="BTC Prognozavimo Sistema",
@@ -20,4 +20,9 @@ def index():
         # Jei klaida, rodome pagrindinį puslapį be modelių
         return render_template('index.html', 
                               title="BTC Prognozavimo Sistema",
-                              models=[])
\ No newline at end of file
+                              models=[])
+
+@main.route('/api/db-pool')
+def api_db_pool():
+    """DB prisijungimų telkinio būsena ir statistika (laukimo laikas, užimtumas)"""
+    return jsonify(get_pool_status())
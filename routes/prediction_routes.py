@@ -3,52 +3,9 @@ Maršrutai, susiję su prognozavimu
 """
 from flask import Blueprint, render_template, request, jsonify
 import logging
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 
-# Temporary function to simulate prediction
-def get_mock_models():
-    """Returns mock ML models"""
-    return [
-        {'id': 1, 'name': 'RandomForest_20250513', 'accuracy': 0.85},
-        {'id': 2, 'name': 'GradientBoosting_20250512', 'accuracy': 0.82},
-        {'id': 3, 'name': 'SVM_20250510', 'accuracy': 0.79}
-    ]
-
-def predict_next_day(model_id, horizon=1):
-    """Mock prediction function"""
-    # Generate some dates
-    dates = [(datetime.now() - timedelta(days=x)).strftime('%Y-%m-%d') for x in range(30, 0, -1)]
-    
-    # Generate mock price data
-    prices = [random.uniform(50000, 70000) for _ in range(30)]
-    
-    # Generate future dates
-    future_dates = [(datetime.now() + timedelta(days=x)).strftime('%Y-%m-%d') for x in range(1, horizon+1)]
-    
-    # Generate prediction (1=up, 0=down)
-    prediction = random.choice([0, 1])
-    
-    # Calculate future prices based on prediction
-    predicted_prices = []
-    last_price = prices[-1]
-    for _ in range(horizon):
-        change = 0.01 if prediction == 1 else -0.01
-        last_price = last_price * (1 + change)
-        predicted_prices.append(last_price)
-    
-    return {
-        'prediction': prediction,
-        'probability': random.uniform(0.6, 0.9),
-        'dates': dates + future_dates,
-        'prices': prices + [None] * horizon,
-        'predicted_prices': [None] * 30 + predicted_prices,
-        'indicators': {
-            'rsi_14': random.uniform(20, 80),
-            'macd': random.uniform(-200, 200),
-            'bb_width': random.uniform(0.01, 0.2)
-        }
-    }
+from routes.db_session import get_db_session
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +13,14 @@ prediction = Blueprint('prediction', __name__, url_prefix='/predict')
 
 @prediction.route('', methods=['GET', 'POST'])
 def predict():
-    """Prognozavimo puslapis"""
-    available_models = get_mock_models()
+    """Prognozavimo puslapis (visi DB kreipiniai per vieną užklausos sesiją)"""
+    from services.model_service import get_available_models, predict_next_day, get_latest_indicators
+    
+    session = get_db_session()
+    available_models = get_available_models(session=session)
     
     prediction_result = None
+    error = None
     
     if request.method == 'POST':
         model_id = int(request.form.get('model_id'))
@@ -67,12 +28,61 @@ def predict():
         
         # Atliekame prognozę
         logger.info(f"Prognozuojama su modeliu ID: {model_id}, horizontas: {prediction_horizon}")
-        prediction_result = predict_next_day(model_id, prediction_horizon)
+        prediction_result = predict_next_day(model_id, prediction_horizon, session=session)
+        indicators = get_latest_indicators(session=session)
+        if 'error' in prediction_result or indicators is None:
+            error = prediction_result.get('error', "Nepavyko gauti indikatorių")
+            prediction_result = None
+        else:
+            prediction_result['indicators'] = indicators
     
     return render_template('predict.html', 
                           title="Bitcoin prognozė",
                           available_models=available_models,
-                          prediction_result=prediction_result)
+                          prediction_result=prediction_result,
+                          error=error)
+
+@prediction.route('/api/model-cache')
+def api_model_cache():
+    """Modelių talpyklos statistika (hit/miss skaitikliai)"""
+    from services.model_cache import model_cache
+    return jsonify(model_cache.stats())
+
+@prediction.route('/api/batch', methods=['POST'])
+def api_batch_predict():
+    """
+    Prognozės visam laiko intervalui.
+    JSON: {"model_id": 1, "start": "2024-01-01", "end": "2024-06-30", "persist": false}
+    """
+    import numpy as np
+    from services.model_service import predict_range
+    
+    payload = request.get_json(silent=True) or {}
+    try:
+        model_id = int(payload['model_id'])
+        start = datetime.fromisoformat(payload['start']) if payload.get('start') else None
+        end = datetime.fromisoformat(payload['end']) if payload.get('end') else None
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f"Neteisingi parametrai: {e}"}), 400
+    
+    logger.info(f"Intervalo prognozė su modeliu ID: {model_id}, {start} - {end}")
+    result = predict_range(model_id, start, end, persist=bool(payload.get('persist', False)),
+                           session=get_db_session())
+    if result.empty and 'prediction' not in result.columns:
+        return jsonify({'error': "Nepavyko atlikti prognozės"}), 500
+    if result.empty:
+        # Intervale nėra duomenų - tai ne klaida
+        return jsonify({'model_id': model_id, 'count': 0, 'timestamps': [],
+                        'close': [], 'prediction': [], 'probability': []})
+    
+    return jsonify({
+        'model_id': model_id,
+        'count': len(result),
+        'timestamps': np.datetime_as_string(result['timestamp'].to_numpy(), unit='s').tolist(),
+        'close': result['close'].tolist(),
+        'prediction': result['prediction'].tolist(),
+        'probability': result['probability'].tolist(),
+    })
 
 @prediction.route('/test')
 def test():
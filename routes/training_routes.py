@@ -2,23 +2,8 @@
 Maršrutai, susiję su modelio treniravimu
 """
 from flask import Blueprint, render_template, request, jsonify
-import sys
-import os
 import logging
 
-# Sukuriame paprastą treniravimo simuliaciją
-def train_model_with_params(model_type, test_size, params):
-    """Laikina funkcija modeliui treniruoti"""
-    return {
-        'model_id': 1,
-        'accuracy': 0.85,
-        'precision': 0.82,
-        'recall': 0.79,
-        'f1_score': 0.80,
-        'feature_importance': [0.2, 0.15, 0.1, 0.08, 0.07],
-        'feature_names': ['feature1', 'feature2', 'feature3', 'feature4', 'feature5']
-    }
-
 logger = logging.getLogger(__name__)
 
 training = Blueprint('training', __name__, url_prefix='/train')
@@ -27,6 +12,7 @@ training = Blueprint('training', __name__, url_prefix='/train')
 def train():
     """Modelio treniravimo puslapis"""
     training_result = None
+    job = None
     
     if request.method == 'POST':
         # Gauname parametrus iš formos
@@ -44,13 +30,15 @@ def train():
         elif model_type == 'svm':
             params['C'] = float(request.form.get('C', 1.0))
         
-        # Treniruojame modelį
-        logger.info(f"Pradedamas modelio treniravimas su parametrais: {params}")
-        training_result = train_model_with_params(model_type, test_size, params)
+        # Treniravimas vykdomas fone - puslapis iš karto gauna užduoties ID
+        from services.job_service import submit_training_job
+        logger.info(f"Registruojamas modelio treniravimas su parametrais: {params}")
+        job = submit_training_job(model_type, test_size, params)
         
     return render_template('train.html', 
                           title="Modelio treniravimas",
-                          training_result=training_result)
+                          training_result=training_result,
+                          job=job)
 
 @training.route('/test')
 def test():
@@ -59,26 +47,39 @@ def test():
 
 @training.route('/api/train', methods=['POST'])
 def api_train():
-    """API modelio treniravimui"""
+    """
+    API modelio treniravimui.
+    Užduotis vykdoma fone - grąžinamas job_id, o rezultatas gaunamas per /api/jobs/<job_id>
+    """
+    from services.job_service import submit_training_job
     try:
         data = request.get_json()
         model_type = data.get('model_type', 'random_forest')
         test_size = float(data.get('test_size', 0.2))
         params = data.get('params', {})
         
-        training_result = train_model_with_params(model_type, test_size, params)
+        job = submit_training_job(model_type, test_size, params)
+        if 'error' in job:
+            raise RuntimeError(job['error'])
         
         return jsonify({
             'success': True,
-            'model_id': training_result.get('model_id'),
-            'accuracy': training_result.get('accuracy'),
-            'precision': training_result.get('precision'),
-            'recall': training_result.get('recall'),
-            'f1_score': training_result.get('f1_score')
-        })
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'deduplicated': job['deduplicated']
+        }), 202
     except Exception as e:
         logger.error(f"Klaida API treniravime: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@training.route('/api/jobs/<int:job_id>')
+def api_job_status(job_id):
+    """Treniravimo užduoties būsena, progresas ir metrikos"""
+    from services.job_service import get_job_status
+    status = get_job_status(job_id)
+    if status is None:
+        return jsonify({'error': f"Užduotis {job_id} nerasta"}), 404
+    return jsonify(status)
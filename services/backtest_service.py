@@ -0,0 +1,204 @@
+"""
+Walk-forward backtest paslaugos.
+Modelis treniruojamas tik su praeities duomenimis (didėjančiu arba slenkančiu
+langu) ir tikrinamas su sekančiu duomenų bloku, todėl ateities duomenys
+nepatenka į treniravimą. Nepriklausomi blokai (fold'ai) skaičiuojami
+lygiagrečiai, o požymiai worker procesams perduodami per bendrą atmintį.
+"""
+import os
+import sys
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+# Pridedame projekto direktoriją į kelią
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.model_service import create_model, get_training_data, FEATURE_COLUMNS
+from services.shared_data import SharedArrays, attach_arrays
+
+logger = logging.getLogger(__name__)
+
+# Worker proceso duomenys (užpildomi init_fold_worker)
+_worker_arrays = None
+_worker_blocks = None
+
+def make_folds(n_rows, train_size, test_size, step=None, window='expanding'):
+    """
+    Sudaro walk-forward blokų indeksus
+
+    Parametrai:
+        n_rows: Eilučių skaičius
+        train_size: Pirmojo treniravimo lango dydis (eilutėmis)
+        test_size: Testavimo bloko dydis (eilutėmis)
+        step: Per kiek eilučių pasislenkama (pagal nutylėjimą - test_size)
+        window: 'expanding' - treniravimo langas auga nuo pradžios,
+                'rolling' - treniravimo langas visada train_size dydžio
+
+    Grąžina:
+        list: (train_start, train_end, test_start, test_end) intervalai [start, end)
+    """
+    if window not in ('expanding', 'rolling'):
+        raise ValueError(f"Nežinomas lango tipas: {window}")
+    step = step or test_size
+
+    folds = []
+    test_start = train_size
+    while test_start < n_rows:
+        test_end = min(test_start + test_size, n_rows)
+        train_start = 0 if window == 'expanding' else test_start - train_size
+        folds.append((train_start, test_start, test_start, test_end))
+        test_start += step
+    return folds
+
+def init_fold_worker(specs):
+    """Worker proceso inicializavimas - prisijungiama prie bendros atminties"""
+    global _worker_arrays, _worker_blocks
+    _worker_arrays, _worker_blocks = attach_arrays(specs)
+
+def fit_predict_fold(model_type, params, fold):
+    """
+    Treniruoja modelį su vieno bloko treniravimo duomenimis ir prognozuoja testavimo bloką
+
+    Grąžina:
+        tuple: (fold, prognozės, kainos kilimo tikimybės)
+    """
+    train_start, train_end, test_start, test_end = fold
+    X = _worker_arrays['X']
+    y = _worker_arrays['y']
+
+    model = create_model(model_type, params)
+    model.fit(X[train_start:train_end], y[train_start:train_end])
+
+    X_test = X[test_start:test_end]
+    predictions = model.predict(X_test)
+    if hasattr(model, 'predict_proba') and 1 in model.classes_:
+        probabilities = model.predict_proba(X_test)[:, list(model.classes_).index(1)]
+    else:
+        probabilities = predictions.astype(np.float64)
+    return fold, predictions, probabilities
+
+def fold_metrics(y_true, y_pred, returns):
+    """Klasifikavimo metrikos ir strategijos grąža vienam blokui arba visam testui"""
+    # Strategija: pirkti (laikyti) kai prognozuojamas kilimas, kitu atveju būti be pozicijos
+    strategy_returns = np.where(y_pred == 1, returns, 0.0)
+    return {
+        'rows': int(len(y_true)),
+        'accuracy': float(accuracy_score(y_true, y_pred)),
+        'precision': float(precision_score(y_true, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, zero_division=0)),
+        'f1_score': float(f1_score(y_true, y_pred, zero_division=0)),
+        'pnl': float(np.prod(1 + strategy_returns) - 1),
+        'buy_hold_pnl': float(np.prod(1 + returns) - 1),
+    }
+
+def load_backtest_arrays(start=None, end=None):
+    """
+    Nuskaito požymius ir paruošia masyvus backtest'ui
+
+    Grąžina:
+        dict: X (požymiai), y (target), returns (kitos eilutės grąža), timestamps
+    """
+    df = get_training_data(start, end).dropna()
+    if df.empty:
+        raise ValueError("Nepavyko gauti duomenų backtest'ui")
+
+    # Kitos eilutės grąža - ką uždirbtų pozicija, atidaryta šios eilutės uždarymo kaina
+    close = df['close'].to_numpy(dtype=np.float64)
+    returns = np.zeros(len(close))
+    returns[:-1] = close[1:] / close[:-1] - 1
+
+    return {
+        'X': df[FEATURE_COLUMNS].to_numpy(dtype=np.float64),
+        'y': df['target'].to_numpy(dtype=np.int64),
+        'returns': returns,
+        'timestamps': df['timestamp'].to_numpy(),
+    }
+
+def run_backtest(model_type, params=None, start=None, end=None, train_size=1000,
+                 test_size=250, step=None, window='expanding', max_workers=None):
+    """
+    Paleidžia walk-forward backtest
+
+    Parametrai:
+        model_type: Modelio tipas (kaip create_model)
+        params: Modelio parametrai
+        start: Duomenų pradžia (None - nuo pradžios)
+        end: Duomenų pabaiga (None - iki galo)
+        train_size: Pirmojo treniravimo lango dydis (eilutėmis)
+        test_size: Testavimo bloko dydis (eilutėmis)
+        step: Per kiek eilučių pasislenkama (pagal nutylėjimą - test_size)
+        window: 'expanding' arba 'rolling'
+        max_workers: Lygiagrečių procesų skaičius (None - pagal CPU skaičių)
+
+    Grąžina:
+        dict su kiekvieno bloko ir bendromis metrikomis bei kapitalo kreive
+        arba {'error': ...}, jei įvyko klaida
+    """
+    params = params or {}
+    try:
+        data = load_backtest_arrays(start, end)
+        X, y, returns, timestamps = data['X'], data['y'], data['returns'], data['timestamps']
+
+        folds = make_folds(len(y), train_size, test_size, step, window)
+        if not folds:
+            raise ValueError(f"Per mažai duomenų: {len(y)} eilučių, o treniravimo langas {train_size}")
+
+        logger.info(f"Backtest {model_type}: {len(y)} eilučių, {len(folds)} blokų, langas {window}")
+
+        # Prognozės visai eilutei: kai blokai persidengia (step < test_size), eilutei lieka
+        # vėlesnio bloko prognozė, o eilutės tarp blokų (step > test_size) lieka -1
+        predictions = np.full(len(y), -1, dtype=np.int64)
+        probabilities = np.full(len(y), np.nan)
+        fold_results = []
+
+        with SharedArrays({'X': X, 'y': y}) as shared:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=init_fold_worker,
+                                     initargs=(shared.specs,)) as executor:
+                futures = [executor.submit(fit_predict_fold, model_type, params, fold) for fold in folds]
+                for number, future in enumerate(futures, start=1):
+                    fold, fold_predictions, fold_probabilities = future.result()
+                    train_start, train_end, test_start, test_end = fold
+                    predictions[test_start:test_end] = fold_predictions
+                    probabilities[test_start:test_end] = fold_probabilities
+
+                    # Bloko metrikos - tik iš jo paties prognozių
+                    result = fold_metrics(y[test_start:test_end], fold_predictions, returns[test_start:test_end])
+                    result.update({
+                        'fold': number,
+                        'train_start': str(pd.Timestamp(timestamps[train_start])),
+                        'train_end': str(pd.Timestamp(timestamps[train_end - 1])),
+                        'test_start': str(pd.Timestamp(timestamps[test_start])),
+                        'test_end': str(pd.Timestamp(timestamps[test_end - 1])),
+                    })
+                    fold_results.append(result)
+
+        # Bendros metrikos ir kapitalo kreivė - tik prognozuotoms eilutėms
+        tested = predictions != -1
+        tested_returns = returns[tested]
+        strategy_returns = np.where(predictions[tested] == 1, tested_returns, 0.0)
+        summary = fold_metrics(y[tested], predictions[tested], tested_returns)
+
+        logger.info(f"Backtest baigtas: tikslumas {summary['accuracy']:.4f}, PnL {summary['pnl']:.4f}")
+
+        return {
+            'model_type': model_type,
+            'params': params,
+            'window': window,
+            'folds': fold_results,
+            'summary': summary,
+            'equity': {
+                'timestamps': np.datetime_as_string(timestamps[tested], unit='s').tolist(),
+                'strategy': np.cumprod(1 + strategy_returns).tolist(),
+                'buy_hold': np.cumprod(1 + tested_returns).tolist(),
+                'probability': probabilities[tested].tolist(),
+            },
+        }
+    except Exception as e:
+        logger.error(f"Klaida vykdant backtest: {e}")
+        return {
+            'error': str(e)
+        }
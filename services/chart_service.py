@@ -1,54 +1,221 @@
 """
-Grafikų generavimo paslaugos
+Grafikų generavimo paslaugos.
+Grafikų duomenys grąžinami kompaktišku JSON formatu (braižoma naršyklėje su
+static/js/charts.js), o PNG paveikslėliai generuojami tik prireikus ir
+laikomi talpykloje pagal duomenų maišą - tas pats grafikas nebraižomas du kartus.
 """
-import pandas as pd
-import numpy as np
+import os
+import json
+import base64
+import hashlib
 import logging
+import threading
 from io import BytesIO
-import base64
-import matplotlib.pyplot as plt
-import seaborn as sns
+from collections import OrderedDict
+
+import numpy as np
+
+from services.downsampling import downsample, format_dates, CHART_MAX_POINTS
 
 logger = logging.getLogger(__name__)
 
+# Kiek grafikų (duomenų ir PNG) laikoma talpykloje (galima keisti per aplinkos kintamąjį)
+CHART_CACHE_MAX_ENTRIES = int(os.environ.get("CHART_CACHE_MAX_ENTRIES", 256))
+
+# Kainų apvalinimas JSON'e - centų tikslumo pakanka, o atsakymas gerokai mažesnis
+PRICE_DECIMALS = 2
+
+class ChartCache:
+    """
+    Grafikų talpykla (LRU).
+    Raktas - grafiko duomenų maiša, todėl ją galima naudoti ir kaip ETag.
+    Laikomi ir grafiko duomenys (kad PNG būtų galima nubraižyti pagal URL),
+    ir jau sugeneruotas PNG.
+    """
+
+    def __init__(self, max_entries=CHART_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, key, kind, data):
+        """Įsimena grafiko duomenis"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = {'kind': kind, 'data': data, 'png': None}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Grąžina įrašą (kind, data, png) arba None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get_png(self, key):
+        """Grąžina PNG baitus, jei grafikas jau nubraižytas"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['png'] is not None:
+                self.hits += 1
+                return entry['png']
+            self.misses += 1
+            return None
+
+    def set_png(self, key, png):
+        """Išsaugo nubraižytą PNG"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['png'] = png
+
+    def stats(self):
+        """Grąžina talpyklos statistiką"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'rendered': sum(1 for entry in self._entries.values() if entry['png'] is not None),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+# Bendra talpykla visam procesui
+chart_cache = ChartCache()
+
+def chart_key(kind, data):
+    """Grafiko raktas - tipo ir duomenų maiša"""
+    payload = json.dumps({'kind': kind, 'data': data}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def _round_values(values, decimals):
+    """Suapvalina reikšmes, None/NaN palieka kaip None"""
+    rounded = np.round(np.asarray(values, dtype=np.float64), decimals)
+    return [None if np.isnan(value) else value for value in rounded.tolist()]
+
+def price_chart_data(dates, prices, predicted_dates=None, predicted_prices=None,
+                     max_points=CHART_MAX_POINTS, method='lttb'):
+    """
+    Paruošia kainos grafiko duomenis.
+    Faktinių kainų eilutė sumažinama iki max_points taškų.
+
+    Grąžina:
+        dict: {'key', 'kind', 'data'} - data tinka tiesiogiai JSON atsakymui
+    """
+    dates, prices = downsample(dates, prices, max_points, method)
+    data = {
+        'dates': format_dates(dates),
+        'prices': _round_values(prices, PRICE_DECIMALS),
+    }
+    if predicted_dates is not None and predicted_prices is not None:
+        data['predicted_dates'] = format_dates(predicted_dates)
+        data['predicted_prices'] = _round_values(predicted_prices, PRICE_DECIMALS)
+
+    key = chart_key('price', data)
+    chart_cache.register(key, 'price', data)
+    return {'key': key, 'kind': 'price', 'data': data}
+
+def feature_importance_chart_data(feature_names, feature_importance):
+    """
+    Paruošia požymių svarbos grafiko duomenis
+
+    Grąžina:
+        dict: {'key', 'kind', 'data'}
+    """
+    data = {
+        'feature_names': [str(name) for name in feature_names],
+        'feature_importance': _round_values(feature_importance, 6),
+    }
+    key = chart_key('feature_importance', data)
+    chart_cache.register(key, 'feature_importance', data)
+    return {'key': key, 'kind': 'feature_importance', 'data': data}
+
+def _draw_price(ax, data):
+    """Braižo kainos grafiką"""
+    ax.plot(data['dates'], data['prices'], label='Faktinė kaina', color='blue', marker='o')
+
+    # Braižome prognozuojamas kainas, jei jos pateiktos
+    if data.get('predicted_dates') and data.get('predicted_prices'):
+        ax.plot(data['predicted_dates'], data['predicted_prices'], label='Prognozė', color='red',
+                linestyle='--', marker='s')
+
+    ax.set_title('Bitcoin kainos')
+    ax.set_xlabel('Data')
+    ax.set_ylabel('Kaina (USD)')
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    # Pasukame x ašies etiketes, kad būtų lengviau skaityti
+    ax.tick_params(axis='x', labelrotation=45)
+
+def _draw_feature_importance(ax, data):
+    """Braižo požymių svarbos grafiką"""
+    # Sukuriame horizontalų juostinį grafiką
+    y_pos = np.arange(len(data['feature_names']))
+    ax.barh(y_pos, data['feature_importance'], align='center')
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(data['feature_names'])
+
+    ax.set_title('Požymių svarba')
+    ax.set_xlabel('Svarba')
+    ax.grid(True, alpha=0.3)
+
+_DRAWERS = {
+    'price': _draw_price,
+    'feature_importance': _draw_feature_importance,
+}
+
+def render_png(key):
+    """
+    Grąžina grafiko PNG baitus - iš talpyklos arba nubraižo ir išsaugo.
+    Naudojama Figure (ne pyplot), todėl braižymas saugus keliuose thread'uose.
+
+    Grąžina:
+        bytes arba None, jei grafiko duomenų talpykloje nėra
+    """
+    png = chart_cache.get_png(key)
+    if png is not None:
+        return png
+
+    entry = chart_cache.get(key)
+    if entry is None:
+        return None
+
+    # matplotlib importuojamas tik pirmą kartą braižant - dauguma užklausų grąžina tik JSON
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    _DRAWERS[entry['kind']](ax, entry['data'])
+    fig.tight_layout()
+
+    buf = BytesIO()
+    fig.savefig(buf, format='png')
+    png = buf.getvalue()
+    chart_cache.set_png(key, png)
+    return png
+
+def _data_uri(chart):
+    """PNG kaip base64 data URI (suderinamumui su senu API)"""
+    png = render_png(chart['key'])
+    return f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"
+
 def create_price_chart(dates, prices, predicted_dates=None, predicted_prices=None):
     """
-    Sukuria kainos grafiką
-    
+    Sukuria kainos grafiką.
+    Geriau naudoti price_chart_data() ir /charts/<key>.png - paveikslėlis
+    tada nekoduojamas į HTML ir naršyklė jį gali talpinti.
+
     Grąžina:
         base64 koduotą paveikslėlį
     """
     try:
-        plt.figure(figsize=(10, 6))
-        
-        # Braižome faktines kainas
-        plt.plot(dates, prices, label='Faktinė kaina', color='blue', marker='o')
-        
-        # Braižome prognozuojamas kainas, jei jos pateiktos
-        if predicted_dates and predicted_prices:
-            plt.plot(predicted_dates, predicted_prices, label='Prognozė', color='red', 
-                    linestyle='--', marker='s')
-        
-        plt.title('Bitcoin kainos')
-        plt.xlabel('Data')
-        plt.ylabel('Kaina (USD)')
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        # Pasukame x ašies etiketes, kad būtų lengviau skaityti
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # Išsaugome paveikslėlį į atminties buferį
-        buf = BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        
-        # Koduojame į base64
-        image_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-        plt.close()
-        
-        return f"data:image/png;base64,{image_base64}"
+        return _data_uri(price_chart_data(dates, prices, predicted_dates, predicted_prices))
     except Exception as e:
         logger.error(f"Klaida kuriant kainos grafiką: {e}")
         return None
@@ -56,33 +223,12 @@ def create_price_chart(dates, prices, predicted_dates=None, predicted_prices=Non
 def create_feature_importance_chart(feature_names, feature_importance):
     """
     Sukuria požymių svarbos grafiką
-    
+
     Grąžina:
         base64 koduotą paveikslėlį
     """
     try:
-        plt.figure(figsize=(10, 6))
-        
-        # Sukuriame horizontalų juostinį grafiką
-        y_pos = np.arange(len(feature_names))
-        plt.barh(y_pos, feature_importance, align='center')
-        plt.yticks(y_pos, feature_names)
-        
-        plt.title('Požymių svarba')
-        plt.xlabel('Svarba')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        # Išsaugome paveikslėlį į atminties buferį
-        buf = BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        
-        # Koduojame į base64
-        image_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-        plt.close()
-        
-        return f"data:image/png;base64,{image_base64}"
+        return _data_uri(feature_importance_chart_data(feature_names, feature_importance))
     except Exception as e:
         logger.error(f"Klaida kuriant požymių svarbos grafiką: {e}")
-        return None
\ No newline at end of file
+        return None
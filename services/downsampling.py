@@ -0,0 +1,123 @@
+"""
+Ilgų laiko eilučių paruošimas grafikams.
+Prieš siunčiant į naršyklę eilutė sumažinama iki nurodyto taškų skaičiaus
+(LTTB arba min/max grupavimu), o datos formatuojamos vektoriškai.
+"""
+import os
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Kiek daugiausiai taškų siunčiama grafikui (galima keisti per aplinkos kintamąjį)
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", 1000))
+
+def _as_float(x):
+    """Laiko ašį (datetime64 arba skaičius) paverčia float masyvu"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: atrenka threshold taškų, geriausiai
+    išsaugančių kreivės formą. Pirmas ir paskutinis taškai visada paliekami.
+
+    Grąžina:
+        np.ndarray: Atrinktų taškų indeksai didėjimo tvarka
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Vidurinių taškų grupių ribos (pirmas ir paskutinis taškai - atskiros grupės)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+
+        # Sekančios grupės vidurkis (paskutinei grupei - paskutinis taškas)
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Trikampio su ankstesniu atrinktu tašku ir sekančios grupės vidurkiu plotas
+        areas = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+def minmax_indices(y, threshold):
+    """
+    Min/max grupavimas: kiekvienoje grupėje paliekamas mažiausias ir
+    didžiausias taškas (išsaugomi kainų šuoliai). Skaičiuojama be Python ciklų.
+
+    Grąžina:
+        np.ndarray: Atrinktų taškų indeksai didėjimo tvarka (daugiausiai threshold)
+    """
+    n = len(y)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = threshold // 2
+    bucket = np.arange(n) * n_buckets // n
+
+    # Rūšiuojame pagal grupę, o grupės viduje - pagal reikšmę
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n)
+
+    return np.unique(np.concatenate([order[starts], order[ends - 1]]))
+
+def downsample(x, y, max_points=CHART_MAX_POINTS, method='lttb'):
+    """
+    Sumažina eilutę iki max_points taškų
+
+    Parametrai:
+        x: Laiko ašis (datetime64 arba skaičiai)
+        y: Reikšmės
+        max_points: Kiek daugiausiai taškų palikti (None - nemažinti)
+        method: 'lttb' arba 'minmax'
+
+    Grąžina:
+        tuple: (x, y) NumPy masyvai
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if max_points is None or len(y) <= max_points:
+        return x, y
+
+    if method == 'lttb':
+        indices = lttb_indices(x, y, max_points)
+    elif method == 'minmax':
+        indices = minmax_indices(y, max_points)
+    else:
+        raise ValueError(f"Nežinomas mažinimo metodas: {method}")
+
+    logger.debug(f"Eilutė sumažinta nuo {len(y)} iki {len(indices)} taškų ({method})")
+    return x[indices], y[indices]
+
+def format_dates(dates, unit='m'):
+    """
+    Datos kaip ISO tekstas. datetime64 masyvai formatuojami vienu
+    np.datetime_as_string kvietimu, o ne strftime kiekvienam elementui.
+
+    Parametrai:
+        unit: 'D' - tik data (2024-01-31), 'm' - su minutėmis (2024-01-31T12:15)
+    """
+    array = np.asarray(dates)
+    if np.issubdtype(array.dtype, np.datetime64):
+        return np.datetime_as_string(array, unit=unit).tolist()
+    return [str(date) for date in dates]
@@ -0,0 +1,236 @@
+"""
+Foninių treniravimo užduočių paslaugos.
+Užduotis įrašoma į training_jobs lentelę ir vykdoma vietiniame procesų
+telkinyje, todėl Flask užklausa iš karto grąžina užduoties ID, o progresas,
+metrikos ir sukurto modelio ID gaunami iš užduoties būsenos.
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+# Pridedame projekto direktoriją į kelią
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.config import SessionLocal, engine
+from database.models import TrainingJob, series_filter
+from database.feature_store import features_model
+
+logger = logging.getLogger(__name__)
+
+# Lygiagrečių treniravimų skaičius (galima keisti per aplinkos kintamąjį)
+TRAINING_WORKERS = int(os.environ.get("TRAINING_WORKERS", 2))
+
+# Po kiek valandų nebaigta užduotis laikoma pasenusia (pvz. serveris buvo perkrautas)
+TRAINING_JOB_TIMEOUT_HOURS = float(os.environ.get("TRAINING_JOB_TIMEOUT_HOURS", 6))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _init_job_worker():
+    """
+    Worker proceso inicializavimas.
+    Po fork paveldėti DB prisijungimai priklauso tėviniam procesui,
+    todėl worker'is juos pamiršta (neuždarydamas) ir kuria savus.
+    """
+    engine.dispose(close=False)
+
+def get_executor():
+    """Grąžina (prireikus sukuria) bendrą treniravimo procesų telkinį"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=TRAINING_WORKERS, initializer=_init_job_worker)
+            logger.info(f"Sukurtas treniravimo procesų telkinys ({TRAINING_WORKERS} worker'iai)")
+        return _executor
+
+def get_data_version(session):
+    """
+    Duomenų versija - btc_features eilučių skaičius ir paskutinis laikas.
+    Pasikeitus duomenims, ta pati užduotis vėl treniruojama.
+    """
+    features = features_model()
+    count, last_timestamp = (session.query(func.count(features.timestamp),
+                                           func.max(features.timestamp))
+                             .filter(series_filter(features)).one())
+    return f"{count}:{last_timestamp}"
+
+def make_dedup_key(model_type, test_size, params, data_version):
+    """Užduoties raktas iš modelio tipo, parametrų ir duomenų versijos"""
+    payload = json.dumps({
+        'model_type': model_type,
+        'test_size': test_size,
+        'params': params,
+        'data_version': data_version,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _active_job(session, dedup_key):
+    """Aktyvi (laukianti, vykdoma arba baigta) užduotis su šiuo raktu"""
+    return (session.query(TrainingJob)
+            .filter(TrainingJob.dedup_key == dedup_key, TrainingJob.active.is_(True))
+            .first())
+
+def submit_training_job(model_type, test_size, params):
+    """
+    Užregistruoja treniravimo užduotį ir perduoda ją procesų telkiniui.
+    Jei tokia pati užduotis su tais pačiais duomenimis jau vykdoma arba
+    baigta, grąžinama esama užduotis. Unikalus (dedup_key, active) raktas
+    užtikrina, kad lygiagrečiai pateiktos vienodos užduotys būtų įrašytos tik kartą.
+
+    Grąžina:
+        dict su job_id, status ir deduplicated arba {'error': ...}
+    """
+    session = SessionLocal()
+    try:
+        data_version = get_data_version(session)
+        dedup_key = make_dedup_key(model_type, test_size, params, data_version)
+
+        # Pasenusios nebaigtos užduotys (pvz. serveris buvo perkrautas) atlaisvina raktą
+        stale_before = datetime.utcnow() - timedelta(hours=TRAINING_JOB_TIMEOUT_HOURS)
+        (session.query(TrainingJob)
+         .filter(TrainingJob.dedup_key == dedup_key, TrainingJob.active.is_(True),
+                 TrainingJob.status.in_(['queued', 'running']), TrainingJob.created_at < stale_before)
+         .update({'status': 'failed', 'active': None, 'error': "Viršytas užduoties laikas",
+                  'finished_at': datetime.utcnow()}, synchronize_session=False))
+        session.commit()
+
+        existing = _active_job(session, dedup_key)
+        if existing:
+            logger.info(f"Tokia pati treniravimo užduotis jau yra: {existing.id} ({existing.status})")
+            return {'job_id': existing.id, 'status': existing.status, 'deduplicated': True}
+
+        job = TrainingJob(
+            dedup_key=dedup_key,
+            active=True,
+            model_type=model_type,
+            params=json.dumps(params),
+            test_size=test_size,
+            data_version=data_version,
+            status='queued',
+            progress=0.0,
+            message="Laukia eilėje",
+            created_at=datetime.utcnow(),
+        )
+        session.add(job)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Kita užklausa tą pačią užduotį įrašė tarp patikros ir įrašymo
+            session.rollback()
+            existing = _active_job(session, dedup_key)
+            if existing is None:
+                raise
+            logger.info(f"Tokia pati treniravimo užduotis įrašyta lygiagrečiai: {existing.id}")
+            return {'job_id': existing.id, 'status': existing.status, 'deduplicated': True}
+        job_id = job.id
+    except Exception as e:
+        logger.error(f"Klaida registruojant treniravimo užduotį: {e}")
+        session.rollback()
+        return {'error': str(e)}
+    finally:
+        session.close()
+
+    future = get_executor().submit(run_training_job, job_id)
+    future.add_done_callback(lambda f: _check_job_future(job_id, f))
+    logger.info(f"Treniravimo užduotis {job_id} įtraukta į eilę ({model_type}, {params})")
+    return {'job_id': job_id, 'status': 'queued', 'deduplicated': False}
+
+def _update_job(job_id, **values):
+    """Atnaujina užduoties laukus atskira trumpa transakcija"""
+    session = SessionLocal()
+    try:
+        session.query(TrainingJob).filter(TrainingJob.id == job_id).update(values)
+        session.commit()
+    except Exception as e:
+        logger.error(f"Klaida atnaujinant užduotį {job_id}: {e}")
+        session.rollback()
+    finally:
+        session.close()
+
+def _check_job_future(job_id, future):
+    """
+    Tėvinio proceso patikra: jei worker procesas nulūžo (pvz. pritrūko atminties),
+    užduotis pažymima kaip nepavykusi
+    """
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Treniravimo užduoties {job_id} procesas nutrūko: {error}")
+        _update_job(job_id, status='failed', active=None, error=str(error) or type(error).__name__,
+                    finished_at=datetime.utcnow())
+
+def run_training_job(job_id):
+    """
+    Vykdo treniravimo užduotį (worker procese)
+
+    Grąžina:
+        str: Galutinė užduoties būsena
+    """
+    from services.model_service import train_model_with_params
+
+    session = SessionLocal()
+    try:
+        job = session.query(TrainingJob).filter(TrainingJob.id == job_id).first()
+        if job is None:
+            raise ValueError(f"Užduotis {job_id} nerasta")
+        model_type, test_size = job.model_type, job.test_size
+        params = json.loads(job.params) if job.params else {}
+    finally:
+        session.close()
+
+    _update_job(job_id, status='running', started_at=datetime.utcnow(), message="Vykdoma")
+
+    def report(progress, message):
+        _update_job(job_id, progress=progress, message=message)
+
+    result = train_model_with_params(model_type, test_size, params, progress_callback=report)
+
+    if 'error' in result:
+        _update_job(job_id, status='failed', active=None, error=result['error'],
+                    finished_at=datetime.utcnow())
+        return 'failed'
+
+    _update_job(job_id, status='done', progress=1.0, message="Baigta",
+                model_id=result.get('model_id'), result=json.dumps(result),
+                finished_at=datetime.utcnow())
+    logger.info(f"Treniravimo užduotis {job_id} baigta, modelio ID {result.get('model_id')}")
+    return 'done'
+
+def get_job_status(job_id):
+    """
+    Grąžina užduoties būseną, progresą ir (jei baigta) metrikas
+
+    Grąžina:
+        dict arba None, jei užduotis nerasta
+    """
+    session = SessionLocal()
+    try:
+        job = session.query(TrainingJob).filter(TrainingJob.id == job_id).first()
+        if job is None:
+            return None
+        return {
+            'job_id': job.id,
+            'model_type': job.model_type,
+            'params': json.loads(job.params) if job.params else {},
+            'status': job.status,
+            'progress': job.progress,
+            'message': job.message,
+            'model_id': job.model_id,
+            'result': json.loads(job.result) if job.result else None,
+            'error': job.error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+    except Exception as e:
+        logger.error(f"Klaida gaunant užduoties {job_id} būseną: {e}")
+        return None
+    finally:
+        session.close()
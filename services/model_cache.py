@@ -0,0 +1,101 @@
+"""
+Įkeltų modelių talpykla (LRU)
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Maksimalus talpyklos dydis megabaitais (galima keisti per aplinkos kintamąjį)
+MODEL_CACHE_MAX_MB = int(os.environ.get("MODEL_CACHE_MAX_MB", 512))
+
+class ModelCache:
+    """
+    Procese laikoma modelių talpykla.
+    Raktas - model_id, o įrašas laikomas galiojančiu tol, kol nepasikeitė
+    modelio failo mtime. Kai viršijamas dydis, šalinami seniausiai naudoti modeliai.
+    Modelio dydis atmintyje vertinamas pagal joblib failo dydį.
+    """
+
+    def __init__(self, max_bytes=MODEL_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_id):
+        """
+        Grąžina (model, model_info) iš talpyklos arba None,
+        jei modelio nėra arba jo failas pasikeitė
+        """
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry is not None:
+                try:
+                    current_mtime = os.path.getmtime(entry['path'])
+                except OSError:
+                    current_mtime = None
+                if current_mtime == entry['mtime']:
+                    self._entries.move_to_end(model_id)
+                    self.hits += 1
+                    return entry['model'], entry['info']
+                # Failas pakeistas arba ištrintas - įrašas nebegalioja
+                self._remove(model_id)
+            self.misses += 1
+            return None
+
+    def put(self, model_id, model, model_info, path):
+        """Įdeda modelį į talpyklą ir, jei reikia, pašalina seniausiai naudotus"""
+        size = os.path.getsize(path)
+        with self._lock:
+            if model_id in self._entries:
+                self._remove(model_id)
+            self._entries[model_id] = {
+                'model': model,
+                'info': model_info,
+                'path': path,
+                'mtime': os.path.getmtime(path),
+                'size': size,
+            }
+            self.total_bytes += size
+
+            # Paliekame bent vieną (ką tik įdėtą) modelį, net jei jis didesnis už limitą
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+                logger.info(f"Modelis {oldest_id} pašalintas iš talpyklos")
+
+    def clear(self):
+        """Išvalo talpyklą"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Grąžina talpyklos statistiką"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'model_ids': list(self._entries.keys()),
+                'size_mb': round(self.total_bytes / 1024 / 1024, 2),
+                'max_size_mb': round(self.max_bytes / 1024 / 1024, 2),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / requests, 4) if requests else 0.0,
+            }
+
+    def _remove(self, model_id):
+        """Pašalina įrašą (kviečiama su užrakintu _lock)"""
+        entry = self._entries.pop(model_id)
+        self.total_bytes -= entry['size']
+
+# Bendra talpykla visam procesui
+model_cache = ModelCache()
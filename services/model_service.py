@@ -3,10 +3,10 @@ Modelio treniravimo ir prognozavimo paslaugos
 """
 import os
 import sys
+import json
 import logging
 import pandas as pd
 import numpy as np
-import joblib
 from datetime import datetime, timedelta
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
@@ -17,82 +17,63 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.config import SessionLocal
-from database.models import BtcFeatures, MLModel
+from database.models import MLModel, Prediction, series_filter
+from database.feature_store import load_features, features_model
+from database.bulk_writer import bulk_upsert
+from services.model_cache import model_cache
+from services.downsampling import CHART_MAX_POINTS
+from services.chart_service import price_chart_data
+from ml.artifacts import save_model_artifact, load_model_artifact
 
 # Sukuriame modelių katalogą, jei jo nėra
 os.makedirs('models', exist_ok=True)
 
 logger = logging.getLogger(__name__)
 
-def get_training_data():
+# Stulpeliai, kuriuos naudoja modeliai (timestamp ir target pašalinami prieš treniravimą)
+MODEL_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    
+    # Techniniai indikatoriai
+    'sma_5', 'sma_20', 'sma_50',
+    'ema_5', 'ema_20', 'ema_50',
+    'rsi_14',
+    'macd', 'macd_signal', 'macd_histogram',
+    'bb_middle', 'bb_upper', 'bb_lower', 'bb_width',
+    
+    # Lag features
+    'close_lag_1', 'close_lag_2', 'close_lag_3',
+    'return_lag_1', 'return_lag_2', 'return_lag_3',
+    
+    # Target
+    'target'
+]
+
+# Požymiai, kuriuos gauna modelis (be timestamp ir target)
+FEATURE_COLUMNS = [col for col in MODEL_COLUMNS if col not in ('timestamp', 'target')]
+
+def _session_bind(session):
+    """
+    Sesijos prisijungimas load_features()/bulk_upsert() kvietimams.
+    Be sesijos grąžina None - tada naudojamas bendras engine.
+    """
+    return session.connection() if session is not None else None
+
+def get_training_data(start=None, end=None, session=None):
     """
-    Gauna treniravimo duomenis naudojant SQLAlchemy ORM
+    Gauna treniravimo duomenis stulpeliniu skaitymu (be ORM objektų)
     """
     try:
-        # Sukuriame sesiją
-        session = SessionLocal()
-        
-        # Gauname duomenis per ORM užklausą
-        features = session.query(BtcFeatures).order_by(BtcFeatures.timestamp).all()
-        
-        # Konvertuojame ORM objektus į DataFrame
-        data = []
-        for feature in features:
-            # Kiekvienas feature yra BtcFeatures objektas, kurį konvertuojame į žodyną
-            record = {
-                'timestamp': feature.timestamp,
-                'open': feature.open,
-                'high': feature.high,
-                'low': feature.low,
-                'close': feature.close,
-                'volume': feature.volume,
-                
-                # Techniniai indikatoriai
-                'sma_5': feature.sma_5,
-                'sma_20': feature.sma_20,
-                'sma_50': feature.sma_50,
-                'ema_5': feature.ema_5,
-                'ema_20': feature.ema_20,
-                'ema_50': feature.ema_50,
-                'rsi_14': feature.rsi_14,
-                'macd': feature.macd,
-                'macd_signal': feature.macd_signal,
-                'macd_histogram': feature.macd_histogram,
-                'bb_middle': feature.bb_middle,
-                'bb_upper': feature.bb_upper,
-                'bb_lower': feature.bb_lower,
-                'bb_width': feature.bb_width,
-                
-                # Lag features
-                'close_lag_1': feature.close_lag_1,
-                'close_lag_2': feature.close_lag_2,
-                'close_lag_3': feature.close_lag_3,
-                'return_lag_1': feature.return_lag_1,
-                'return_lag_2': feature.return_lag_2,
-                'return_lag_3': feature.return_lag_3,
-                
-                # Target
-                'target': feature.target
-            }
-            
-            data.append(record)
-        
-        # Sukuriame DataFrame
-        df = pd.DataFrame(data)
-        
-        # Uždarome sesiją
-        session.close()
+        df = load_features(columns=MODEL_COLUMNS, start=start, end=end, bulk=True,
+                           bind=_session_bind(session))
         
         logger.info(f"Iš DB gauta {len(df)} eilučių treniravimui")
         return df
     except Exception as e:
         logger.error(f"Klaida gaunant duomenis: {e}")
-        # Uždarome sesiją, jei ji buvo sukurta
-        if 'session' in locals():
-            session.close()
         return pd.DataFrame()
 
-def save_model_to_db(model_name, accuracy, precision, recall, f1, model_path):
+def save_model_to_db(model_name, accuracy, precision, recall, f1, model_path, params=None, status='trained'):
     """
     Išsaugo modelio metrikas į duomenų bazę per SQLAlchemy ORM
     """
@@ -108,7 +89,9 @@ def save_model_to_db(model_name, accuracy, precision, recall, f1, model_path):
             precision=precision,
             recall=recall,
             f1_score=f1,
-            model_path=model_path
+            model_path=model_path,
+            params=json.dumps(params) if params is not None else None,
+            status=status
         )
         
         # Pridedame ir išsaugome
@@ -154,12 +137,21 @@ def create_model(model_type, params):
     else:
         raise ValueError(f"Nežinomas modelio tipas: {model_type}")
 
-def train_model_with_params(model_type, test_size, params):
+def train_model_with_params(model_type, test_size, params, progress_callback=None):
     """
     Treniruoja modelį su nurodytais parametrais
+    
+    Parametrai:
+        progress_callback: Funkcija (progresas nuo 0 iki 1, žinutė), kviečiama
+                           pasiekus kiekvieną treniravimo etapą
     """
+    def report(progress, message):
+        if progress_callback is not None:
+            progress_callback(progress, message)
+    
     try:
         # Gauname duomenis
+        report(0.05, "Gaunami duomenys")
         df = get_training_data()
         
         if df.empty:
@@ -179,8 +171,10 @@ def train_model_with_params(model_type, test_size, params):
         logger.info(f"Testavimo duomenų dydis: {X_test.shape}")
         
         # Sukuriame ir apmokome modelį
+        report(0.2, f"Treniruojamas modelis ({len(X_train)} eilučių)")
         model = create_model(model_type, params)
         model.fit(X_train, y_train)
+        report(0.8, "Modelis testuojamas")
         
         # Testuojame modelį
         y_pred = model.predict(X_test)
@@ -197,13 +191,14 @@ def train_model_with_params(model_type, test_size, params):
         logger.info(f"Modelio F1 rezultatas: {f1:.4f}")
         
         # Išsaugome modelį į failą
+        report(0.9, "Modelis išsaugomas")
         model_name = f"{model_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         model_path = f"models/{model_name}.joblib"
-        joblib.dump(model, model_path)
+        save_model_artifact(model, model_path)
         logger.info(f"Modelis išsaugotas į {model_path}")
         
         # Išsaugome modelį į DB
-        model_id = save_model_to_db(model_name, acc, prec, rec, f1, model_path)
+        model_id = save_model_to_db(model_name, acc, prec, rec, f1, model_path, params=params)
         
         # Gauname požymių svarbą (tik jei modelis palaiko feature_importances_)
         feature_importance = None
@@ -232,15 +227,30 @@ def train_model_with_params(model_type, test_size, params):
             'error': str(e)
         }
 
-def load_model(model_id):
+def load_model(model_id, session=None):
     """
-    Įkelia modelį iš disko pagal ID
+    Įkelia modelį pagal ID - pirmiausia ieško talpykloje,
+    o jei nerado (arba failas pasikeitė) - įkelia iš disko
+    
+    Parametrai:
+        session: DB sesija (pvz. užklausos sesija), None - sukuriama nauja
     """
     try:
+        cached = model_cache.get(model_id)
+        if cached is not None:
+            return cached
+        
         # Gauname modelio informaciją iš DB
-        session = SessionLocal()
-        model_info = session.query(MLModel).filter(MLModel.id == model_id).first()
-        session.close()
+        if session is None:
+            own_session = SessionLocal()
+            model_info = own_session.query(MLModel).filter(MLModel.id == model_id).first()
+            own_session.close()
+        else:
+            model_info = session.query(MLModel).filter(MLModel.id == model_id).first()
+            # Įrašas laikomas talpykloje ilgiau nei sesija - atjungiame, kad
+            # vėlesnis commit šioje sesijoje jo nepaverstų pasenusiu
+            if model_info is not None:
+                session.expunge(model_info)
         
         if not model_info:
             raise ValueError(f"Modelis su ID {model_id} nerastas")
@@ -250,88 +260,69 @@ def load_model(model_id):
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Modelio failas nerastas: {model_path}")
         
-        model = joblib.load(model_path)
+        model = load_model_artifact(model_path)
+        model_cache.put(model_id, model, model_info, model_path)
         return model, model_info
     except Exception as e:
         logger.error(f"Klaida įkeliant modelį: {e}")
         return None, None
 
-def get_latest_data(days=30):
+def warm_up_model_cache(limit=3):
     """
-    Gauna paskutinių dienų duomenis
+    Iš anksto įkelia naujausius modelius į talpyklą (pvz. paleidžiant Flask)
+    
+    Grąžina:
+        int: Įkeltų modelių skaičius
     """
     try:
         session = SessionLocal()
-        
-        # Gauname paskutines N dienų duomenis
-        features = (session.query(BtcFeatures)
-                   .order_by(BtcFeatures.timestamp.desc())
-                   .limit(days)
-                   .all())
-        
-        # Apverčiame, kad būtų nuo seniausių iki naujausių
-        features.reverse()
-        
-        # Konvertuojame į DataFrame
-        data = []
-        for feature in features:
-            data.append({
-                'timestamp': feature.timestamp,
-                'open': feature.open,
-                'high': feature.high,
-                'low': feature.low,
-                'close': feature.close,
-                'volume': feature.volume,
-                
-                # Techniniai indikatoriai
-                'sma_5': feature.sma_5,
-                'sma_20': feature.sma_20,
-                'sma_50': feature.sma_50,
-                'ema_5': feature.ema_5,
-                'ema_20': feature.ema_20,
-                'ema_50': feature.ema_50,
-                'rsi_14': feature.rsi_14,
-                'macd': feature.macd,
-                'macd_signal': feature.macd_signal,
-                'macd_histogram': feature.macd_histogram,
-                'bb_middle': feature.bb_middle,
-                'bb_upper': feature.bb_upper,
-                'bb_lower': feature.bb_lower,
-                'bb_width': feature.bb_width,
-                
-                # Lag features
-                'close_lag_1': feature.close_lag_1,
-                'close_lag_2': feature.close_lag_2,
-                'close_lag_3': feature.close_lag_3,
-                'return_lag_1': feature.return_lag_1,
-                'return_lag_2': feature.return_lag_2,
-                'return_lag_3': feature.return_lag_3,
-                
-                # Target
-                'target': feature.target
-            })
-        
+        # Paieškos bandymai (be modelio failo) neįkeliami
+        model_ids = [row.id for row in (session.query(MLModel.id)
+                                        .filter(MLModel.model_path.isnot(None))
+                                        .order_by(MLModel.created_at.desc())
+                                        .limit(limit)
+                                        .all())]
         session.close()
-        return pd.DataFrame(data)
+    except Exception as e:
+        logger.error(f"Klaida ruošiant modelių talpyklą: {e}")
+        return 0
+    
+    loaded = sum(1 for model_id in model_ids if load_model(model_id)[0] is not None)
+    logger.info(f"Į talpyklą iš anksto įkelta {loaded} modelių")
+    return loaded
+
+def get_latest_data(days=30, session=None):
+    """
+    Gauna paskutinių dienų duomenis
+    """
+    try:
+        # Gauname paskutines N eilučių, surūšiuotas nuo seniausių iki naujausių
+        return load_features(columns=MODEL_COLUMNS, latest=days, bind=_session_bind(session))
     except Exception as e:
         logger.error(f"Klaida gaunant naujausius duomenis: {e}")
-        if 'session' in locals():
-            session.close()
         return pd.DataFrame()
 
-def get_latest_indicators():
+def get_latest_indicators(session=None):
     """
     Gauna paskutinio įrašo indikatorius
+    
+    Parametrai:
+        session: DB sesija (pvz. užklausos sesija), None - sukuriama nauja
     """
+    own_session = session is None
     try:
-        session = SessionLocal()
-        
-        # Gauname patį naujausią įrašą
-        latest = (session.query(BtcFeatures)
-                 .order_by(BtcFeatures.timestamp.desc())
+        if own_session:
+            session = SessionLocal()
+        
+        # Gauname patį naujausią numatytosios laiko eilutės įrašą
+        features = features_model()
+        latest = (session.query(features)
+                 .filter(series_filter(features))
+                 .order_by(features.timestamp.desc())
                  .first())
         
-        session.close()
+        if own_session:
+            session.close()
         
         if not latest:
             return None
@@ -350,38 +341,159 @@ def get_latest_indicators():
         }
     except Exception as e:
         logger.error(f"Klaida gaunant naujausius indikatorius: {e}")
-        if 'session' in locals():
+        if own_session and session is not None:
             session.close()
         return None
 
-def predict_next_day(model_id, horizon=1):
+def get_available_models(limit=20, session=None):
+    """
+    Modeliai, kuriais galima prognozuoti (su modelio failu, be paieškos bandymų),
+    naujausi pirmi
+    
+    Grąžina:
+        list: [{'id', 'name', 'accuracy'}] (tuščias, jei įvyko klaida)
+    """
+    own_session = session is None
+    try:
+        if own_session:
+            session = SessionLocal()
+        rows = (session.query(MLModel.id, MLModel.name, MLModel.accuracy)
+                .filter(MLModel.model_path.isnot(None))
+                .order_by(MLModel.created_at.desc())
+                .limit(limit)
+                .all())
+        return [{'id': row.id, 'name': row.name, 'accuracy': row.accuracy or 0.0} for row in rows]
+    except Exception as e:
+        logger.error(f"Klaida gaunant modelių sąrašą: {e}")
+        return []
+    finally:
+        if own_session and session is not None:
+            session.close()
+
+def score_frame(model, df):
+    """
+    Prognozuoja visas DataFrame eilutes vienu predict_proba() kvietimu
+    
+    Grąžina:
+        tuple: (prognozių masyvas, kainos kilimo tikimybių masyvas)
+    """
+    probabilities = model.predict_proba(df[FEATURE_COLUMNS])
+    classes = list(model.classes_)
+    
+    # Klasė su didžiausia tikimybe - tas pats, ką grąžintų model.predict()
+    predictions = np.asarray(model.classes_)[probabilities.argmax(axis=1)]
+    up_probability = probabilities[:, classes.index(1)] if 1 in classes else np.zeros(len(df))
+    return predictions, up_probability
+
+def save_predictions(model_id, predictions_df, batch_size=None, session=None):
+    """
+    Išsaugo prognozes į predictions lentelę (esamos to paties modelio
+    ir laiko prognozės perrašomos)
+    
+    Parametrai:
+        session: DB sesija - jei perduota, įrašoma jos transakcijoje ir ji patvirtinama
+    
+    Grąžina:
+        int: Įrašytų eilučių skaičius
+    """
+    rows = pd.DataFrame({
+        'model_id': model_id,
+        'timestamp': predictions_df['timestamp'],
+        'prediction': predictions_df['prediction'],
+        'probability': predictions_df['probability'],
+        'created_at': datetime.utcnow(),
+    })
+    stats = bulk_upsert(rows, Prediction, batch_size=batch_size,
+                        update_columns=['prediction', 'probability', 'created_at'],
+                        bind=_session_bind(session))
+    if session is not None:
+        session.commit()
+    return stats['rows']
+
+def empty_predictions():
+    """Tuščias predict_range() rezultatas su tais pačiais stulpelių tipais"""
+    return pd.DataFrame({
+        'timestamp': pd.Series(dtype='datetime64[ns]'),
+        'close': pd.Series(dtype=np.float64),
+        'prediction': pd.Series(dtype=np.int64),
+        'probability': pd.Series(dtype=np.float64),
+    })
+
+def predict_range(model_id, start=None, end=None, persist=False, session=None):
+    """
+    Prognozuoja visas btc_features eilutes laiko intervale.
+    Duomenys nuskaitomi vienu stulpeliniu užklausimu, o modelis kviečiamas
+    vieną kartą visam intervalui.
+    
+    Parametrai:
+        model_id: Modelio ID
+        start: Intervalo pradžia (imtinai, None - nuo pradžios)
+        end: Intervalo pabaiga (imtinai, None - iki galo)
+        persist: Ar išsaugoti prognozes į predictions lentelę
+        session: DB sesija (pvz. užklausos sesija), None - kiekvienas kreipinys atskirai
+    
+    Grąžina:
+        DataFrame su stulpeliais timestamp, close, prediction, probability
+        (be eilučių, jei intervale nėra duomenų; visai tuščias, jei įvyko klaida)
+    """
+    try:
+        model, model_info = load_model(model_id, session=session)
+        if not model:
+            raise ValueError("Nepavyko įkelti modelio")
+        
+        df = load_features(columns=['timestamp'] + FEATURE_COLUMNS, start=start, end=end, bulk=True,
+                           bind=_session_bind(session))
+        
+        # Eilutės su trūkstamais požymiais negali būti prognozuojamos
+        df = df.dropna(subset=FEATURE_COLUMNS)
+        if df.empty:
+            logger.warning(f"Intervale {start} - {end} nėra duomenų prognozavimui")
+            return empty_predictions()
+        
+        predictions, probabilities = score_frame(model, df)
+        result = pd.DataFrame({
+            'timestamp': df['timestamp'].to_numpy(),
+            'close': df['close'].to_numpy(),
+            'prediction': predictions.astype(np.int64),
+            'probability': probabilities,
+        })
+        logger.info(f"Modeliu {model_id} prognozuota {len(result)} eilučių")
+        
+        if persist:
+            save_predictions(model_id, result, session=session)
+        
+        return result
+    except Exception as e:
+        logger.error(f"Klaida prognozuojant intervalą: {e}")
+        return pd.DataFrame()
+
+def predict_next_day(model_id, horizon=1, history=30, max_points=CHART_MAX_POINTS, session=None):
     """
     Prognozuoja sekančios dienos kainą
+    
+    Parametrai:
+        history: Kiek paskutinių eilučių rodyti grafike
+        max_points: Iki kiek taškų sumažinti grafiko eilutę (LTTB)
+        session: DB sesija (pvz. užklausos sesija), None - kiekvienas kreipinys atskirai
     """
     try:
         # Įkeliame modelį
-        model, model_info = load_model(model_id)
+        model, model_info = load_model(model_id, session=session)
         if not model:
             raise ValueError("Nepavyko įkelti modelio")
         
         # Gauname naujausius duomenis
-        df = get_latest_data(days=30)
+        df = get_latest_data(days=history, session=session)
         if df.empty:
             raise ValueError("Nepavyko gauti duomenų prognozavimui")
         
-        # Paimame paskutinį įrašą
-        latest_data = df.iloc[-1].drop(['timestamp', 'target'])
-        
-        # Prognozuojame
-        prediction = model.predict([latest_data])[0]
-        probability = model.predict_proba([latest_data])[0][1]  # Tikimybė kainai kilti
-        
-        # Paruošiame duomenis grafikui
-        dates = df['timestamp'].dt.strftime('%Y-%m-%d').tolist()
-        prices = df['close'].tolist()
+        # Prognozuojame paskutinį įrašą (vienas predict_proba kvietimas)
+        predictions, probabilities = score_frame(model, df.iloc[[-1]])
+        prediction = predictions[0]
+        probability = probabilities[0]  # Tikimybė kainai kilti
         
-        # Pridedame prognozuojamas datas ir kainas
-        predicted_prices = prices.copy()
+        # Prognozuojamos datos ir kainos
+        predicted_prices = []
         future_dates = []
         
         last_date = df['timestamp'].iloc[-1]
@@ -397,18 +509,21 @@ def predict_next_day(model_id, horizon=1):
             # Jei neigiama (kris), sumažiname kainą ~1%
             change = 0.01 if prediction == 1 else -0.01
             next_price = next_price * (1 + change)
-            predicted_prices.append(next_price)
+            predicted_prices.append(float(next_price))
         
-        # Sujungiame datas
-        all_dates = dates + future_dates
+        # Grafiko duomenys (ilga istorija sumažinama iki max_points taškų) laikomi
+        # talpykloje - puslapis juos gauna per /charts/api/<chart_key>
+        chart = price_chart_data(df['timestamp'].to_numpy(), df['close'].to_numpy(),
+                                 np.array(future_dates, dtype='datetime64[D]'), predicted_prices,
+                                 max_points=max_points)
         
         # Grąžiname prognozės rezultatą
         return {
             'prediction': int(prediction),
             'probability': float(probability),
-            'dates': all_dates,
-            'prices': prices + [None] * horizon,  # Pridedame None, kad būtų matomas tik prognozės taškas
-            'predicted_prices': [None] * len(prices) + predicted_prices[-horizon:]  # Pridedame None, kad grafikas būtų aiškesnis
+            'chart_key': chart['key'],
+            'predicted_dates': future_dates,
+            'predicted_prices': predicted_prices,
         }
     except Exception as e:
         logger.error(f"Klaida prognozuojant: {e}")
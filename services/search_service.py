@@ -0,0 +1,317 @@
+"""
+Hiperparametrų paieškos paslaugos (grid, random ir successive halving).
+Kiekvienas kandidatas vertinamas walk-forward blokais (kaip backtest_service),
+blokai skaičiuojami lygiagrečiai procesų telkinyje, o požymių matrica
+worker procesams perduodama per bendrą atmintį tik vieną kartą visai paieškai.
+Kiekvienas bandymas įrašomas į ml_models lentelę (status='trial'),
+o geriausią galima paaukštinti - apmokyti su visais duomenimis ir išsaugoti.
+"""
+import os
+import sys
+import json
+import math
+import hashlib
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+# Pridedame projekto direktoriją į kelią
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.config import SessionLocal
+from database.models import MLModel
+from services.model_service import create_model, get_training_data, save_model_to_db, FEATURE_COLUMNS
+from services.backtest_service import (
+    make_folds, init_fold_worker, fit_predict_fold, fold_metrics, load_backtest_arrays
+)
+from services.shared_data import SharedArrays
+from ml.artifacts import save_model_artifact
+
+logger = logging.getLogger(__name__)
+
+# Parametrų erdvės kiekvienam create_model() modelio tipui
+PARAM_SPACES = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 5, 10, 20],
+    },
+    'gradient_boosting': {
+        'learning_rate': [0.01, 0.05, 0.1, 0.2],
+        'n_estimators': [50, 100, 200],
+    },
+    'svm': {
+        'C': [0.1, 1.0, 10.0, 100.0],
+    },
+}
+
+# Kiek blokų prognozių laikoma talpykloje (galima keisti per aplinkos kintamąjį)
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 10000))
+
+class FoldResultCache:
+    """
+    Blokų prognozių talpykla.
+    Raktas - (modelio tipas, parametrai, duomenų versija, blokas), todėl
+    pakartotinė paieška su tais pačiais duomenimis nebetreniruoja tų pačių modelių.
+    """
+
+    def __init__(self, max_entries=SEARCH_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_type, params, data_version, fold):
+        """Sudaro talpyklos raktą (parametrai surūšiuojami, kad tvarka neturėtų įtakos)"""
+        return (model_type, json.dumps(params, sort_keys=True), data_version, tuple(fold))
+
+    def get(self, key):
+        """Grąžina bloko prognozes arba None"""
+        with self._lock:
+            predictions = self._entries.get(key)
+            if predictions is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return predictions
+
+    def put(self, key, predictions):
+        """Įdeda bloko prognozes ir pašalina seniausiai naudotas, jei viršytas dydis"""
+        with self._lock:
+            self._entries[key] = predictions
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Išvalo talpyklą"""
+        with self._lock:
+            self._entries.clear()
+
+# Bendra talpykla visam procesui
+fold_cache = FoldResultCache()
+
+def data_version(arrays):
+    """
+    Duomenų versija - požymių ir target masyvų maiša.
+    Pasikeitus btc_features duomenims pasikeičia ir versija, todėl
+    talpykloje esantys senų duomenų rezultatai nebenaudojami.
+    """
+    digest = hashlib.sha1()
+    for name in ('X', 'y'):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(str(array.shape).encode())
+        digest.update(array.data)
+    return digest.hexdigest()[:16]
+
+def grid_candidates(model_type, space=None):
+    """Visi parametrų deriniai iš parametrų erdvės"""
+    space = space or PARAM_SPACES[model_type]
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+def random_candidates(model_type, n_iter, space=None, seed=42):
+    """Atsitiktinai parinkti (nesikartojantys) parametrų deriniai"""
+    candidates = grid_candidates(model_type, space)
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(candidates), size=min(n_iter, len(candidates)), replace=False)
+    return [candidates[i] for i in sorted(chosen)]
+
+def _evaluate(executor, model_type, candidates, folds, arrays, version):
+    """
+    Įvertina kandidatus nurodytais blokais.
+    Talpykloje nerasti (kandidatas, blokas) deriniai skaičiuojami lygiagrečiai.
+
+    Grąžina:
+        list: Kiekvieno kandidato metrikos (sujungus visų blokų prognozes)
+    """
+    pending = {}
+    for index, params in enumerate(candidates):
+        for fold in folds:
+            key = fold_cache.key(model_type, params, version, fold)
+            if fold_cache.get(key) is None and key not in pending:
+                pending[key] = executor.submit(fit_predict_fold, model_type, params, fold)
+
+    computed = {}
+    for key, future in pending.items():
+        _, predictions, _ = future.result()
+        computed[key] = predictions.astype(np.int8)
+        fold_cache.put(key, computed[key])
+
+    results = []
+    for params in candidates:
+        predictions = []
+        indices = []
+        for fold in folds:
+            key = fold_cache.key(model_type, params, version, fold)
+            # Ką tik apskaičiuoti rezultatai galėjo jau būti išstumti iš talpyklos
+            predictions.append(computed[key] if key in computed else fold_cache.get(key))
+            indices.append(np.arange(fold[2], fold[3]))
+        predictions = np.concatenate(predictions)
+        indices = np.concatenate(indices)
+        metrics = fold_metrics(arrays['y'][indices], predictions, arrays['returns'][indices])
+        metrics['folds'] = len(folds)
+        results.append(metrics)
+
+    logger.info(f"Įvertinta {len(candidates)} kandidatų su {len(folds)} blokais "
+                f"({len(pending)} naujų treniravimų)")
+    return results
+
+def run_search(model_type, method='grid', space=None, n_iter=10, start=None, end=None,
+               train_size=1000, test_size=250, window='expanding', scoring='f1_score',
+               eta=3, min_folds=1, max_workers=None, seed=42, record=True):
+    """
+    Paleidžia hiperparametrų paiešką
+
+    Parametrai:
+        model_type: 'random_forest', 'gradient_boosting' arba 'svm'
+        method: 'grid', 'random' arba 'halving' (successive halving)
+        space: Parametrų erdvė (pagal nutylėjimą - PARAM_SPACES[model_type])
+        n_iter: Kandidatų skaičius 'random' ir 'halving' metodams
+        start, end: Duomenų intervalas
+        train_size, test_size, window: Walk-forward blokų nustatymai (kaip run_backtest)
+        scoring: Metrika geriausiam kandidatui parinkti (accuracy, f1_score, pnl ir t.t.)
+        eta: Kiek kartų 'halving' sumažina kandidatų ir padidina blokų skaičių kiekviename etape
+        min_folds: Kiek blokų naudojama pirmame 'halving' etape
+        max_workers: Lygiagrečių procesų skaičius (None - pagal CPU skaičių)
+        seed: Atsitiktinių kandidatų sėkla
+        record: Ar įrašyti bandymus į ml_models lentelę
+
+    Grąžina:
+        dict su visais bandymais ir geriausiu kandidatu arba {'error': ...}
+    """
+    try:
+        if model_type not in PARAM_SPACES:
+            raise ValueError(f"Nežinomas modelio tipas: {model_type}")
+        if method == 'grid':
+            candidates = grid_candidates(model_type, space)
+        elif method in ('random', 'halving'):
+            candidates = random_candidates(model_type, n_iter, space, seed)
+        else:
+            raise ValueError(f"Nežinomas paieškos metodas: {method}")
+
+        arrays = load_backtest_arrays(start, end)
+        folds = make_folds(len(arrays['y']), train_size, test_size, window=window)
+        if not folds:
+            raise ValueError(f"Per mažai duomenų: {len(arrays['y'])} eilučių, o treniravimo langas {train_size}")
+        version = data_version(arrays)
+
+        logger.info(f"Paieška {method} ({model_type}): {len(candidates)} kandidatų, "
+                    f"{len(folds)} blokų, duomenų versija {version}")
+
+        trials = {}
+        with SharedArrays({'X': arrays['X'], 'y': arrays['y']}) as shared:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=init_fold_worker,
+                                     initargs=(shared.specs,)) as executor:
+                if method == 'halving':
+                    # Pirmi etapai pigūs (mažai blokų), į kitus patenka tik geriausi
+                    survivors = list(range(len(candidates)))
+                    n_folds = min(max(min_folds, 1), len(folds))
+                    while True:
+                        results = _evaluate(executor, model_type, [candidates[i] for i in survivors],
+                                            folds[:n_folds], arrays, version)
+                        for index, metrics in zip(survivors, results):
+                            trials[index] = metrics
+                        if n_folds == len(folds):
+                            break
+                        ranked = sorted(survivors, key=lambda i: trials[i][scoring], reverse=True)
+                        survivors = ranked[:max(1, math.ceil(len(survivors) / eta))]
+                        # Paskutinis likęs kandidatas iš karto įvertinamas visais blokais
+                        n_folds = len(folds) if len(survivors) == 1 else min(n_folds * eta, len(folds))
+                else:
+                    results = _evaluate(executor, model_type, candidates, folds, arrays, version)
+                    trials = dict(enumerate(results))
+
+        search_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        trial_results = []
+        for index in sorted(trials):
+            metrics = trials[index]
+            trial = {'params': candidates[index], **metrics}
+            if record:
+                trial['model_id'] = save_model_to_db(
+                    f"{model_type}_search_{search_id}_{index + 1:03d}",
+                    metrics['accuracy'], metrics['precision'], metrics['recall'], metrics['f1_score'],
+                    None, params=candidates[index], status='trial'
+                )
+            trial_results.append(trial)
+
+        # Geriausias - tik tarp kandidatų, įvertintų visais blokais
+        complete = [trial for trial in trial_results if trial['folds'] == len(folds)]
+        best = max(complete, key=lambda trial: trial[scoring])
+        logger.info(f"Geriausi parametrai: {best['params']} ({scoring} = {best[scoring]:.4f})")
+
+        return {
+            'search_id': search_id,
+            'model_type': model_type,
+            'method': method,
+            'scoring': scoring,
+            'data_version': version,
+            'folds': len(folds),
+            'trials': trial_results,
+            'best': best,
+        }
+    except Exception as e:
+        logger.error(f"Klaida vykdant paiešką: {e}")
+        return {
+            'error': str(e)
+        }
+
+def _model_type_from_name(name):
+    """Modelio tipas iš pavadinimo (pvz. random_forest_search_20250513_120000_001)"""
+    for model_type in PARAM_SPACES:
+        if name.startswith(model_type):
+            return model_type
+    raise ValueError(f"Nepavyko nustatyti modelio tipo iš pavadinimo: {name}")
+
+def promote_trial(model_id, start=None, end=None):
+    """
+    Paaukština paieškos bandymą: apmoko modelį su visais duomenimis,
+    išsaugo jo failą ir pažymi įrašą status='promoted'
+
+    Grąžina:
+        dict su model_id ir model_path arba {'error': ...}
+    """
+    session = SessionLocal()
+    try:
+        trial = session.query(MLModel).filter(MLModel.id == model_id).first()
+        if not trial:
+            raise ValueError(f"Modelis su ID {model_id} nerastas")
+
+        model_type = _model_type_from_name(trial.name)
+        params = json.loads(trial.params) if trial.params else {}
+
+        df = get_training_data(start, end).dropna()
+        if df.empty:
+            raise ValueError("Nepavyko gauti duomenų treniravimui")
+
+        model = create_model(model_type, params)
+        model.fit(df[FEATURE_COLUMNS], df['target'])
+
+        model_path = f"models/{trial.name}.joblib"
+        save_model_artifact(model, model_path)
+
+        trial.model_path = model_path
+        trial.status = 'promoted'
+        session.commit()
+
+        logger.info(f"Bandymas {model_id} paaukštintas, modelis išsaugotas į {model_path}")
+        return {
+            'model_id': model_id,
+            'model_path': model_path,
+            'params': params,
+        }
+    except Exception as e:
+        logger.error(f"Klaida paaukštinant modelį: {e}")
+        session.rollback()
+        return {
+            'error': str(e)
+        }
+    finally:
+        session.close()
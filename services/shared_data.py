@@ -0,0 +1,76 @@
+"""
+NumPy masyvų dalijimasis tarp procesų per bendrą atmintį (shared memory).
+Pagrindinis procesas vieną kartą nukopijuoja masyvus į SharedMemory blokus,
+o worker procesai prie jų prisijungia pagal pavadinimą, nieko nekopijuodami.
+"""
+import logging
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SharedArrays:
+    """
+    Masyvų rinkinys bendroje atmintyje.
+    Naudojamas kaip context manager pagrindiniame procese - išeinant
+    bendros atminties blokai uždaromi ir ištrinami.
+
+    Pavyzdys:
+        with SharedArrays({'X': X, 'y': y}) as shared:
+            executor = ProcessPoolExecutor(initializer=init, initargs=(shared.specs,))
+    """
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.specs = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                # SharedMemory negali būti 0 baitų dydžio
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.specs[name] = {
+                    'shm_name': block.name,
+                    'shape': array.shape,
+                    'dtype': array.dtype.str,
+                }
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Uždaro ir ištrina visus bendros atminties blokus"""
+        for block in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def attach_arrays(specs):
+    """
+    Prisijungia prie bendros atminties blokų worker procese
+
+    Grąžina:
+        tuple: (masyvų žodynas, SharedMemory objektų sąrašas) - objektus
+        reikia laikyti gyvus tol, kol naudojami masyvai
+    """
+    arrays = {}
+    blocks = []
+    for name, spec in specs.items():
+        block = shared_memory.SharedMemory(name=spec['shm_name'])
+        blocks.append(block)
+        array = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=block.buf)
+        # Worker'iai duomenų nekeičia - apsaugome nuo atsitiktinio rašymo
+        array.flags.writeable = False
+        arrays[name] = array
+    return arrays, blocks
@@ -0,0 +1,80 @@
+/*
+ * Grafikų braižymas naršyklėje pagal /charts/api/... JSON duomenis
+ */
+
+// Sukurti grafikai pagal canvas ID, kad perbraižant seną būtų galima sunaikinti
+const btcCharts = {};
+
+function fetchChartData(url) {
+    return fetch(url).then(response => {
+        if (!response.ok) {
+            throw new Error('Nepavyko gauti grafiko duomenų: ' + response.status);
+        }
+        return response.json();
+    });
+}
+
+function drawChart(canvasId, config) {
+    if (btcCharts[canvasId]) {
+        btcCharts[canvasId].destroy();
+    }
+    const ctx = document.getElementById(canvasId).getContext('2d');
+    btcCharts[canvasId] = new Chart(ctx, config);
+    return btcCharts[canvasId];
+}
+
+// Kainos grafikas (faktinės ir, jei yra, prognozuojamos kainos)
+function loadPriceChart(canvasId, url) {
+    return fetchChartData(url).then(chart => {
+        const data = chart.data;
+        const labels = data.dates.concat(data.predicted_dates || []);
+        const datasets = [{
+            label: 'Bitcoin kaina (USD)',
+            data: data.prices,
+            backgroundColor: 'rgba(54, 162, 235, 0.2)',
+            borderColor: 'rgba(54, 162, 235, 1)',
+            borderWidth: 1,
+            pointRadius: 0
+        }];
+        if (data.predicted_prices) {
+            datasets.push({
+                label: 'Prognozė',
+                data: new Array(data.prices.length).fill(null).concat(data.predicted_prices),
+                backgroundColor: 'rgba(255, 99, 132, 0.2)',
+                borderColor: 'rgba(255, 99, 132, 1)',
+                borderWidth: 2,
+                borderDash: [5, 5],
+                pointRadius: 3
+            });
+        }
+        return drawChart(canvasId, {
+            type: 'line',
+            data: { labels: labels, datasets: datasets },
+            options: {
+                animation: false,
+                scales: { y: { beginAtZero: false } }
+            }
+        });
+    });
+}
+
+// Požymių svarbos grafikas
+function loadFeatureImportanceChart(canvasId, url) {
+    return fetchChartData(url).then(chart => drawChart(canvasId, {
+        type: 'bar',
+        data: {
+            labels: chart.data.feature_names,
+            datasets: [{
+                label: 'Požymių svarba',
+                data: chart.data.feature_importance,
+                backgroundColor: 'rgba(54, 162, 235, 0.6)',
+                borderColor: 'rgba(54, 162, 235, 1)',
+                borderWidth: 1
+            }]
+        },
+        options: {
+            indexAxis: 'y',
+            scales: { x: { beginAtZero: true } }
+        }
+    }));
+}
@@ -0,0 +1,41 @@
+"""
+Bendri testų nustatymai.
+Testai naudoja laikiną SQLite DB - DATABASE_URL turi būti nustatytas
+prieš importuojant database.config, todėl jis nustatomas čia.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix="btc_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["FEATURES_SNAPSHOT_DIR"] = os.path.join(TEST_DIR, 'snapshots')
+
+# Šis kelias leidžia importuoti projekto modulius
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Bendras engine su sukurtomis lentelėmis"""
+    from database.config import engine, Base
+    import database.models  # noqa: F401 - užregistruoja visas lenteles
+    Base.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def clean_table(db_engine):
+    """Išvalo nurodytas lenteles prieš testą ir po jo"""
+    tables = []
+
+    def clean(*models):
+        with db_engine.begin() as conn:
+            for model in models:
+                conn.execute(model.__table__.delete())
+        tables.extend(models)
+
+    yield clean
+    with db_engine.begin() as conn:
+        for model in tables:
+            conn.execute(model.__table__.delete())
@@ -0,0 +1,61 @@
+"""
+Walk-forward backtest testai (services/backtest_service.py) su sintetiniais duomenimis.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import backtest_service
+
+ROWS = 1200
+
+@pytest.fixture
+def arrays(monkeypatch):
+    """Sintetiniai požymiai: target priklauso nuo pirmojo požymio"""
+    rng = np.random.default_rng(0)
+    X = rng.random((ROWS, 4))
+    data = {
+        'X': X,
+        'y': (X[:, 0] > 0.5).astype(np.int64),
+        'returns': rng.normal(0, 0.01, ROWS),
+        'timestamps': pd.date_range('2024-01-01', periods=ROWS, freq='15min').to_numpy(),
+    }
+    monkeypatch.setattr(backtest_service, 'load_backtest_arrays', lambda start, end: data)
+    return data
+
+def run(**kwargs):
+    return backtest_service.run_backtest('random_forest', {'n_estimators': 5}, train_size=400,
+                                         test_size=200, max_workers=2, **kwargs)
+
+def test_gaps_between_folds_are_not_scored(arrays):
+    result = run(step=400)
+
+    assert 'error' not in result, result
+    assert [fold['rows'] for fold in result['folds']] == [200, 200]
+    # Eilutės tarp blokų (600-800) neprognozuotos - į suvestinę nepatenka
+    assert result['summary']['rows'] == 400
+    assert len(result['equity']['timestamps']) == len(result['equity']['strategy']) == 400
+    assert not np.isnan(result['equity']['probability']).any()
+
+def test_overlapping_folds_score_own_predictions(arrays, monkeypatch):
+    # Kiekvienas blokas prognozuoja tik savo numerį - taip matyti, kieno prognozės įvertintos
+    def fold_predictions(model_type, params, fold):
+        _, _, test_start, test_end = fold
+        value = (test_start // 100) % 2
+        return fold, np.full(test_end - test_start, value), np.full(test_end - test_start, float(value))
+
+    monkeypatch.setattr(backtest_service, 'fit_predict_fold', fold_predictions)
+    # Vietinė funkcija neperduodama į kitą procesą - blokai vykdomi thread'uose
+    monkeypatch.setattr(backtest_service, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    result = run(step=100)
+
+    assert 'error' not in result, result
+    y = arrays['y']
+    for fold in result['folds']:
+        test_start = 400 + (fold['fold'] - 1) * 100
+        test_end = min(test_start + 200, ROWS)
+        expected = np.mean(y[test_start:test_end] == (test_start // 100) % 2)
+        assert fold['accuracy'] == pytest.approx(expected)
+    assert result['summary']['rows'] == ROWS - 400
@@ -0,0 +1,78 @@
+"""
+/predict/api/batch (predict_range) testai: intervalas be duomenų grąžina tuščią, o ne klaidą.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+from sklearn.ensemble import RandomForestClassifier
+
+from database.config import SessionLocal
+from database.feature_store import save_features
+from database.models import BtcFeatures, MLModel
+from ml.artifacts import save_model_artifact
+from routes import register_routes
+from services import model_service
+from services.model_cache import model_cache
+
+def make_features(start, rows):
+    """Atsitiktiniai požymiai kas 15 min. nuo start"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({col: rng.random(rows) * 100 for col in model_service.FEATURE_COLUMNS})
+    df['timestamp'] = pd.date_range(start, periods=rows, freq='15min')
+    df['target'] = rng.integers(0, 2, rows)
+    return df
+
+@pytest.fixture
+def model_id(clean_table, tmp_path):
+    """Modelis ir požymiai sausio bei kovo mėnesiams (vasaris - tarpas)"""
+    clean_table(BtcFeatures, MLModel)
+    model_cache.clear()
+    df = pd.concat([make_features('2024-01-01', 200), make_features('2024-03-01', 200)], ignore_index=True)
+    save_features(df, storage='wide')
+
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(
+        df[model_service.FEATURE_COLUMNS], df['target'])
+    path = save_model_artifact(model, str(tmp_path / 'batch_model.joblib'))
+    session = SessionLocal()
+    try:
+        info = MLModel(name='test_rf', accuracy=0.5, model_path=path)
+        session.add(info)
+        session.commit()
+        yield info.id
+    finally:
+        session.close()
+        model_cache.clear()
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    register_routes(app)
+    return app.test_client()
+
+def test_predict_range_empty_frame_is_typed(model_id):
+    result = model_service.predict_range(model_id, start=pd.Timestamp('2030-01-01'))
+
+    assert result.empty
+    assert list(result.columns) == ['timestamp', 'close', 'prediction', 'probability']
+    assert result['timestamp'].dtype == 'datetime64[ns]'
+    assert result['close'].dtype == np.float64 and result['probability'].dtype == np.float64
+
+@pytest.mark.parametrize('payload', [
+    {'start': '2030-01-01'},
+    {'start': '2024-02-01', 'end': '2024-02-20'},
+])
+def test_batch_without_rows_returns_empty_lists(client, model_id, payload):
+    response = client.post('/predict/api/batch', json={'model_id': model_id, **payload})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'model_id': model_id, 'count': 0, 'timestamps': [],
+                                   'close': [], 'prediction': [], 'probability': []}
+
+def test_batch_with_rows(client, model_id):
+    response = client.post('/predict/api/batch', json={'model_id': model_id, 'start': '2024-03-01', 'end': '2024-03-01 23:45'})
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['count'] == 96 == len(data['timestamps']) == len(data['prediction'])
+    assert data['timestamps'][0] == '2024-03-01T00:00:00'
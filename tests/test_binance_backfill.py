@@ -0,0 +1,133 @@
+"""
+API_TO_SQL backfill testai su lokaliu netikru Binance klines serveriu (BINANCE_URL).
+"""
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import pytest
+from sqlalchemy import select, func
+
+import API_TO_SQL as api
+from database.models import BtcOHLCV
+
+START = pd.Timestamp('2024-01-01')
+
+class FakeKlines:
+    """Netikras /api/v3/klines - žvakės kiekvienam intervalui ir užklausų žurnalas"""
+
+    def __init__(self, rows, start=START):
+        self.rows = dict(rows)
+        self.start = start
+        self.requests = []
+
+    def candles(self, interval, start_ms, end_ms, limit):
+        step = api.INTERVAL_MS[interval]
+        first = int(self.start.value // 1_000_000)
+        opens = range(first, first + self.rows.get(interval, 0) * step, step)
+        selected = [t for t in opens if t >= start_ms and (end_ms is None or t <= end_ms)][:limit]
+        return [[t, "100.0", "101.0", "99.0", "100.5", "2.0", t + step - 1, "0", 0, "0", "0", "0"]
+                for t in selected]
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                fake.requests.append(params)
+                body = json.dumps(fake.candles(
+                    params['interval'], int(params.get('startTime', 0)),
+                    int(params['endTime']) if 'endTime' in params else None, int(params['limit'])))
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+@pytest.fixture
+def klines_server(monkeypatch):
+    """Paleidžia netikrą serverį ir grąžina (FakeKlines, URL)"""
+    monkeypatch.setattr(api, 'PAGE_PAUSE', 0)
+    fake = FakeKlines({})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), fake.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield fake, f"http://127.0.0.1:{server.server_port}/api/v3/klines"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def ohlcv_table(clean_table):
+    clean_table(BtcOHLCV)
+
+def series_counts(engine):
+    """Eilučių skaičius ir unikalūs timestamp kiekvienai (symbol, interval) porai"""
+    table = BtcOHLCV.__table__
+    with engine.connect() as conn:
+        rows = conn.execute(select(table.c.symbol, table.c.interval, func.count(),
+                                   func.count(table.c.timestamp.distinct()))
+                            .group_by(table.c.symbol, table.c.interval)).all()
+    return {(symbol, interval): (count, distinct) for symbol, interval, count, distinct in rows}
+
+def test_pages_until_short_page(klines_server):
+    fake, url = klines_server
+    fake.rows['15m'] = 2 * api.LIMIT + 500
+    start_ms = int(START.value // 1_000_000)
+
+    pages = list(api.iter_binance_pages('15m', start_ms, url=url))
+
+    assert [len(page) for page in pages] == [api.LIMIT, api.LIMIT, 500]
+    # Trumpas paskutinis puslapis sustabdo ciklą - papildomos užklausos nėra
+    assert len(fake.requests) == 3
+    timestamps = pd.concat(pages)['timestamp']
+    assert timestamps.is_unique and timestamps.is_monotonic_increasing
+    assert int(fake.requests[1]['startTime']) == int(pages[0]['timestamp'].iloc[-1].value // 1_000_000) + api.INTERVAL_MS['15m']
+
+def test_backfill_resumes_without_duplicates(klines_server, ohlcv_table, db_engine):
+    fake, url = klines_server
+    fake.rows['15m'] = api.LIMIT + 200
+
+    api.backfill(['15m'], start=START, url=url)
+    assert series_counts(db_engine) == {(api.SYMBOL, '15m'): (api.LIMIT + 200, api.LIMIT + 200)}
+
+    # Atsirado naujų žvakių - tęsiama nuo MAX(timestamp) + intervalas
+    fake.rows['15m'] = api.LIMIT + 350
+    fake.requests.clear()
+    expected_resume = api.get_resume_time('15m')
+    api.backfill(['15m'], start=START, url=url)
+
+    assert int(fake.requests[0]['startTime']) == expected_resume
+    assert expected_resume == int((START + pd.Timedelta(minutes=15) * (api.LIMIT + 200)).value // 1_000_000)
+    assert series_counts(db_engine) == {(api.SYMBOL, '15m'): (api.LIMIT + 350, api.LIMIT + 350)}
+
+def test_backfill_intervals_write_separate_series(klines_server, ohlcv_table, db_engine):
+    fake, url = klines_server
+    fake.rows.update({'15m': 1300, '1h': 400})
+
+    api.backfill(['15m', '1h'], start=START, url=url)
+
+    assert series_counts(db_engine) == {
+        (api.SYMBOL, '15m'): (1300, 1300),
+        (api.SYMBOL, '1h'): (400, 400),
+    }
+    assert {request['interval'] for request in fake.requests} == {'15m', '1h'}
+
+def test_open_kline_is_not_stored(klines_server, ohlcv_table, db_engine):
+    fake, url = klines_server
+    # Dvi užsidariusios žvakės ir dabartinė, dar neužsidariusi
+    open_kline = pd.Timestamp.now('UTC').tz_localize(None).floor('15min')
+    fake.start = open_kline - pd.Timedelta(minutes=30)
+    fake.rows['15m'] = 3
+
+    api.backfill(['15m'], start=fake.start, url=url)
+
+    assert series_counts(db_engine) == {(api.SYMBOL, '15m'): (2, 2)}
+    # Kitas paleidimas pradės nuo dar neužsidariusios žvakės ir ją gaus užbaigtą
+    assert api.get_resume_time('15m') == int(open_kline.value // 1_000_000)
@@ -0,0 +1,36 @@
+"""
+Grafikų API testai (routes/chart_routes.py).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+
+from routes import register_routes
+from services.chart_service import price_chart_data
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    register_routes(app)
+    return app.test_client()
+
+def test_cached_chart_served_by_key(client):
+    dates = pd.date_range('2024-01-01', periods=30, freq='D').to_numpy()
+    chart = price_chart_data(dates, np.linspace(40000, 42000, 30),
+                             np.array(['2024-01-31'], dtype='datetime64[D]'), [42420.0])
+
+    response = client.get(f"/charts/api/{chart['key']}")
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['kind'] == 'price' and data['data'] == chart['data']
+    assert data['data']['predicted_prices'] == [42420.0]
+    assert response.headers['ETag'] == f'"{chart["key"]}"'
+    assert client.get(f"/charts/api/{chart['key']}", headers={'If-None-Match': chart['key']}).status_code == 304
+
+def test_unknown_chart_key_returns_404(client):
+    response = client.get('/charts/api/0123456789abcdef')
+
+    assert response.status_code == 404
+    assert 'error' in response.get_json()
@@ -0,0 +1,52 @@
+"""
+Prisijungimų telkinio statistikos testai (database/config.py).
+"""
+import pytest
+from flask import Flask
+from sqlalchemy import exc, text
+
+from database.config import create_db_engine, get_pool_status, pool_metrics, TimedQueuePool
+from routes import register_routes
+
+@pytest.fixture
+def small_pool(tmp_path):
+    """Telkinys su vienu prisijungimu ir be papildomų"""
+    pool_metrics.reset()
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool,
+                              pool_size=1, max_overflow=0, pool_timeout=0.1)
+    yield engine
+    engine.dispose()
+    pool_metrics.reset()
+
+def test_checkouts_and_timeouts_are_counted(small_pool):
+    with small_pool.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        with pytest.raises(exc.TimeoutError):
+            small_pool.connect()
+        status = get_pool_status(small_pool)
+
+    metrics = pool_metrics.snapshot()
+    assert status['pool_class'] == 'TimedQueuePool'
+    assert status['max_overflow'] == 0 and status['checked_out'] == 1
+    assert metrics['checkouts'] == metrics['checkins'] == 1
+    assert metrics['peak_checked_out'] == 1
+    assert metrics['timeouts'] == 1 and metrics['saturated'] == 1
+    assert sum(metrics['wait_histogram'].values()) == 1
+    assert metrics['max_hold_ms'] > 0
+
+def test_metrics_survive_pool_recreate(small_pool):
+    small_pool.dispose()
+    with small_pool.connect():
+        pass
+
+    assert get_pool_status(small_pool)['max_overflow'] == 0
+    assert pool_metrics.snapshot()['checkouts'] == 1
+
+def test_db_pool_endpoint():
+    app = Flask(__name__)
+    register_routes(app)
+
+    response = app.test_client().get('/api/db-pool')
+
+    assert response.status_code == 200
+    assert 'metrics' in response.get_json()
@@ -0,0 +1,42 @@
+"""
+load_frame() ir load_features() testai su perduotu prisijungimu.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from database import feature_store
+from database.bulk_writer import bulk_upsert
+from database.frame_loader import load_frame
+from database.models import BtcOHLCV
+
+@pytest.fixture
+def ohlcv(clean_table, db_engine):
+    clean_table(BtcOHLCV)
+    close = np.linspace(30000, 31000, 50)
+    df = pd.DataFrame({
+        'symbol': 'BTCUSDT', 'interval': '15m',
+        'timestamp': pd.date_range('2024-01-01', periods=50, freq='15min'),
+        'open': close, 'high': close + 5, 'low': close - 5, 'close': close, 'volume': 1.0,
+    })
+    bulk_upsert(df, BtcOHLCV, bind=db_engine)
+    return df
+
+def test_load_frame_does_not_change_passed_connection(ohlcv, db_engine):
+    with db_engine.connect() as conn:
+        df = load_frame(BtcOHLCV, columns=['timestamp', 'close'], start=ohlcv['timestamp'].iloc[10],
+                        chunk_size=7, bind=conn, symbol='BTCUSDT', interval='15m')
+
+        assert 'stream_results' not in conn.get_execution_options()
+        assert 'yield_per' not in conn.get_execution_options()
+        assert len(df) == 40
+        np.testing.assert_allclose(df['close'], ohlcv['close'].iloc[10:])
+
+def test_daily_blobs_do_not_change_passed_connection(db_engine, monkeypatch):
+    monkeypatch.setattr(feature_store, 'FEATURES_DAILY_BLOBS', True)
+    monkeypatch.setattr(feature_store, 'load_snapshot', lambda *args: None)
+
+    with db_engine.connect() as conn:
+        feature_store.load_features(columns=['timestamp', 'close'], storage='compact', bulk=True, bind=conn)
+
+        assert 'stream_results' not in conn.get_execution_options()
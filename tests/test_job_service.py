@@ -0,0 +1,63 @@
+"""
+Treniravimo užduočių deduplikavimo testai (services/job_service.py).
+"""
+import pytest
+
+from database.models import TrainingJob
+from services import job_service
+
+class FakeFuture:
+    def add_done_callback(self, callback):
+        pass
+
+class FakeExecutor:
+    """Vietoj procesų telkinio - tik įsimena pateiktas užduotis"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, func, job_id):
+        self.submitted.append(job_id)
+        return FakeFuture()
+
+@pytest.fixture
+def executor(monkeypatch, clean_table):
+    clean_table(TrainingJob)
+    fake = FakeExecutor()
+    monkeypatch.setattr(job_service, 'get_executor', lambda: fake)
+    return fake
+
+PARAMS = {'n_estimators': 10}
+
+def test_same_job_submitted_twice_returns_same_id(executor):
+    first = job_service.submit_training_job('random_forest', 0.2, PARAMS)
+    second = job_service.submit_training_job('random_forest', 0.2, PARAMS)
+
+    assert first['deduplicated'] is False and second['deduplicated'] is True
+    assert second['job_id'] == first['job_id']
+    assert executor.submitted == [first['job_id']]
+
+def test_concurrent_insert_returns_existing_job(executor, monkeypatch):
+    first = job_service.submit_training_job('random_forest', 0.2, PARAMS)
+
+    # Kita užklausa praėjo patikrą tuo pačiu metu - patikra jos užduoties dar nemato
+    active_job = job_service._active_job
+    calls = []
+
+    def racing_active_job(session, dedup_key):
+        calls.append(dedup_key)
+        return None if len(calls) == 1 else active_job(session, dedup_key)
+
+    monkeypatch.setattr(job_service, '_active_job', racing_active_job)
+    second = job_service.submit_training_job('random_forest', 0.2, PARAMS)
+
+    assert second == {'job_id': first['job_id'], 'status': 'queued', 'deduplicated': True}
+    assert executor.submitted == [first['job_id']]
+
+def test_failed_job_can_be_resubmitted(executor):
+    first = job_service.submit_training_job('random_forest', 0.2, PARAMS)
+    job_service._update_job(first['job_id'], status='failed', active=None)
+
+    second = job_service.submit_training_job('random_forest', 0.2, PARAMS)
+
+    assert second['deduplicated'] is False and second['job_id'] != first['job_id']
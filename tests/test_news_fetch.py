@@ -0,0 +1,111 @@
+"""
+Lygiagretaus straipsnių atsisiuntimo testai (data/sentiment_analysis.py)
+su lokaliu HTTP serveriu, pasiekiamu dviem serverio vardais.
+"""
+import os
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from data import sentiment_analysis, html_extractor
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'news')
+
+# Tarpas tarp užklausų į tą patį serverį (NEWS_HOST_INTERVAL) testuose
+HOST_INTERVAL = 0.3
+
+# Tas pats serveris dviem vardais - ribotuvui tai du skirtingi serveriai
+HOST_ALIASES = ('127.0.0.1', 'localhost')
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Grąžina tests/fixtures/news failą ir įsimena (Host, kelias, laikas)"""
+    requests = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests.append((self.headers['Host'].split(':')[0], self.path, time.monotonic()))
+        path = os.path.join(FIXTURE_DIR, os.path.basename(self.path))
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def news_server(monkeypatch):
+    """Paleidžia serverį ir pakeičia bendrą sesiją bei ribotuvą naujais"""
+    FixtureHandler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(sentiment_analysis, '_sesija', sentiment_analysis.sukurti_sesija())
+    monkeypatch.setattr(sentiment_analysis, '_ribotuvas', sentiment_analysis.HostRateLimiter(HOST_INTERVAL))
+    yield server.server_port
+    server.shutdown()
+    server.server_close()
+
+def article_urls(port, per_host=3):
+    """Straipsnių URL pakaitomis iš abiejų serverio vardų"""
+    return [f"http://{HOST_ALIASES[i % 2]}:{port}/article_{i + 1}.html" for i in range(per_host * 2)]
+
+def test_results_in_input_order(news_server):
+    urls = article_urls(news_server)
+
+    texts = sentiment_analysis.gauti_straipsniu_turinius(urls)
+
+    assert len(texts) == len(urls)
+    for number, text in enumerate(texts, start=1):
+        assert f"Fixture article number {number}." in text
+        assert 'window.analytics' not in text
+
+def test_same_host_requests_are_spaced(news_server):
+    sentiment_analysis.gauti_straipsniu_turinius(article_urls(news_server))
+
+    for host in HOST_ALIASES:
+        times = sorted(t for request_host, _, t in FixtureHandler.requests if request_host == host)
+        assert len(times) == 3
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        # Nedidelė paklaida - serveris laiką užfiksuoja jau gavęs užklausą
+        assert min(gaps) >= HOST_INTERVAL - 0.05, gaps
+
+def test_different_hosts_fetched_concurrently(news_server):
+    urls = article_urls(news_server)
+
+    started = time.monotonic()
+    sentiment_analysis.gauti_straipsniu_turinius(urls)
+    elapsed = time.monotonic() - started
+
+    # Kiekvienam serveriui 3 užklausos - bent 2 tarpai. Jei serveriai lauktų
+    # vienas kito, 6 užklausoms reikėtų bent 5 tarpų
+    assert 2 * HOST_INTERVAL - 0.05 <= elapsed < 4 * HOST_INTERVAL, elapsed
+
+@pytest.mark.parametrize('ekstraktorius', sorted(html_extractor.EKSTRAKTORIAI))
+def test_empty_article_does_not_stop_batch(news_server, monkeypatch, ekstraktorius):
+    monkeypatch.setattr(html_extractor, 'NUMATYTASIS_EKSTRAKTORIUS', ekstraktorius)
+    port = news_server
+    urls = [f"http://127.0.0.1:{port}/article_1.html",
+            f"http://localhost:{port}/blank.html",
+            f"http://127.0.0.1:{port}/comment_only.html"]
+
+    texts = sentiment_analysis.gauti_straipsniu_turinius(urls)
+
+    assert "Fixture article number 1." in texts[0]
+    assert texts[1:] == ["", ""]
+
+@pytest.mark.parametrize('ekstraktorius', sorted(html_extractor.EKSTRAKTORIAI))
+def test_empty_listing_page_has_no_articles(ekstraktorius):
+    url = "https://cointelegraph.com/tags/bitcoin"
+    for content in ("   ", "<!-- tik komentaras -->"):
+        assert html_extractor.istraukti_straipsnius(content, url, ekstraktorius=ekstraktorius) == []